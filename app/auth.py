@@ -1,14 +1,18 @@
+import os
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from typing import Optional
 
 from fastapi import HTTPException, status, Depends
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt, JWTError
-from passlib.context import CryptContext
-from sqlalchemy.orm import Session
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from .database import get_db
+from .cache import TTLCache
+from .database import get_read_db
 from .models import User, UserRole
+from .services.password_service import hash_password, verify_password  # noqa: F401
 
 
 # -----------------------------
@@ -19,26 +23,32 @@ SECRET_KEY = "supersecretkey123"  # you can change later
 ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 60
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Authenticated users are cached per process; a change is visible on
+# other workers after at most USER_CACHE_TTL_SECONDS
+USER_CACHE_TTL_SECONDS = float(os.getenv("USER_CACHE_TTL_SECONDS", "30"))
+USER_CACHE_MAX_SIZE = int(os.getenv("USER_CACHE_MAX_SIZE", "10000"))
+
+# Stateless mode trusts the role/company/email claims signed into the
+# token and never touches the database to authenticate a request
+AUTH_STATELESS = os.getenv("AUTH_STATELESS", "0") == "1"
+
 from fastapi.security import HTTPBearer
 
 oauth2_scheme = HTTPBearer()
 
 
 # -----------------------------
-# PASSWORD HELPERS
+# TOKEN CREATION
 # -----------------------------
 
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+def user_claims(user: User) -> dict:
+    return {
+        "sub": str(user.id),
+        "email": user.email,
+        "role": user.role.value,
+        "company_id": user.company_id,
+    }
 
-def verify_password(plain_password, hashed_password) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
-
-
-# -----------------------------
-# TOKEN CREATION
-# -----------------------------
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     to_encode = data.copy()
@@ -52,16 +62,55 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
     return jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
 
 
+# -----------------------------
+# AUTHENTICATED USER CACHE
+# -----------------------------
+
+@dataclass(frozen=True)
+class AuthUser:
+    """Immutable snapshot of the fields request handlers read from the
+    current user; safe to share across requests, unlike an ORM instance."""
+
+    id: int
+    email: str
+    role: UserRole
+    company_id: Optional[int] = None
+    full_name: Optional[str] = None
+
+    @classmethod
+    def from_user(cls, user: User) -> "AuthUser":
+        return cls(
+            id=user.id,
+            email=user.email,
+            role=user.role,
+            company_id=user.company_id,
+            full_name=user.full_name,
+        )
+
+
+user_cache = TTLCache(maxsize=USER_CACHE_MAX_SIZE, ttl=USER_CACHE_TTL_SECONDS)
+
+
+def invalidate_user(user_id: int) -> None:
+    user_cache.invalidate(user_id)
+
+
+@event.listens_for(User, "after_update")
+@event.listens_for(User, "after_delete")
+def _invalidate_changed_user(mapper, connection, target):
+    invalidate_user(target.id)
+
+
 # -----------------------------
 # USER FROM TOKEN
 # -----------------------------
 
 from fastapi.security import HTTPAuthorizationCredentials
 
-def get_current_user(
+async def get_current_user(
     credentials: HTTPAuthorizationCredentials = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
-) -> User:
+    db: AsyncSession = Depends(get_read_db)
+) -> AuthUser:
 
     token = credentials.credentials   # ← extract actual JWT string
 
@@ -81,11 +130,28 @@ def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = db.query(User).filter(User.id == int(user_id)).first()
+    user_id = int(user_id)
+
+    # Tokens issued before claims were added still fall through to the DB
+    if AUTH_STATELESS and "role" in payload:
+        return AuthUser(
+            id=user_id,
+            email=payload.get("email"),
+            role=UserRole(payload["role"]),
+            company_id=payload.get("company_id"),
+        )
+
+    cached = user_cache.get(user_id)
+    if cached is not None:
+        return cached
+
+    user = (await db.execute(select(User).where(User.id == user_id))).scalar_one_or_none()
     if not user:
         raise credentials_exception
 
-    return user
+    current_user = AuthUser.from_user(user)
+    user_cache.set(user_id, current_user)
+    return current_user
 
 
 # -----------------------------
@@ -93,7 +159,7 @@ def get_current_user(
 # -----------------------------
 
 def require_role(*roles):
-    def wrapper(current_user: User = Depends(get_current_user)):
+    async def wrapper(current_user: AuthUser = Depends(get_current_user)):
         if current_user.role not in roles:
             raise HTTPException(
                 status_code=403,
@@ -1,21 +1,147 @@
-from sqlalchemy import create_engine
+import os
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 
-DATABASE_URL = "sqlite:///./ats.db"
 
-engine = create_engine(
-    DATABASE_URL,
-    connect_args={"check_same_thread": False}  # required for SQLite
-)
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./ats.db")
+
+# Optional replica for read-only endpoints; defaults to the primary
+DATABASE_READ_URL = os.getenv("DATABASE_READ_URL") or DATABASE_URL
+
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "20"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_RECYCLE = int(os.getenv("DB_POOL_RECYCLE", "1800"))  # seconds; -1 disables
+
+SQLITE_BUSY_TIMEOUT_MS = int(os.getenv("SQLITE_BUSY_TIMEOUT_MS", "5000"))
+SQLITE_MMAP_SIZE = int(os.getenv("SQLITE_MMAP_SIZE", str(256 * 1024 * 1024)))
+
+# Async drivers for the request path; add the matching package
+# (aiosqlite / asyncpg) to requirements when switching databases
+ASYNC_DRIVERS = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgresql": "postgresql+asyncpg",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, rest = url.split("://", 1)
+    return f"{ASYNC_DRIVERS.get(scheme.split('+')[0], scheme)}://{rest}"
+
+
+# INSERT constructs with ON CONFLICT support, per dialect
+_CONFLICT_INSERTS = {
+    "sqlite": sqlite_insert,
+    "postgresql": pg_insert,
+}
+
+
+def conflict_insert(bind, table):
+    """insert(table) for bind's dialect, with on_conflict_do_nothing/do_update."""
+    return _CONFLICT_INSERTS[bind.dialect.name](table)
+
+
+# -----------------------------
+# ENGINE OPTIONS
+# -----------------------------
+
+def _is_sqlite(url: str) -> bool:
+    return make_url(url).get_backend_name() == "sqlite"
+
+
+def _is_sqlite_file(url: str) -> bool:
+    return _is_sqlite(url) and make_url(url).database not in (None, "", ":memory:")
+
+
+def _engine_options(url: str) -> dict:
+    if _is_sqlite(url):
+        options = {"connect_args": {"check_same_thread": False}}  # required for SQLite
+        if not _is_sqlite_file(url):
+            return options  # single shared connection, no pool to size
+    else:
+        options = {"pool_pre_ping": True}
+
+    options.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=DB_POOL_TIMEOUT,
+        pool_recycle=DB_POOL_RECYCLE,
+    )
+    return options
+
+
+def _tune_sqlite(sync_engine) -> None:
+    """WAL lets readers run alongside the single writer and commit without
+    rewriting a rollback journal; busy_timeout makes a second writer wait for
+    the lock instead of failing with "database is locked"."""
+
+    @event.listens_for(sync_engine, "connect")
+    def _set_pragmas(dbapi_connection, connection_record):
+        cursor = dbapi_connection.cursor()
+        # busy_timeout first: journal_mode needs a lock another writer may hold
+        cursor.execute(f"PRAGMA busy_timeout = {SQLITE_BUSY_TIMEOUT_MS}")
+        cursor.execute("PRAGMA journal_mode = WAL")
+        cursor.execute("PRAGMA synchronous = NORMAL")
+        cursor.execute(f"PRAGMA mmap_size = {SQLITE_MMAP_SIZE}")
+        cursor.close()
+
+
+def _create_async_engine(url: str):
+    async_engine = create_async_engine(to_async_url(url), **_engine_options(url))
+    if _is_sqlite(url):
+        _tune_sqlite(async_engine.sync_engine)
+    return async_engine
+
+
+# -----------------------------
+# ENGINES AND SESSIONS
+# -----------------------------
+
+# Sync engine: startup DDL, migrations and standalone scripts
+engine = create_engine(DATABASE_URL, **_engine_options(DATABASE_URL))
+if _is_sqlite(DATABASE_URL):
+    _tune_sqlite(engine)
+
+# Async engine: every API request
+async_engine = _create_async_engine(DATABASE_URL)
+
+# Read engine: a replica for read-only endpoints when DATABASE_READ_URL is set
+if DATABASE_READ_URL != DATABASE_URL:
+    async_read_engine = _create_async_engine(DATABASE_READ_URL)
+else:
+    async_read_engine = async_engine
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+AsyncSessionLocal = async_sessionmaker(
+    bind=async_engine,
+    autoflush=False,
+    expire_on_commit=False,  # no implicit lazy reloads after commit in async code
+)
+
+AsyncReadSessionLocal = async_sessionmaker(
+    bind=async_read_engine,
+    autoflush=False,
+    expire_on_commit=False,
+)
+
 Base = declarative_base()
 
-# Dependency for FastAPI routes
-def get_db():
-    db = SessionLocal()
-    try:
+# Dependency for FastAPI routes that write
+async def get_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+# Dependency for read-only routes (may lag the primary when a replica is used)
+async def get_read_db():
+    async with AsyncReadSessionLocal() as db:
         yield db
-    finally:
-        db.close()
@@ -1,18 +1,56 @@
+import threading
+
 from fastapi import FastAPI
-from .database import Base, engine
-from .routers import auth_router, jobs_router, applications_router
+from fastapi.responses import PlainTextResponse
+from .database import engine, async_engine, async_read_engine
+from .metrics import MetricsMiddleware, instrument_engine, registry
+from .routers import auth_router, jobs_router, applications_router, import_router, analytics_router
 from .routers.application_history_router import router as history_router
+from .services.password_service import password_hasher
+from .services.queue_backend import QUEUE_BACKEND, get_queue_backend
 
 app = FastAPI(title="ATS Backend System")
 
-Base.metadata.create_all(bind=engine)
+# No DDL here: the schema is managed by `python -m app.migrations upgrade`
+
+# Request timing and per-request SQL accounting (served on /metrics)
+instrument_engine(engine)
+instrument_engine(async_engine.sync_engine)
+if async_read_engine is not async_engine:
+    instrument_engine(async_read_engine.sync_engine)
+app.add_middleware(MetricsMiddleware)
 
 # Routers
 app.include_router(auth_router.router)
 app.include_router(jobs_router.router)
 app.include_router(applications_router.router)
 app.include_router(history_router)
+app.include_router(import_router.router)
+app.include_router(analytics_router.router)
+
+@app.on_event("startup")
+def start_in_process_queue_consumers():
+    # Single-node mode: no Redis, so relay, email worker and analytics refresher run in this process
+    if QUEUE_BACKEND != "memory":
+        return
+
+    from .services.analytics_service import analytics_loop
+    from .services.outbox_relay import relay_loop
+    from .services.worker import EmailWorker
+
+    backend = get_queue_backend()
+    threading.Thread(target=relay_loop, args=(backend,), name="outbox-relay", daemon=True).start()
+    threading.Thread(target=EmailWorker(backend).run, name="email-worker", daemon=True).start()
+    threading.Thread(target=analytics_loop, name="analytics-refresher", daemon=True).start()
+
+@app.on_event("shutdown")
+def shutdown_password_pool():
+    password_hasher.shutdown()
 
 @app.get("/health")
 def health_check():
     return {"status": "ok"}
+
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+def metrics():
+    return PlainTextResponse(registry.render(), media_type="text/plain; version=0.0.4")
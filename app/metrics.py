@@ -0,0 +1,308 @@
+import os
+import threading
+import time
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+# Requests slower than this are printed together with their SQL
+SLOW_REQUEST_SECONDS = float(os.getenv("SLOW_REQUEST_SECONDS", "0.5"))
+
+# Statements kept per request for the slow-request log
+SLOW_REQUEST_MAX_STATEMENTS = 20
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+# -----------------------------
+# METRIC TYPES (Prometheus text exposition format)
+# -----------------------------
+# Kept per process; scrape every API worker. Label values must come from a
+# small fixed set (route templates, not raw paths) to bound memory.
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names: tuple, values: tuple, extra: str = "") -> str:
+    parts = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class _Metric:
+    kind = ""
+
+    def __init__(self, name: str, help_text: str, labels: tuple = ()):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = labels
+        self._lock = threading.Lock()
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} {self.kind}"]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def render(self):
+        lines = super().render()
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}_total{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def __init__(self, name, help_text, labels=()):
+        super().__init__(name, help_text, labels)
+        self._values: dict[tuple, float] = {}
+
+    def inc(self, *labels, amount: float = 1.0) -> None:
+        with self._lock:
+            self._values[labels] = self._values.get(labels, 0.0) + amount
+
+    def dec(self, *labels, amount: float = 1.0) -> None:
+        self.inc(*labels, amount=-amount)
+
+    def render(self):
+        lines = super().render()
+        with self._lock:
+            for labels, value in self._values.items():
+                lines.append(f"{self.name}{_labels(self.label_names, labels)} {value}")
+        return lines
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labels=(), buckets=LATENCY_BUCKETS):
+        super().__init__(name, help_text, labels)
+        self.buckets = tuple(buckets)
+        # labels -> [count per bucket..., count above the last bucket, sum]
+        self._values: dict[tuple, list] = {}
+
+    def observe(self, value: float, *labels) -> None:
+        with self._lock:
+            series = self._values.get(labels)
+            if series is None:
+                series = self._values[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[i] += 1
+                    break
+            else:
+                series[len(self.buckets)] += 1
+            series[-1] += value
+
+    def render(self):
+        lines = super().render()
+        with self._lock:
+            for labels, series in self._values.items():
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = f'le="{bound}"'
+                    lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, le)} {cumulative}")
+                cumulative += series[len(self.buckets)]
+                inf = 'le="+Inf"'
+                lines.append(f"{self.name}_bucket{_labels(self.label_names, labels, inf)} {cumulative}")
+                lines.append(f"{self.name}_sum{_labels(self.label_names, labels)} {series[-1]}")
+                lines.append(f"{self.name}_count{_labels(self.label_names, labels)} {cumulative}")
+        return lines
+
+
+class Registry:
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+
+    def register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def render(self) -> str:
+        return "\n".join(line for metric in self._metrics for line in metric.render()) + "\n"
+
+
+registry = Registry()
+
+http_request_duration = registry.register(Histogram(
+    "http_request_duration_seconds", "Time to send the full response.", ("method", "route", "status"),
+))
+http_requests_in_progress = registry.register(Gauge(
+    "http_requests_in_progress", "Requests currently being handled.", ("method",),
+))
+db_queries_per_request = registry.register(Histogram(
+    "db_queries_per_request", "SQL statements executed per request.", ("method", "route"),
+    buckets=QUERY_COUNT_BUCKETS,
+))
+db_time_per_request = registry.register(Histogram(
+    "db_query_seconds_per_request", "Total SQL execution time per request.", ("method", "route"),
+))
+db_queries = registry.register(Counter(
+    "db_queries", "SQL statements executed, inside or outside requests.",
+))
+rate_limit_rejections = registry.register(Counter(
+    "rate_limit_rejections", "Requests turned away by admission control.", ("limit", "reason"),
+))
+rate_limit_backend_errors = registry.register(Counter(
+    "rate_limit_backend_errors", "Rate limit checks skipped because the backend failed.",
+))
+sse_connections = registry.register(Gauge(
+    "sse_connections", "Open stage-event streams.",
+))
+sse_slow_consumers = registry.register(Counter(
+    "sse_slow_consumers", "Event streams closed because the client fell behind.",
+))
+queue_enqueue_duration = registry.register(Histogram(
+    "queue_enqueue_duration_seconds", "Time to push one outbox batch to the message queue.", ("queue",),
+))
+outbox_lag = registry.register(Histogram(
+    "outbox_lag_seconds", "Time from a message being written to the outbox to it being enqueued.", ("queue",),
+    buckets=(0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0),
+))
+
+
+# -----------------------------
+# PER-REQUEST SQL ACCOUNTING
+# -----------------------------
+# The middleware puts a RequestStats in a context variable; engine events add
+# every statement run by that request's task to it (SQLAlchemy's async layer
+# carries the context into its greenlets).
+
+class RequestStats:
+    __slots__ = ("queries", "query_seconds", "statements")
+
+    def __init__(self):
+        self.queries = 0
+        self.query_seconds = 0.0
+        self.statements: list[tuple[float, str]] = []
+
+
+_current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_started_at", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_started_at"].pop()
+    db_queries.inc()
+
+    stats = _current_request.get()
+    if stats is None:
+        return
+    stats.queries += 1
+    stats.query_seconds += elapsed
+    if len(stats.statements) < SLOW_REQUEST_MAX_STATEMENTS:
+        stats.statements.append((elapsed, statement))
+
+
+def _handle_error(exception_context):
+    # A failed statement never reaches after_cursor_execute
+    connection = exception_context.connection
+    if connection is not None and connection.info.get("query_started_at"):
+        connection.info["query_started_at"].pop()
+
+
+def instrument_engine(engine: Engine) -> None:
+    """Count and time every statement run on this (sync) engine; pass
+    ``async_engine.sync_engine`` for the async one."""
+    event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(engine, "handle_error", _handle_error)
+
+
+# -----------------------------
+# ASGI MIDDLEWARE
+# -----------------------------
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    # Unmatched paths share one label so random URLs can't grow the registry
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _log_slow_request(method: str, path: str, status: int, elapsed: float, stats: RequestStats) -> None:
+    lines = [
+        f"🐢 Slow request: {method} {path} -> {status} in {elapsed * 1000:.1f} ms "
+        f"({stats.queries} queries, {stats.query_seconds * 1000:.1f} ms in SQL)"
+    ]
+    for seconds, statement in sorted(stats.statements, reverse=True):
+        lines.append(f"    {seconds * 1000:8.2f} ms  {' '.join(statement.split())}")
+    if stats.queries > len(stats.statements):
+        lines.append(f"    ... {stats.queries - len(stats.statements)} more statement(s)")
+    print("\n".join(lines))
+
+
+def _is_event_stream(message) -> bool:
+    for name, value in message.get("headers", ()):
+        if name.lower() == b"content-type":
+            return value.split(b";")[0].strip().lower() == b"text/event-stream"
+    return False
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware, so streamed responses are timed until their
+    last chunk is sent. Server-sent event streams stay open for minutes by
+    design, so they are left out of the latency histogram and slow log."""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+
+        method = scope["method"]
+        stats = RequestStats()
+        token = _current_request.set(stats)
+        status = 500
+        event_stream = False
+
+        async def send_wrapper(message):
+            nonlocal status, event_stream
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                event_stream = _is_event_stream(message)
+            await send(message)
+
+        http_requests_in_progress.inc(method)
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = time.perf_counter() - started
+            http_requests_in_progress.dec(method)
+            _current_request.reset(token)
+
+            route = _route_label(scope)
+            db_queries_per_request.observe(stats.queries, method, route)
+            db_time_per_request.observe(stats.query_seconds, method, route)
+
+            if not event_stream:
+                http_request_duration.observe(elapsed, method, route, str(status))
+                if elapsed >= SLOW_REQUEST_SECONDS:
+                    _log_slow_request(method, scope["path"], status, elapsed, stats)
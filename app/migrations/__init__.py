@@ -0,0 +1,105 @@
+import os
+
+from alembic import command
+from alembic.config import Config
+from alembic.runtime.migration import MigrationContext
+from sqlalchemy import func, inspect, select
+from sqlalchemy.engine import Connection, Engine
+
+from ..database import Base, engine
+from ..models import Application, JobStageCount
+from ..services.pipeline_service import counters_from_applications
+
+
+# -----------------------------
+# SCHEMA MIGRATIONS (alembic)
+# -----------------------------
+# The schema is owned by the revisions in app/migrations/versions; the API
+# never runs DDL itself. Run on every deploy, before starting the workers:
+#
+#     python -m app.migrations upgrade
+#
+# After changing app/models.py, generate the next revision and review it:
+#
+#     python -m app.migrations revision -m "describe the change"
+
+BASELINE_REVISION = "0001"
+
+# Tables added by revisions after the baseline; those revisions create them
+POST_BASELINE_TABLES = ("funnel_stage_stats", "funnel_dwell_buckets", "analytics_watermarks")
+
+MIGRATIONS_DIR = os.path.dirname(__file__)
+
+
+def alembic_config(connection: Connection = None) -> Config:
+    config = Config()
+    config.set_main_option("script_location", MIGRATIONS_DIR)
+    config.set_main_option("file_template", "%%(rev)s_%%(slug)s")
+    if connection is not None:
+        config.attributes["connection"] = connection
+    return config
+
+
+# -----------------------------
+# DATABASES FROM BEFORE MIGRATIONS
+# -----------------------------
+# Earlier versions built the schema with create_all() at startup, so existing
+# databases have tables but no alembic_version. They are brought up to the
+# baseline (missing tables and indexes added) and stamped with it once.
+
+def _duplicate_applications(conn) -> int:
+    duplicates = (
+        select(Application.candidate_id, Application.job_id)
+        .group_by(Application.candidate_id, Application.job_id)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    return conn.execute(select(func.count()).select_from(duplicates)).scalar()
+
+
+def _adopt_unversioned_schema(conn) -> list[str]:
+    created = []
+
+    duplicates = _duplicate_applications(conn)
+    if duplicates:
+        raise RuntimeError(
+            f"{duplicates} candidate/job pairs have more than one application; "
+            "resolve them before adding uq_applications_candidate_job"
+        )
+
+    had_stage_counts = inspect(conn).has_table(JobStageCount.__tablename__)
+    baseline_tables = [
+        table for table in Base.metadata.sorted_tables if table.name not in POST_BASELINE_TABLES
+    ]
+    Base.metadata.create_all(bind=conn, tables=baseline_tables)
+
+    # Counters are only kept up to date from here on: start them from the
+    # applications that already exist, or every pipeline reads zero
+    if not had_stage_counts:
+        conn.execute(counters_from_applications())
+
+    inspector = inspect(conn)
+    for table in baseline_tables:
+        existing = {index["name"] for index in inspector.get_indexes(table.name)}
+        for index in sorted(table.indexes, key=lambda i: i.name):
+            if index.name not in existing:
+                index.create(bind=conn)
+                created.append(index.name)
+
+    command.stamp(alembic_config(conn), BASELINE_REVISION)
+    return created
+
+
+def _is_unversioned(conn) -> bool:
+    if MigrationContext.configure(conn).get_current_revision() is not None:
+        return False
+    return inspect(conn).has_table("users")
+
+
+def upgrade(bind: Engine = engine, revision: str = "head") -> list[str]:
+    """Migrate the database to ``revision``; returns indexes that had to be
+    added to a pre-migrations database (empty otherwise)."""
+    with bind.begin() as conn:
+        created = _adopt_unversioned_schema(conn) if _is_unversioned(conn) else []
+        command.upgrade(alembic_config(conn), revision)
+    return created
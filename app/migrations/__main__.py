@@ -0,0 +1,57 @@
+import argparse
+
+from alembic import command
+
+from ..database import engine
+from . import alembic_config, upgrade
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+#     python -m app.migrations upgrade [revision]      (default: head)
+#     python -m app.migrations downgrade <revision>
+#     python -m app.migrations current | history
+#     python -m app.migrations revision -m "message" [--empty]
+
+def main():
+    parser = argparse.ArgumentParser(prog="python -m app.migrations", description="Manage the database schema.")
+    commands = parser.add_subparsers(dest="command")
+
+    upgrade_parser = commands.add_parser("upgrade", help="migrate to a newer revision (default)")
+    upgrade_parser.add_argument("revision", nargs="?", default="head")
+
+    downgrade_parser = commands.add_parser("downgrade", help="migrate back to an older revision")
+    downgrade_parser.add_argument("revision")
+
+    commands.add_parser("current", help="show the database's revision")
+    commands.add_parser("history", help="list all revisions")
+
+    revision_parser = commands.add_parser("revision", help="generate a revision from model changes")
+    revision_parser.add_argument("-m", "--message", required=True)
+    revision_parser.add_argument("--empty", action="store_true", help="don't autogenerate, write an empty revision")
+
+    args = parser.parse_args()
+
+    if args.command in (None, "upgrade"):
+        for name in upgrade(revision=getattr(args, "revision", "head")):
+            print(f"created index {name}")
+        print("schema up to date")
+        return
+
+    if args.command == "history":
+        command.history(alembic_config())
+        return
+
+    with engine.begin() as conn:
+        config = alembic_config(conn)
+        if args.command == "downgrade":
+            command.downgrade(config, args.revision)
+        elif args.command == "current":
+            command.current(config)
+        elif args.command == "revision":
+            command.revision(config, message=args.message, autogenerate=not args.empty)
+
+
+if __name__ == "__main__":
+    main()
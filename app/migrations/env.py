@@ -0,0 +1,61 @@
+from alembic import context
+from sqlalchemy import engine_from_config, pool
+
+from app.database import Base, DATABASE_URL
+from app import models  # noqa: F401  (registers every table on Base.metadata)
+from app.services.search_service import FTS_TABLE
+
+
+# -----------------------------
+# ALEMBIC ENVIRONMENT
+# -----------------------------
+# Used by `python -m app.migrations ...`, which passes an open connection in
+# config.attributes, and by plain `alembic ...` commands via alembic.ini.
+
+config = context.config
+target_metadata = Base.metadata
+
+
+def _include_object(obj, name, type_, reflected, compare_to):
+    # The FTS5 virtual table and its shadow tables aren't ORM models
+    return not (type_ == "table" and name.startswith(FTS_TABLE))
+
+
+def _configure(**kwargs):
+    context.configure(
+        target_metadata=target_metadata,
+        include_object=_include_object,
+        compare_type=True,
+        # SQLite can't ALTER most things in place; batch mode recreates the table
+        render_as_batch=True,
+        **kwargs,
+    )
+
+
+def run_migrations_offline():
+    _configure(url=config.get_main_option("sqlalchemy.url") or DATABASE_URL, literal_binds=True)
+    with context.begin_transaction():
+        context.run_migrations()
+
+
+def run_migrations_online():
+    connection = config.attributes.get("connection")
+    if connection is not None:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+        return
+
+    section = config.get_section(config.config_ini_section) or {}
+    section.setdefault("sqlalchemy.url", DATABASE_URL)
+    connectable = engine_from_config(section, prefix="sqlalchemy.", poolclass=pool.NullPool)
+    with connectable.connect() as connection:
+        _configure(connection=connection)
+        with context.begin_transaction():
+            context.run_migrations()
+
+
+if context.is_offline_mode():
+    run_migrations_offline()
+else:
+    run_migrations_online()
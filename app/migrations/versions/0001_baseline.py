@@ -0,0 +1,141 @@
+"""baseline: schema of app/models.py
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0001"
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+# Enum types are created once up front: several tables share applicationstage
+# and Postgres would otherwise try to CREATE TYPE it once per table
+user_role = postgresql.ENUM("CANDIDATE", "RECRUITER", "HIRING_MANAGER", name="userrole", create_type=False)
+job_status = postgresql.ENUM("OPEN", "CLOSED", name="jobstatus", create_type=False)
+application_stage = postgresql.ENUM(
+    "APPLIED", "SCREENING", "INTERVIEW", "OFFER", "HIRED", "REJECTED",
+    name="applicationstage", create_type=False,
+)
+ENUMS = (user_role, job_status, application_stage)
+
+
+def upgrade():
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for enum in ENUMS:
+            enum.create(bind, checkfirst=True)
+
+    op.create_table(
+        "companies",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+        sa.UniqueConstraint("name"),
+    )
+    op.create_index("ix_companies_id", "companies", ["id"])
+
+    op.create_table(
+        "outbox",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("queue", sa.String(), nullable=False),
+        sa.Column("payload", sa.Text(), nullable=False),
+        sa.Column("created_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+
+    op.create_table(
+        "users",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("email", sa.String(), nullable=False),
+        sa.Column("full_name", sa.String(), nullable=False),
+        sa.Column("hashed_password", sa.String(), nullable=False),
+        sa.Column("role", user_role, nullable=False),
+        sa.Column("company_id", sa.Integer(), nullable=True),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_users_email", "users", ["email"], unique=True)
+    op.create_index("ix_users_id", "users", ["id"])
+
+    op.create_table(
+        "jobs",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("title", sa.String(), nullable=False),
+        sa.Column("description", sa.Text(), nullable=True),
+        sa.Column("status", job_status, nullable=False),
+        sa.Column("company_id", sa.Integer(), nullable=False),
+        sa.Column("created_by_id", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["company_id"], ["companies.id"]),
+        sa.ForeignKeyConstraint(["created_by_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_jobs_id", "jobs", ["id"])
+    op.create_index("ix_jobs_status_id", "jobs", ["status", "id"])
+    op.create_index("ix_jobs_company_id_id", "jobs", ["company_id", "id"])
+    op.create_index("ix_jobs_created_by_id", "jobs", ["created_by_id"])
+
+    op.create_table(
+        "applications",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("candidate_id", sa.Integer(), nullable=False),
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("stage", application_stage, nullable=True),
+        sa.Column("created_at", sa.DateTime(), nullable=True),
+        sa.Column("updated_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["candidate_id"], ["users.id"]),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_applications_id", "applications", ["id"])
+    op.create_index("uq_applications_candidate_job", "applications", ["candidate_id", "job_id"], unique=True)
+    op.create_index("ix_applications_job_id_stage", "applications", ["job_id", "stage"])
+
+    op.create_table(
+        "job_stage_counts",
+        sa.Column("job_id", sa.Integer(), nullable=False),
+        sa.Column("stage", application_stage, nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(["job_id"], ["jobs.id"]),
+        sa.PrimaryKeyConstraint("job_id", "stage"),
+    )
+
+    op.create_table(
+        "application_history",
+        sa.Column("id", sa.Integer(), nullable=False),
+        sa.Column("application_id", sa.Integer(), nullable=False),
+        sa.Column("old_stage", application_stage, nullable=True),
+        sa.Column("new_stage", application_stage, nullable=False),
+        sa.Column("changed_by_id", sa.Integer(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(), nullable=True),
+        sa.ForeignKeyConstraint(["application_id"], ["applications.id"]),
+        sa.ForeignKeyConstraint(["changed_by_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_application_history_id", "application_history", ["id"])
+    op.create_index(
+        "ix_application_history_application_id_changed_at",
+        "application_history",
+        ["application_id", "changed_at"],
+    )
+
+
+def downgrade():
+    op.drop_table("application_history")
+    op.drop_table("job_stage_counts")
+    op.drop_table("applications")
+    op.drop_table("jobs")
+    op.drop_table("users")
+    op.drop_table("outbox")
+    op.drop_table("companies")
+
+    bind = op.get_bind()
+    if bind.dialect.name == "postgresql":
+        for enum in reversed(ENUMS):
+            enum.drop(bind, checkfirst=True)
@@ -0,0 +1,36 @@
+"""jobs_fts: SQLite FTS5 index over job title / description
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-18
+"""
+from alembic import op
+
+
+revision = "0002"
+down_revision = "0001"
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Other databases search with ILIKE (see app/services/search_service.py)
+    if op.get_bind().dialect.name != "sqlite":
+        return
+
+    # IF NOT EXISTS: databases from before migrations already have the table
+    op.execute(
+        "CREATE VIRTUAL TABLE IF NOT EXISTS jobs_fts "
+        "USING fts5(title, description, tokenize='porter unicode61', prefix='2 3')"
+    )
+    op.execute(
+        "INSERT INTO jobs_fts (rowid, title, description) "
+        "SELECT id, title, coalesce(description, '') FROM jobs "
+        "WHERE id NOT IN (SELECT rowid FROM jobs_fts)"
+    )
+
+
+def downgrade():
+    if op.get_bind().dialect.name != "sqlite":
+        return
+    op.execute("DROP TABLE IF EXISTS jobs_fts")
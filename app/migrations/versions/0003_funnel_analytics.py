@@ -0,0 +1,60 @@
+"""funnel analytics: per job / company stage totals, dwell histograms, watermark
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+revision = "0003"
+down_revision = "0002"
+branch_labels = None
+depends_on = None
+
+
+# Created by 0001
+application_stage = postgresql.ENUM(
+    "APPLIED", "SCREENING", "INTERVIEW", "OFFER", "HIRED", "REJECTED",
+    name="applicationstage", create_type=False,
+)
+
+
+def upgrade():
+    op.create_table(
+        "funnel_stage_stats",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("scope_id", sa.Integer(), nullable=False),
+        sa.Column("stage", application_stage, nullable=False),
+        sa.Column("entered", sa.Integer(), nullable=False),
+        sa.Column("exited", sa.Integer(), nullable=False),
+        sa.Column("rejected", sa.Integer(), nullable=False),
+        sa.Column("dwell_seconds", sa.Float(), nullable=False),
+        sa.PrimaryKeyConstraint("scope", "scope_id", "stage"),
+    )
+    op.create_table(
+        "funnel_dwell_buckets",
+        sa.Column("scope", sa.String(), nullable=False),
+        sa.Column("scope_id", sa.Integer(), nullable=False),
+        sa.Column("stage", application_stage, nullable=False),
+        sa.Column("bucket", sa.Integer(), nullable=False),
+        sa.Column("count", sa.Integer(), nullable=False),
+        sa.PrimaryKeyConstraint("scope", "scope_id", "stage", "bucket"),
+    )
+    watermarks = op.create_table(
+        "analytics_watermarks",
+        sa.Column("name", sa.String(), nullable=False),
+        sa.Column("last_id", sa.Integer(), nullable=False),
+        sa.Column("refreshed_at", sa.DateTime(), nullable=True),
+        sa.PrimaryKeyConstraint("name"),
+    )
+    # Existing history is folded in by the first refresh
+    op.bulk_insert(watermarks, [{"name": "application_history", "last_id": 0}])
+
+
+def downgrade():
+    op.drop_table("analytics_watermarks")
+    op.drop_table("funnel_dwell_buckets")
+    op.drop_table("funnel_stage_stats")
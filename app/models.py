@@ -5,8 +5,10 @@ from sqlalchemy import (
     Integer,
     String,
     DateTime,
+    Float,
     Enum as SqlEnum,
     ForeignKey,
+    Index,
     Text,
 )
 from sqlalchemy.orm import relationship
@@ -81,6 +83,14 @@ class Job(Base):
     company = relationship("Company", back_populates="jobs")
     applications = relationship("Application", back_populates="job")
 
+    # Keyset pagination filters on status / company and walks by id;
+    # recruiter views look jobs up by their creator
+    __table_args__ = (
+        Index("ix_jobs_status_id", "status", "id"),
+        Index("ix_jobs_company_id_id", "company_id", "id"),
+        Index("ix_jobs_created_by_id", "created_by_id"),
+    )
+
 
 class Application(Base):
     __tablename__ = "applications"
@@ -97,6 +107,13 @@ class Application(Base):
     job = relationship("Job", back_populates="applications")
     history = relationship("ApplicationHistory", back_populates="application")
 
+    # One application per candidate per job, enforced by the database.
+    # The unique index also serves the candidate_id lookups (leftmost column).
+    __table_args__ = (
+        Index("uq_applications_candidate_job", "candidate_id", "job_id", unique=True),
+        Index("ix_applications_job_id_stage", "job_id", "stage"),
+    )
+
 
 class ApplicationHistory(Base):
     __tablename__ = "application_history"
@@ -111,3 +128,69 @@ class ApplicationHistory(Base):
     changed_at = Column(DateTime, default=datetime.utcnow)
 
     application = relationship("Application", back_populates="history")
+
+    __table_args__ = (
+        Index("ix_application_history_application_id_changed_at", "application_id", "changed_at"),
+    )
+
+
+class JobStageCount(Base):
+    """Number of applications currently in each stage of a job, kept up to
+    date in the same transaction as every stage change."""
+
+    __tablename__ = "job_stage_counts"
+
+    job_id = Column(Integer, ForeignKey("jobs.id"), primary_key=True)
+    stage = Column(SqlEnum(ApplicationStage), primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class FunnelStageStat(Base):
+    """Funnel and time-in-stage totals for one stage of a job or a company
+    (scope "job" / "company"), built incrementally from application_history
+    by app/services/analytics_service.py."""
+
+    __tablename__ = "funnel_stage_stats"
+
+    scope = Column(String, primary_key=True)
+    scope_id = Column(Integer, primary_key=True)
+    stage = Column(SqlEnum(ApplicationStage), primary_key=True)
+    entered = Column(Integer, nullable=False, default=0)   # applications that reached the stage
+    exited = Column(Integer, nullable=False, default=0)    # ... and moved on from it
+    rejected = Column(Integer, nullable=False, default=0)  # ... moved on to Rejected
+    dwell_seconds = Column(Float, nullable=False, default=0.0)  # total time of the timed exits
+
+
+class FunnelDwellBucket(Base):
+    """Histogram of time spent in a stage before leaving it; bucket i holds
+    the exits of at most DWELL_BUCKET_SECONDS[i] (the last one is open)."""
+
+    __tablename__ = "funnel_dwell_buckets"
+
+    scope = Column(String, primary_key=True)
+    scope_id = Column(Integer, primary_key=True)
+    stage = Column(SqlEnum(ApplicationStage), primary_key=True)
+    bucket = Column(Integer, primary_key=True)
+    count = Column(Integer, nullable=False, default=0)
+
+
+class AnalyticsWatermark(Base):
+    """Last application_history id folded into the funnel tables."""
+
+    __tablename__ = "analytics_watermarks"
+
+    name = Column(String, primary_key=True)
+    last_id = Column(Integer, nullable=False, default=0)
+    refreshed_at = Column(DateTime, nullable=True)
+
+
+class OutboxMessage(Base):
+    """Notification written in the same transaction as the change that
+    caused it; the outbox relay moves it to the message queue afterwards."""
+
+    __tablename__ = "outbox"
+
+    id = Column(Integer, primary_key=True)
+    queue = Column(String, nullable=False)
+    payload = Column(Text, nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
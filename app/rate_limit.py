@@ -0,0 +1,241 @@
+import math
+import os
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, NamedTuple, Optional
+
+from fastapi import Depends, HTTPException, Request, status
+from redis.exceptions import RedisError
+
+from .auth import AuthUser, get_current_user
+from .database import DB_MAX_OVERFLOW, DB_POOL_SIZE
+from .metrics import rate_limit_backend_errors, rate_limit_rejections
+from .services.password_service import PASSWORD_HASH_MAX_PENDING
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+# Rates are "<requests>/<seconds>": a bucket of that many tokens that refills
+# evenly over that many seconds (so "20/60" allows a burst of 20, then one
+# every 3 s). An empty value or "0" turns that limit off.
+
+RATE_LIMIT_ENABLED = os.getenv("RATE_LIMIT_ENABLED", "1") == "1"
+
+# "1" shares buckets between API workers via Redis; otherwise each worker
+# keeps its own (so N workers allow up to N times the configured rate)
+RATE_LIMIT_REDIS = os.getenv("RATE_LIMIT_REDIS", "0") == "1"
+
+# Buckets kept per worker by the in-process backend (least recently used evicted)
+RATE_LIMIT_MAX_KEYS = int(os.getenv("RATE_LIMIT_MAX_KEYS", "100000"))
+
+# "1" when behind a reverse proxy: the client is the last X-Forwarded-For hop
+RATE_LIMIT_TRUST_PROXY = os.getenv("RATE_LIMIT_TRUST_PROXY", "0") == "1"
+
+AUTH_RATE_PER_CLIENT = os.getenv("AUTH_RATE_PER_CLIENT", "60/60")
+LOGIN_RATE_PER_EMAIL = os.getenv("LOGIN_RATE_PER_EMAIL", "10/300")
+# bcrypt calls in flight per worker; more would only queue behind the hasher
+LOGIN_MAX_CONCURRENT = int(os.getenv("LOGIN_MAX_CONCURRENT", str(PASSWORD_HASH_MAX_PENDING)))
+
+APPLICATIONS_RATE_PER_CLIENT = os.getenv("APPLICATIONS_RATE_PER_CLIENT", "600/60")
+APPLY_RATE_PER_USER = os.getenv("APPLY_RATE_PER_USER", "30/60")
+# Beyond the DB pool, extra applies only wait for a connection (and time out)
+APPLY_MAX_CONCURRENT = int(os.getenv("APPLY_MAX_CONCURRENT", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+REDIS_KEY_PREFIX = "ratelimit"
+
+
+class Rate(NamedTuple):
+    burst: int
+    per_second: float
+
+
+def parse_rate(spec: Optional[str]) -> Optional[Rate]:
+    if not spec or spec.strip() == "0":
+        return None
+    requests, _, seconds = spec.partition("/")
+    burst, period = int(requests), float(seconds or 1)
+    if burst <= 0 or period <= 0:
+        raise ValueError(f"Invalid rate {spec!r} (expected '<requests>/<seconds>')")
+    return Rate(burst=burst, per_second=burst / period)
+
+
+# -----------------------------
+# TOKEN BUCKET BACKENDS
+# -----------------------------
+
+class RateLimitBackend(ABC):
+
+    @abstractmethod
+    async def hit(self, key: str, rate: Rate) -> float:
+        """Take a token from key's bucket: 0 if one was available, otherwise
+        the seconds until one will be (nothing is taken)."""
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Buckets of this worker only. ``hit`` never awaits, so it is atomic
+    on the event loop without a lock."""
+
+    def __init__(self, max_keys: int):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, tuple[float, float]]" = OrderedDict()  # key -> (tokens, at)
+
+    async def hit(self, key, rate):
+        now = time.monotonic()
+        tokens, at = self._buckets.get(key, (rate.burst, now))
+        tokens = min(rate.burst, tokens + (now - at) * rate.per_second)
+
+        retry_after = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            retry_after = (1 - tokens) / rate.per_second
+
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+# One round trip per check, atomic across workers; Redis' clock is the only
+# clock, so skew between API hosts doesn't matter. Returns the wait in ms.
+_TOKEN_BUCKET_SCRIPT = """
+local burst = tonumber(ARGV[1])
+local per_ms = tonumber(ARGV[2]) / 1000
+local t = redis.call('TIME')
+local now = t[1] * 1000 + math.floor(t[2] / 1000)
+
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'at')
+local tokens = tonumber(state[1]) or burst
+local at = tonumber(state[2]) or now
+tokens = math.min(burst, tokens + math.max(0, now - at) * per_ms)
+
+local wait = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+else
+    wait = math.ceil((1 - tokens) / per_ms)
+end
+
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'at', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(burst / per_ms))
+return wait
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+
+    def __init__(self, client):
+        self._script = client.register_script(_TOKEN_BUCKET_SCRIPT)
+
+    async def hit(self, key, rate):
+        wait_ms = await self._script(keys=[f"{REDIS_KEY_PREFIX}:{key}"], args=[rate.burst, rate.per_second])
+        return int(wait_ms) / 1000
+
+
+def _build_backend() -> RateLimitBackend:
+    if RATE_LIMIT_REDIS:
+        from .services.queue_backend import get_async_redis
+        return RedisRateLimitBackend(get_async_redis())
+    return InMemoryRateLimitBackend(RATE_LIMIT_MAX_KEYS)
+
+
+rate_limit_backend = _build_backend()
+
+
+# -----------------------------
+# DEPENDENCIES
+# -----------------------------
+# Routers attach these per router or per route, e.g.
+#
+#     router = APIRouter(dependencies=[Depends(client_limit("auth", AUTH_RATE_PER_CLIENT))])
+#     @router.post("/login", dependencies=[Depends(concurrency_limit("login", LOGIN_MAX_CONCURRENT))])
+#
+# Rejections are cheap and immediate: 429 when a bucket is empty, 503 when a
+# route is at its concurrency cap, both with Retry-After.
+
+def client_address(request: Request) -> str:
+    if RATE_LIMIT_TRUST_PROXY:
+        forwarded = request.headers.get("x-forwarded-for")
+        if forwarded:
+            return forwarded.rsplit(",", 1)[-1].strip()
+    return request.client.host if request.client else "unknown"
+
+
+async def _no_limit():
+    return None
+
+
+async def _check(name: str, key: str, rate: Rate) -> None:
+    try:
+        retry_after = await rate_limit_backend.hit(f"{name}:{key}", rate)
+    except RedisError:
+        # Fail open: losing the limiter must not take the API down with it
+        rate_limit_backend_errors.inc()
+        return
+
+    if retry_after > 0:
+        rate_limit_rejections.inc(name, "rate")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail="Too many requests, please retry later.",
+            headers={"Retry-After": str(max(1, math.ceil(retry_after)))},
+        )
+
+
+def key_limit(name: str, spec: Optional[str], key: Callable[[Request], Optional[str]]):
+    """One bucket per key(request); requests it maps to None aren't limited."""
+    rate = parse_rate(spec)
+    if not RATE_LIMIT_ENABLED or rate is None:
+        return _no_limit
+
+    async def limit(request: Request):
+        value = key(request)
+        if value is not None:
+            await _check(name, value, rate)
+
+    return limit
+
+
+def client_limit(name: str, spec: Optional[str]):
+    """One bucket per client address."""
+    return key_limit(name, spec, client_address)
+
+
+def user_limit(name: str, spec: Optional[str]):
+    """One bucket per authenticated user (reuses the route's get_current_user)."""
+    rate = parse_rate(spec)
+    if not RATE_LIMIT_ENABLED or rate is None:
+        return _no_limit
+
+    async def limit(user: AuthUser = Depends(get_current_user)):
+        await _check(name, str(user.id), rate)
+
+    return limit
+
+
+def concurrency_limit(name: str, max_concurrent: int):
+    """At most max_concurrent requests of this route in flight per worker."""
+    if not RATE_LIMIT_ENABLED or max_concurrent <= 0:
+        return _no_limit
+
+    active = 0
+
+    async def limit():
+        nonlocal active
+        if active >= max_concurrent:
+            rate_limit_rejections.inc(name, "concurrency")
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Server is busy, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+        active += 1
+        try:
+            yield
+        finally:
+            active -= 1
+
+    return limit
@@ -0,0 +1,46 @@
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth import AuthUser, require_role
+from ..database import get_read_db
+from ..models import Job, UserRole
+from ..schemas import FunnelAnalytics
+from ..services.analytics_service import AnalyticsService
+
+router = APIRouter(prefix="/analytics", tags=["Analytics"])
+
+
+# -----------------------------
+# FUNNEL / TIME IN STAGE (Recruiter only)
+# -----------------------------
+# Served from the pre-aggregated funnel tables, so a response costs a few
+# primary-key reads; refreshed_at says how current they are.
+
+@router.get("/jobs/{job_id}", response_model=FunnelAnalytics)
+async def job_funnel(
+    job_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
+):
+    created_by_id = (await db.execute(select(Job.created_by_id).where(Job.id == job_id))).scalar_one_or_none()
+
+    if created_by_id is None:
+        raise HTTPException(404, "Job not found")
+
+    if created_by_id != current_user.id:
+        raise HTTPException(403, "Not enough permissions")
+
+    return await AnalyticsService.funnel(db, "job", job_id)
+
+
+@router.get("/companies/{company_id}", response_model=FunnelAnalytics)
+async def company_funnel(
+    company_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
+):
+    if current_user.company_id != company_id:
+        raise HTTPException(403, "Not enough permissions")
+
+    return await AnalyticsService.funnel(db, "company", company_id)
@@ -1,50 +1,113 @@
-from fastapi import APIRouter, Depends
-from sqlalchemy.orm import Session
+from typing import Optional
 
-from ..database import get_db
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy import and_, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_read_db
 from ..auth import get_current_user, require_role
-from ..models import UserRole, ApplicationHistory
+from ..models import UserRole, Application, ApplicationHistory, Job
+from ..schemas import ApplicationHistoryOut, ApplicationHistoryPage
 
 router = APIRouter(prefix="/history", tags=["Application History"])
 
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+
+# -----------------------------
+# ONE PAGE OF HISTORY, OLDEST FIRST
+# -----------------------------
+# Only the columns of ApplicationHistoryOut are selected, ordered by
+# (changed_at, id) and served from ix_application_history_application_id_changed_at.
+# The cursor is the id of the last row of the previous page.
+
+def _history_page_query(application_id: int, cursor: Optional[int], limit: int):
+    query = select(
+        ApplicationHistory.id,
+        ApplicationHistory.application_id,
+        ApplicationHistory.old_stage,
+        ApplicationHistory.new_stage,
+        ApplicationHistory.changed_by_id,
+        ApplicationHistory.changed_at,
+    ).where(ApplicationHistory.application_id == application_id)
+
+    if cursor is not None:
+        cursor_changed_at = (
+            select(ApplicationHistory.changed_at)
+            .where(ApplicationHistory.id == cursor)
+            .scalar_subquery()
+        )
+        query = query.where(or_(
+            ApplicationHistory.changed_at > cursor_changed_at,
+            and_(ApplicationHistory.changed_at == cursor_changed_at, ApplicationHistory.id > cursor),
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    return query.order_by(ApplicationHistory.changed_at, ApplicationHistory.id).limit(limit + 1)
+
+
+def _to_page(rows, limit: int) -> ApplicationHistoryPage:
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = rows[-1].id
+
+    return ApplicationHistoryPage(
+        items=[ApplicationHistoryOut.model_validate(row) for row in rows],
+        next_cursor=next_cursor,
+    )
+
 
 # -----------------------------
 # VIEW HISTORY FOR ONE APPLICATION
 # -----------------------------
-@router.get("/application/{application_id}")
-def get_history_for_application(
+@router.get("/application/{application_id}", response_model=ApplicationHistoryPage)
+async def get_history_for_application(
     application_id: int,
-    db: Session = Depends(get_db),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
     recruiter = Depends(require_role(UserRole.RECRUITER))
 ):
-    history = db.query(ApplicationHistory).filter(
-        ApplicationHistory.application_id == application_id
-    ).all()
+    # SECURITY CHECK folded into the same query: rows only come back
+    # when the application is on a job this recruiter created
+    query = (
+        _history_page_query(application_id, cursor, limit)
+        .join(Application, Application.id == ApplicationHistory.application_id)
+        .join(Job, and_(Job.id == Application.job_id, Job.created_by_id == recruiter.id))
+    )
+    rows = (await db.execute(query)).all()
 
-    return history
+    # An empty first page means it doesn't exist or isn't on our jobs
+    if not rows and cursor is None:
+        raise HTTPException(status_code=404, detail="Application not found")
+
+    return _to_page(rows, limit)
 
 
 # -----------------------------
 # CANDIDATE VIEW OWN APPLICATION HISTORY
 # -----------------------------
-@router.get("/me/{application_id}")
-def get_my_history(
+@router.get("/me/{application_id}", response_model=ApplicationHistoryPage)
+async def get_my_history(
     application_id: int,
-    db: Session = Depends(get_db),
+    cursor: Optional[int] = Query(None, description="next_cursor from the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
     user = Depends(get_current_user)
 ):
-    history = db.query(ApplicationHistory).filter(
-        ApplicationHistory.application_id == application_id
-    ).all()
-
-    # SECURITY CHECK
-    if not history:
-        return []
-
-    # Ensure candidate owns this application
-    app_user_id = history[0].application.candidate_id
+    # SECURITY CHECK folded into the same query: rows only come back
+    # when the application belongs to this candidate
+    query = _history_page_query(application_id, cursor, limit).join(
+        Application,
+        and_(Application.id == ApplicationHistory.application_id, Application.candidate_id == user.id),
+    )
+    rows = (await db.execute(query)).all()
 
-    if app_user_id != user.id:
-        return {"detail": "Not your application"}
+    # Every application has at least its "Applied" entry, so an empty first
+    # page means it doesn't exist or isn't ours (deliberately indistinguishable)
+    if not rows and cursor is None:
+        raise HTTPException(status_code=404, detail="Application not found")
 
-    return history
+    return _to_page(rows, limit)
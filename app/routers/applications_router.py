@@ -1,25 +1,67 @@
+from typing import Literal
+
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.responses import StreamingResponse
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..auth import get_current_user, require_role
 from ..models import UserRole, ApplicationStage, Job, Application
+from ..rate_limit import (
+    APPLICATIONS_RATE_PER_CLIENT,
+    APPLY_MAX_CONCURRENT,
+    APPLY_RATE_PER_USER,
+    client_limit,
+    concurrency_limit,
+    user_limit,
+)
 from ..services.application_service import ApplicationService
-from ..schemas import ApplicationOut
+from ..services.export_service import EXPORT_MEDIA_TYPES, ExportService
+from ..services.recommendation_service import RecommendationService
+from ..services.stage_events import stage_event_hub
+from ..schemas import ApplicationOut, BulkStageUpdate, BulkStageUpdateResult, RankedApplication
 
-router = APIRouter(prefix="/applications", tags=["Applications"])
+router = APIRouter(
+    prefix="/applications",
+    tags=["Applications"],
+    dependencies=[Depends(client_limit("applications", APPLICATIONS_RATE_PER_CLIENT))],
+)
 
 
 # -----------------------------
 # CANDIDATE APPLIES TO A JOB
 # -----------------------------
-@router.post("/", response_model=ApplicationOut)
-def apply_to_job(
+@router.post(
+    "/",
+    response_model=ApplicationOut,
+    dependencies=[
+        Depends(user_limit("apply", APPLY_RATE_PER_USER)),
+        Depends(concurrency_limit("apply", APPLY_MAX_CONCURRENT)),
+    ],
+)
+async def apply_to_job(
     job_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     candidate = Depends(require_role(UserRole.CANDIDATE))
 ):
-    return ApplicationService.apply_to_job(db, candidate, job_id)
+    return await ApplicationService.apply_to_job(db, candidate, job_id)
+
+
+
+# -----------------------------
+# RECRUITER MOVES MANY APPLICATIONS AT ONCE
+# (declared before /{application_id}/stage so "bulk" is not read as an id)
+# -----------------------------
+@router.patch("/bulk/stage", response_model=BulkStageUpdateResult)
+async def bulk_change_stage(
+    payload: BulkStageUpdate,
+    db: AsyncSession = Depends(get_db),
+    recruiter = Depends(require_role(UserRole.RECRUITER)),
+):
+    results = await ApplicationService.bulk_update_stage(db, recruiter, payload.changes)
+    updated = sum(1 for result in results if result.success)
+    return BulkStageUpdateResult(updated=updated, failed=len(results) - updated, results=results)
 
 
 
@@ -27,13 +69,13 @@ def apply_to_job(
 # RECRUITER UPDATES APPLICATION STAGE
 # -----------------------------
 @router.patch("/{application_id}/stage")
-def change_stage(
+async def change_stage(
     application_id: int,
     new_stage: ApplicationStage = Query(..., description="New stage for the application"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_db),
     recruiter = Depends(require_role(UserRole.RECRUITER)),
 ):
-    return ApplicationService.update_stage(db, recruiter, application_id, new_stage)
+    return await ApplicationService.update_stage(db, recruiter, application_id, new_stage)
 
 
 
@@ -41,13 +83,13 @@ def change_stage(
 # VIEW APPLICATIONS FOR A JOB (Recruiter only)
 # -----------------------------
 @router.get("/job/{job_id}", response_model=list[ApplicationOut])
-def list_applications_for_job(
+async def list_applications_for_job(
     job_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_read_db),
     recruiter = Depends(require_role(UserRole.RECRUITER))
 ):
     # 1. Check job exists
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = (await db.execute(select(Job).where(Job.id == job_id))).scalar_one_or_none()
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -56,7 +98,27 @@ def list_applications_for_job(
         raise HTTPException(status_code=403, detail="Not enough permissions")
 
     # 3. Return applications for this job only
-    return db.query(Application).filter(Application.job_id == job_id).all()
+    result = await db.execute(select(Application).where(Application.job_id == job_id))
+    return result.scalars().all()
+
+
+# -----------------------------
+# APPLICATIONS FOR A JOB, BEST MATCH FIRST (Recruiter only)
+# -----------------------------
+@router.get("/job/{job_id}/ranked", response_model=list[RankedApplication])
+async def rank_applications_for_job(
+    job_id: int,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_read_db),
+    recruiter = Depends(require_role(UserRole.RECRUITER))
+):
+    created_by_id = (await db.execute(select(Job.created_by_id).where(Job.id == job_id))).scalar_one_or_none()
+    if created_by_id is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    if created_by_id != recruiter.id:
+        raise HTTPException(status_code=403, detail="Not enough permissions")
+
+    return await RecommendationService.rank_applications(db, job_id, limit)
 
 
 
@@ -64,38 +126,59 @@ def list_applications_for_job(
 # VIEW CANDIDATE'S OWN APPLICATIONS
 # -----------------------------
 @router.get("/me", response_model=list[ApplicationOut])
-def list_my_applications(
-    db: Session = Depends(get_db),
+async def list_my_applications(
+    db: AsyncSession = Depends(get_read_db),
     user = Depends(get_current_user)
 ):
-    return db.query(Application).filter(Application.candidate_id == user.id).all()
+    result = await db.execute(select(Application).where(Application.candidate_id == user.id))
+    return result.scalars().all()
+
+
+# -----------------------------
+# LIVE STAGE CHANGES FOR THE CANDIDATE (SERVER-SENT EVENTS)
+# -----------------------------
+@router.get("/me/events")
+async def stream_my_stage_events(
+    db: AsyncSession = Depends(get_read_db),
+    candidate = Depends(require_role(UserRole.CANDIDATE))
+):
+    # Same session get_current_user used; give its connection back to the
+    # pool now instead of holding it for the life of the stream
+    await db.close()
+
+    stage_event_hub.check_capacity(candidate.id)
+    return StreamingResponse(
+        stage_event_hub.stream(candidate.id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 
 # -----------------------------
 # GET ALL APPLICATIONS FOR RECRUITER WITH CANDIDATE DETAILS
 # -----------------------------
 @router.get("/recruiter/all")
-def get_all_applications_for_recruiter(
-    db: Session = Depends(get_db),
+async def get_all_applications_for_recruiter(
+    db: AsyncSession = Depends(get_read_db),
     recruiter = Depends(require_role(UserRole.RECRUITER))
 ):
     from ..models import Application, Job, User
 
     # Get jobs created by this recruiter
-    jobs = db.query(Job).filter(Job.created_by_id == recruiter.id).all()
-    job_ids = [job.id for job in jobs]
+    job_ids = (await db.execute(select(Job.id).where(Job.created_by_id == recruiter.id))).scalars().all()
 
     if not job_ids:
         return []
 
     # Get applications for these jobs
     applications = (
-        db.query(Application, User, Job)
-        .join(User, Application.candidate_id == User.id)
-        .join(Job, Application.job_id == Job.id)
-        .filter(Application.job_id.in_(job_ids))
-        .all()
-    )
+        await db.execute(
+            select(Application, User, Job)
+            .join(User, Application.candidate_id == User.id)
+            .join(Job, Application.job_id == Job.id)
+            .where(Application.job_id.in_(job_ids))
+        )
+    ).all()
 
     result = []
     for app, user, job in applications:
@@ -112,3 +195,18 @@ def get_all_applications_for_recruiter(
         })
 
     return result
+
+
+# -----------------------------
+# STREAMING EXPORT OF ALL RECRUITER APPLICATIONS (CSV / NDJSON)
+# -----------------------------
+@router.get("/recruiter/export")
+async def export_applications_for_recruiter(
+    format: Literal["csv", "ndjson"] = "csv",
+    recruiter = Depends(require_role(UserRole.RECRUITER))
+):
+    return StreamingResponse(
+        ExportService.stream_recruiter_applications(recruiter.id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="applications.{format}"'},
+    )
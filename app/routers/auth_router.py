@@ -1,18 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy.orm import Session
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Request
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 from datetime import timedelta
 
-from ..database import get_db
+from ..database import get_db, get_read_db
 from ..models import User
 from ..schemas import UserCreate, UserOut, Token
 from ..auth import (
-    hash_password,
-    verify_password,
     create_access_token,
+    user_claims,
     ACCESS_TOKEN_EXPIRE_MINUTES
 )
+from ..rate_limit import (
+    AUTH_RATE_PER_CLIENT,
+    LOGIN_MAX_CONCURRENT,
+    LOGIN_RATE_PER_EMAIL,
+    client_limit,
+    concurrency_limit,
+    key_limit,
+)
+from ..services.password_service import password_hasher
+
+# Every auth route is bcrypt-bound, so each client gets one shared budget
+router = APIRouter(
+    prefix="/auth",
+    tags=["Auth"],
+    dependencies=[Depends(client_limit("auth", AUTH_RATE_PER_CLIENT))],
+)
+
 
-router = APIRouter(prefix="/auth", tags=["Auth"])
+def _login_email(request: Request) -> Optional[str]:
+    email = request.query_params.get("email", "").strip().lower()
+    return email or None
 
 
 # -----------------------------
@@ -20,23 +42,33 @@ router = APIRouter(prefix="/auth", tags=["Auth"])
 # -----------------------------
 
 @router.post("/register", response_model=UserOut)
-def register_user(data: UserCreate, db: Session = Depends(get_db)):
-
-    existing = db.query(User).filter(User.email == data.email).first()
+async def register_user(
+    data: UserCreate,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+):
+    # Checked on the read session so no write transaction is open while bcrypt runs
+    existing = (await read_db.execute(select(User.id).where(User.email == data.email))).first()
     if existing:
         raise HTTPException(400, "Email already registered")
 
+    # bcrypt runs in the password worker pool, never on the API worker
     user = User(
         email=data.email,
         full_name=data.full_name,
-        hashed_password=hash_password(data.password),
+        hashed_password=await password_hasher.hash(data.password),
         role=data.role,
         company_id=data.company_id
     )
 
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    try:
+        await db.commit()
+    except IntegrityError:
+        # Registered concurrently (or the replica hadn't caught up yet)
+        await db.rollback()
+        raise HTTPException(400, "Email already registered")
+    await db.refresh(user)
 
     return user
 
@@ -45,13 +77,35 @@ def register_user(data: UserCreate, db: Session = Depends(get_db)):
 # LOGIN
 # -----------------------------
 
-@router.post("/login", response_model=Token)
-def login(email: str, password: str, db: Session = Depends(get_db)):
+# Per-email buckets slow down password guessing spread over many clients;
+# the concurrency cap sheds load before it queues behind the bcrypt pool
+@router.post(
+    "/login",
+    response_model=Token,
+    dependencies=[
+        Depends(key_limit("login", LOGIN_RATE_PER_EMAIL, _login_email)),
+        Depends(concurrency_limit("login", LOGIN_MAX_CONCURRENT)),
+    ],
+)
+async def login(
+    email: str,
+    password: str,
+    db: AsyncSession = Depends(get_db),
+    read_db: AsyncSession = Depends(get_read_db),
+):
+    user = (await read_db.execute(select(User).where(User.email == email))).scalar_one_or_none()
+    if not user:
+        raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    user = db.query(User).filter(User.email == email).first()
-    if not user or not verify_password(password, user.hashed_password):
+    valid, new_hash = await password_hasher.verify_and_update(password, user.hashed_password)
+    if not valid:
         raise HTTPException(status_code=401, detail="Invalid credentials")
 
-    token = create_access_token({"sub": str(user.id)}, timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # Stored hash used an old bcrypt cost: upgrade it transparently
+    if new_hash:
+        await db.execute(update(User).where(User.id == user.id).values(hashed_password=new_hash))
+        await db.commit()
+
+    token = create_access_token(user_claims(user), timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
 
     return Token(access_token=token)
@@ -0,0 +1,39 @@
+from typing import Literal
+
+from fastapi import APIRouter, Depends, Request
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..auth import AuthUser, require_role
+from ..database import get_db
+from ..models import UserRole
+from ..schemas import ImportReport
+from ..services.import_service import ImportService
+
+router = APIRouter(prefix="/import", tags=["Import"])
+
+
+# -----------------------------
+# BULK IMPORT (Recruiter only)
+# -----------------------------
+# The request body is the file itself (CSV with a header row, or one JSON
+# object per line), streamed and imported in batches; the report lists the
+# rows that were skipped and why.
+
+@router.post("/jobs", response_model=ImportReport)
+async def import_jobs(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
+):
+    return await ImportService.import_jobs(db, request.stream(), format, current_user.id)
+
+
+@router.post("/users", response_model=ImportReport)
+async def import_users(
+    request: Request,
+    format: Literal["csv", "ndjson"] = "csv",
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
+):
+    return await ImportService.import_users(db, request.stream(), format)
@@ -1,24 +1,34 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from typing import Literal, Optional
 
-from ..database import get_db
-from ..models import Job, UserRole
-from ..schemas import JobCreate, JobOut
-from ..auth import require_role, get_current_user
-from ..models import User
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import get_db, get_read_db
+from ..models import Job, JobStatus, UserRole
+from ..schemas import JobCreate, JobOut, JobPage, JobPipeline, PipelineSummary, ScoredJob
+from ..auth import AuthUser, require_role, get_current_user
+from ..services.search_service import JobSearchService
+from ..services.pipeline_service import PipelineService
+from ..services.analytics_service import AnalyticsService
+from ..services.job_cache import job_cache, listing_scopes
+from ..services.recommendation_service import RecommendationService, job_match_index
 
 router = APIRouter(prefix="/jobs", tags=["Jobs"])
 
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
 
 # -----------------------------
 # CREATE JOB (Recruiter only)
 # -----------------------------
 
 @router.post("/", response_model=JobOut)
-def create_job(
+async def create_job(
     job: JobCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(UserRole.RECRUITER))
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
 ):
     new_job = Job(
         title=job.title,
@@ -28,18 +38,157 @@ def create_job(
     )
 
     db.add(new_job)
-    db.commit()
-    db.refresh(new_job)
+    await db.flush()  # get new_job.id
+    await JobSearchService.index_job(db, new_job)
+    index_event = RecommendationService.index_job(db, new_job)
+    await db.commit()
+    await db.refresh(new_job)
+
+    job_match_index.apply(index_event)
+    await job_cache.invalidate(listing_scopes(new_job.status, new_job.company_id))
     return new_job
 
 
 # -----------------------------
-# GET ALL JOBS (Public)
+# LIST JOBS (Public, keyset paginated, cached with ETag)
+# -----------------------------
+# Cached routes build from the primary, not the read replica: a lagging
+# replica would refill the cache with pre-write rows under the generation
+# the write just bumped, and serve them until the TTL. Cache hits never
+# open a connection, so only misses reach the primary.
+
+@router.get("/", response_model=JobPage)
+async def list_jobs(
+    request: Request,
+    cursor: Optional[int] = Query(None, description="Job id returned as next_cursor by the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[JobStatus] = None,
+    company_id: Optional[int] = None,
+    order: Literal["asc", "desc"] = "asc",
+    db: AsyncSession = Depends(get_db)
+):
+    scope = ("list", status.value if status else None, company_id)
+    return await job_cache.respond(
+        request,
+        scope,
+        (cursor, limit, order),
+        lambda: _list_jobs_page(db, cursor, limit, status, company_id, order),
+    )
+
+
+async def _list_jobs_page(db, cursor, limit, status, company_id, order) -> JobPage:
+    query = select(Job)
+
+    if status is not None:
+        query = query.where(Job.status == status)
+    if company_id is not None:
+        query = query.where(Job.company_id == company_id)
+
+    # Seek past the cursor instead of OFFSET so every page costs the same
+    if order == "asc":
+        if cursor is not None:
+            query = query.where(Job.id > cursor)
+        query = query.order_by(Job.id.asc())
+    else:
+        if cursor is not None:
+            query = query.where(Job.id < cursor)
+        query = query.order_by(Job.id.desc())
+
+    # Fetch one extra row to know whether another page exists
+    jobs = (await db.execute(query.limit(limit + 1))).scalars().all()
+
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = jobs[-1].id
+
+    return JobPage(items=jobs, next_cursor=next_cursor)
+
+
+# -----------------------------
+# FULL-TEXT JOB SEARCH (Public, ranked)
+# -----------------------------
+
+@router.get("/search", response_model=JobPage)
+async def search_jobs(
+    q: str = Query(..., min_length=1, max_length=200),
+    cursor: int = Query(0, ge=0, description="Offset returned as next_cursor by the previous page"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    status: Optional[JobStatus] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    jobs = await JobSearchService.search(db, q, limit + 1, offset=cursor, status=status)
+
+    next_cursor = None
+    if len(jobs) > limit:
+        jobs = jobs[:limit]
+        next_cursor = cursor + limit
+
+    return JobPage(items=jobs, next_cursor=next_cursor)
+
+
+# -----------------------------
+# RECOMMENDED JOBS (Candidate only)
+# -----------------------------
+
+@router.get("/recommended", response_model=list[ScoredJob])
+async def recommended_jobs(
+    q: Optional[str] = Query(None, max_length=200, description="What the candidate is looking for"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthUser = Depends(require_role(UserRole.CANDIDATE))
+):
+    return await RecommendationService.recommend_jobs(db, current_user.id, q, limit)
+
+
+# -----------------------------
+# PIPELINE COUNTS (Recruiter only)
+# -----------------------------
+
+@router.get("/pipeline/summary", response_model=PipelineSummary)
+async def recruiter_pipeline_summary(
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
+):
+    stages = await PipelineService.recruiter_pipeline(db, current_user.id)
+    return PipelineSummary(stages=stages, total=sum(stages.values()))
+
+
+@router.get("/{job_id}/pipeline", response_model=JobPipeline)
+async def job_pipeline(
+    job_id: int,
+    db: AsyncSession = Depends(get_read_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
+):
+    created_by_id = (await db.execute(select(Job.created_by_id).where(Job.id == job_id))).scalar_one_or_none()
+
+    if created_by_id is None:
+        raise HTTPException(404, "Job not found")
+
+    if created_by_id != current_user.id:
+        raise HTTPException(403, "Not enough permissions")
+
+    stages = await PipelineService.job_pipeline(db, job_id)
+    return JobPipeline(job_id=job_id, stages=stages, total=sum(stages.values()))
+
+
+# -----------------------------
+# GET ONE JOB (Public, cached with ETag)
 # -----------------------------
 
-@router.get("/", response_model=list[JobOut])
-def list_jobs(db: Session = Depends(get_db)):
-    return db.query(Job).all()
+@router.get("/{job_id}", response_model=JobOut)
+async def get_job(
+    job_id: int,
+    request: Request,
+    db: AsyncSession = Depends(get_db)
+):
+    async def build():
+        job = (await db.execute(select(Job).where(Job.id == job_id))).scalar_one_or_none()
+        if not job:
+            raise HTTPException(404, "Job not found")
+        return JobOut.model_validate(job)
+
+    return await job_cache.respond(request, ("job", job_id), None, build)
 
 
 # -----------------------------
@@ -47,13 +196,13 @@ def list_jobs(db: Session = Depends(get_db)):
 # -----------------------------
 
 @router.put("/{job_id}", response_model=JobOut)
-def update_job(
+async def update_job(
     job_id: int,
     updated: JobCreate,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(UserRole.RECRUITER))
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
 ):
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = (await db.execute(select(Job).where(Job.id == job_id))).scalar_one_or_none()
 
     if not job:
         raise HTTPException(404, "Job not found")
@@ -61,12 +210,20 @@ def update_job(
     if job.created_by_id != current_user.id:
         raise HTTPException(403, "You cannot edit a job you did not create")
 
+    # The job may move between company listings
+    stale_scopes = [("job", job.id), *listing_scopes(job.status, job.company_id)]
+
     job.title = updated.title
     job.description = updated.description
     job.company_id = updated.company_id
+    await JobSearchService.index_job(db, job)
+    index_event = RecommendationService.index_job(db, job)
 
-    db.commit()
-    db.refresh(job)
+    await db.commit()
+    await db.refresh(job)
+
+    job_match_index.apply(index_event)
+    await job_cache.invalidate([*stale_scopes, *listing_scopes(job.status, job.company_id)])
     return job
 
 
@@ -75,12 +232,12 @@ def update_job(
 # -----------------------------
 
 @router.delete("/{job_id}")
-def delete_job(
+async def delete_job(
     job_id: int,
-    db: Session = Depends(get_db),
-    current_user: User = Depends(require_role(UserRole.RECRUITER))
+    db: AsyncSession = Depends(get_db),
+    current_user: AuthUser = Depends(require_role(UserRole.RECRUITER))
 ):
-    job = db.query(Job).filter(Job.id == job_id).first()
+    job = (await db.execute(select(Job).where(Job.id == job_id))).scalar_one_or_none()
 
     if not job:
         raise HTTPException(404, "Job not found")
@@ -88,6 +245,15 @@ def delete_job(
     if job.created_by_id != current_user.id:
         raise HTTPException(403, "You cannot delete another recruiter's job")
 
-    db.delete(job)
-    db.commit()
+    await JobSearchService.remove_job(db, job.id)
+    await PipelineService.remove_job(db, job.id)
+    await AnalyticsService.remove_job(db, job.id)
+    index_event = RecommendationService.remove_job(db, job.id)
+    stale_scopes = [("job", job.id), *listing_scopes(job.status, job.company_id)]
+
+    await db.delete(job)
+    await db.commit()
+
+    job_match_index.apply(index_event)
+    await job_cache.invalidate(stale_scopes)
     return {"message": "Job deleted"}
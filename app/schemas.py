@@ -1,4 +1,4 @@
-from pydantic import BaseModel, EmailStr
+from pydantic import BaseModel, EmailStr, Field
 from typing import Optional
 from .models import UserRole
 
@@ -49,6 +49,15 @@ class JobOut(BaseModel):
         from_attributes = True
 
 
+class JobPage(BaseModel):
+    items: list[JobOut]
+    next_cursor: Optional[int] = None
+
+
+class ScoredJob(JobOut):
+    score: float
+
+
 from datetime import datetime
 from .models import ApplicationStage
 
@@ -62,5 +71,104 @@ class ApplicationOut(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class RankedApplication(ApplicationOut):
+    score: float
+
+
+class ApplicationHistoryOut(BaseModel):
+    id: int
+    application_id: int
+    old_stage: Optional[ApplicationStage]
+    new_stage: ApplicationStage
+    changed_by_id: int
+    changed_at: datetime
+
+    class Config:
+        from_attributes = True
+
+
+class ApplicationHistoryPage(BaseModel):
+    items: list[ApplicationHistoryOut]
+    next_cursor: Optional[int] = None
+
+
 class ApplicationStageUpdate(BaseModel):
-    new_stage: ApplicationStage
\ No newline at end of file
+    new_stage: ApplicationStage
+
+
+MAX_BULK_STAGE_CHANGES = 500
+
+
+class StageChange(BaseModel):
+    application_id: int
+    new_stage: ApplicationStage
+
+
+class BulkStageUpdate(BaseModel):
+    changes: list[StageChange] = Field(..., min_length=1, max_length=MAX_BULK_STAGE_CHANGES)
+
+
+class StageChangeResult(BaseModel):
+    application_id: int
+    success: bool
+    old_stage: Optional[ApplicationStage] = None
+    new_stage: Optional[ApplicationStage] = None
+    error: Optional[str] = None
+
+
+class BulkStageUpdateResult(BaseModel):
+    updated: int
+    failed: int
+    results: list[StageChangeResult]
+
+
+class JobPipeline(BaseModel):
+    job_id: int
+    stages: dict[ApplicationStage, int]
+    total: int
+
+
+class PipelineSummary(BaseModel):
+    stages: dict[ApplicationStage, int]
+    total: int
+
+
+class ImportRowError(BaseModel):
+    row: int
+    error: str
+
+
+class ImportReport(BaseModel):
+    rows: int
+    imported: int
+    failed: int
+    errors: list[ImportRowError]
+    errors_truncated: bool = False
+
+
+class DwellBucket(BaseModel):
+    le_hours: Optional[float]  # None: longer than every other bucket
+    count: int
+
+
+class StageAnalytics(BaseModel):
+    stage: ApplicationStage
+    entered: int
+    exited: int
+    rejected: int
+    conversion_from_applied: Optional[float]
+    conversion_to_next: Optional[float]
+    timed_exits: int
+    mean_hours: Optional[float]
+    median_hours: Optional[float]
+    p90_hours: Optional[float]
+    dwell_buckets: list[DwellBucket]
+
+
+class FunnelAnalytics(BaseModel):
+    scope: str
+    scope_id: int
+    stages: list[StageAnalytics]
+    refreshed_at: Optional[datetime]
@@ -0,0 +1,375 @@
+import argparse
+import os
+import time
+from datetime import datetime, timedelta
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import DateTime, delete, func, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal, conflict_insert
+from ..models import (
+    AnalyticsWatermark,
+    Application,
+    ApplicationHistory,
+    ApplicationStage,
+    FunnelDwellBucket,
+    FunnelStageStat,
+    Job,
+)
+from ..schemas import DwellBucket, FunnelAnalytics, StageAnalytics
+from .state_machine import TRANSITIONS
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+# History rows folded into the funnel tables per transaction
+ANALYTICS_BATCH_SIZE = int(os.getenv("ANALYTICS_BATCH_SIZE", "5000"))
+
+# Seconds the refresher sleeps once it has caught up
+ANALYTICS_REFRESH_INTERVAL = float(os.getenv("ANALYTICS_REFRESH_INTERVAL", "30"))
+
+# History younger than this waits for the next refresh, so a transaction that
+# took a lower id but commits a little later is not skipped by the watermark
+ANALYTICS_SETTLE_SECONDS = float(os.getenv("ANALYTICS_SETTLE_SECONDS", "5"))
+
+HOUR = 3600
+DAY = 24 * HOUR
+
+# Upper bounds of the time-in-stage buckets; one more bucket holds the rest
+DWELL_BUCKET_SECONDS = (HOUR, 6 * HOUR, DAY, 3 * DAY, 7 * DAY, 14 * DAY, 30 * DAY, 90 * DAY)
+
+HISTORY_WATERMARK = "application_history"
+
+STAGES = list(ApplicationStage)
+_STAGE_INDEX = {stage: i for i, stage in enumerate(STAGES)}
+_REJECTED = _STAGE_INDEX[ApplicationStage.REJECTED]
+
+# Where an application goes from each stage when it isn't rejected
+_NEXT_STAGE = {
+    stage: next((target for target in targets if target != ApplicationStage.REJECTED), None)
+    for stage, targets in TRANSITIONS.items()
+}
+
+
+# -----------------------------
+# INCREMENTAL REFRESH
+# -----------------------------
+# application_history is append-only, so the funnel tables are totals that
+# only ever grow: each refresh reads the rows after the watermark, pairs every
+# transition with the one before it (LAG over the application's history, so
+# the earlier row may be from an old batch), adds the batch's totals with
+# ON CONFLICT DO UPDATE and moves the watermark in the same transaction.
+# Reads are then a handful of primary-key rows, however long the history.
+#
+# The refresher runs as its own process (in the API process with
+# QUEUE_BACKEND=memory). To recompute everything, e.g. after editing history
+# by hand, stop it and run:
+#
+#     python -m app.services.analytics_service --rebuild
+
+def _history_batch(db: Session, after_id: int, batch_size: int, settled_before: datetime):
+    """(ids of the next batch, its transitions as (job_id, company_id,
+    old_stage, new_stage, changed_at, entered_at)). entered_at is when the
+    application reached old_stage, None if that wasn't recorded."""
+    history = ApplicationHistory
+    ids = db.execute(
+        select(history.id)
+        .where(history.id > after_id, history.changed_at <= settled_before)
+        .order_by(history.id)
+        .limit(batch_size)
+    ).scalars().all()
+    if not ids:
+        return ids, []
+
+    touched = select(history.application_id).where(history.id > after_id, history.id <= ids[-1])
+    paired = (
+        select(
+            history.id,
+            history.application_id,
+            history.old_stage,
+            history.new_stage,
+            history.changed_at,
+            func.lag(history.changed_at, type_=DateTime)
+            .over(partition_by=history.application_id, order_by=(history.changed_at, history.id))
+            .label("entered_at"),
+        )
+        .where(history.application_id.in_(touched), history.id <= ids[-1])
+        .subquery()
+    )
+    rows = db.execute(
+        select(
+            Job.id,
+            Job.company_id,
+            paired.c.old_stage,
+            paired.c.new_stage,
+            paired.c.changed_at,
+            paired.c.entered_at,
+        )
+        .join(Application, Application.id == paired.c.application_id)
+        .join(Job, Job.id == Application.job_id)
+        .where(paired.c.id > after_id)
+    ).all()
+    return ids, rows
+
+
+def _increments(rows) -> tuple[list[dict], list[dict]]:
+    """Funnel stat and dwell bucket increments for a batch of transitions,
+    for every job and company it touches, summed with NumPy."""
+    job_ids, company_ids, old_stages, new_stages, changed_at, entered_at = zip(*rows)
+    old = np.array([_STAGE_INDEX.get(stage, -1) for stage in old_stages])
+    new = np.array([_STAGE_INDEX[stage] for stage in new_stages])
+    seconds = (
+        np.array(changed_at, dtype="datetime64[us]") - np.array(entered_at, dtype="datetime64[us]")
+    ) / np.timedelta64(1, "s")
+
+    moved = old >= 0
+    timed = moved & ~np.isnan(seconds)
+    # Left a stage it has no entry row for (history from before it was
+    # recorded): count the entry so the funnel stays consistent
+    untracked = moved & ~timed
+    seconds = np.clip(np.nan_to_num(seconds), 0, None)
+    bucket = np.searchsorted(DWELL_BUCKET_SECONDS, seconds)
+
+    n_stages = len(STAGES)
+    n_buckets = len(DWELL_BUCKET_SECONDS) + 1
+    stats, buckets = [], []
+    for scope, ids in (("job", np.array(job_ids)), ("company", np.array(company_ids))):
+        # One entry per transition into new_stage, one exit per transition out of old_stage
+        keys = np.concatenate([ids * n_stages + new, ids[moved] * n_stages + old[moved]])
+        keys, inverse = np.unique(keys, return_inverse=True)
+        inverse = inverse.reshape(-1)
+        zeros = np.zeros(len(new))
+        columns = {
+            "entered": np.concatenate([np.ones(len(new)), untracked[moved]]),
+            "exited": np.concatenate([zeros, np.ones(moved.sum())]),
+            "rejected": np.concatenate([zeros, new[moved] == _REJECTED]),
+            "dwell_seconds": np.concatenate([zeros, seconds[moved]]),
+        }
+        totals = {name: np.bincount(inverse, weights=weights, minlength=len(keys)) for name, weights in columns.items()}
+        for i, key in enumerate(keys.tolist()):
+            scope_id, stage = divmod(key, n_stages)
+            stats.append({
+                "scope": scope,
+                "scope_id": scope_id,
+                "stage": STAGES[stage],
+                "entered": int(totals["entered"][i]),
+                "exited": int(totals["exited"][i]),
+                "rejected": int(totals["rejected"][i]),
+                "dwell_seconds": float(totals["dwell_seconds"][i]),
+            })
+
+        keys, counts = np.unique(
+            (ids[timed] * n_stages + old[timed]) * n_buckets + bucket[timed], return_counts=True
+        )
+        for key, count in zip(keys.tolist(), counts.tolist()):
+            scope_key, bucket_index = divmod(key, n_buckets)
+            scope_id, stage = divmod(scope_key, n_stages)
+            buckets.append({
+                "scope": scope,
+                "scope_id": scope_id,
+                "stage": STAGES[stage],
+                "bucket": bucket_index,
+                "count": count,
+            })
+    return stats, buckets
+
+
+def _add(db: Session, model, columns: list[str], rows: list[dict]) -> None:
+    if not rows:
+        return
+    # Core table, not the ORM entity: skips the ORM bulk-insert bookkeeping
+    table = model.__table__
+    upsert = conflict_insert(db.bind, table)
+    db.execute(
+        upsert.on_conflict_do_update(
+            index_elements=list(table.primary_key.columns),
+            set_={column: table.c[column] + upsert.excluded[column] for column in columns},
+        ),
+        rows,
+    )
+
+
+def refresh_batch(db: Session, batch_size: int = ANALYTICS_BATCH_SIZE) -> int:
+    """Fold the next batch of history into the funnel tables; returns the
+    number of history rows consumed (0 when caught up)."""
+    after_id = db.scalar(
+        select(AnalyticsWatermark.last_id).where(AnalyticsWatermark.name == HISTORY_WATERMARK)
+    )
+    settled_before = datetime.utcnow() - timedelta(seconds=ANALYTICS_SETTLE_SECONDS)
+    ids, rows = _history_batch(db, after_id, batch_size, settled_before)
+    if not ids:
+        db.rollback()
+        return 0
+
+    # Moved first: it locks the watermark row, and a second refresher that
+    # read the same batch finds it already moved and backs off
+    claimed = db.execute(
+        update(AnalyticsWatermark)
+        .where(AnalyticsWatermark.name == HISTORY_WATERMARK, AnalyticsWatermark.last_id == after_id)
+        .values(last_id=ids[-1], refreshed_at=datetime.utcnow())
+    ).rowcount
+    if not claimed:
+        db.rollback()
+        return 0
+
+    if rows:
+        stats, buckets = _increments(rows)
+        _add(db, FunnelStageStat, ["entered", "exited", "rejected", "dwell_seconds"], stats)
+        _add(db, FunnelDwellBucket, ["count"], buckets)
+    db.commit()
+    return len(ids)
+
+
+def catch_up(db: Session) -> int:
+    folded = 0
+    while batch := refresh_batch(db):
+        folded += batch
+    return folded
+
+
+def rebuild(db: Session) -> int:
+    db.execute(delete(FunnelStageStat))
+    db.execute(delete(FunnelDwellBucket))
+    db.execute(
+        update(AnalyticsWatermark)
+        .where(AnalyticsWatermark.name == HISTORY_WATERMARK)
+        .values(last_id=0, refreshed_at=None)
+    )
+    db.commit()
+    return catch_up(db)
+
+
+def analytics_loop():
+    print("📊 Analytics refresher started.")
+    while True:
+        try:
+            with SessionLocal() as db:
+                folded = refresh_batch(db)
+            if folded:
+                print(f"📊 Folded {folded} history row(s) into funnel analytics.")
+            if folded < ANALYTICS_BATCH_SIZE:
+                time.sleep(ANALYTICS_REFRESH_INTERVAL)
+        except Exception as e:
+            print(f"❌ Analytics refresh error: {e}")
+            time.sleep(2)
+
+
+# -----------------------------
+# READS
+# -----------------------------
+
+def _percentile_hours(counts: np.ndarray, q: float) -> Optional[float]:
+    """Upper bound of the bucket holding the q-th quantile; None without
+    data or when it falls in the open last bucket."""
+    total = counts.sum()
+    if not total:
+        return None
+    index = int(np.searchsorted(np.cumsum(counts), q * total))
+    if index >= len(DWELL_BUCKET_SECONDS):
+        return None
+    return DWELL_BUCKET_SECONDS[index] / HOUR
+
+
+def _ratio(numerator: int, denominator: int) -> Optional[float]:
+    return round(numerator / denominator, 4) if denominator else None
+
+
+def _funnel(scope: str, scope_id: int, stats, buckets, refreshed_at) -> FunnelAnalytics:
+    totals = {stage: (0, 0, 0, 0.0) for stage in STAGES}
+    for stage, entered, exited, rejected, dwell_seconds in stats:
+        totals[stage] = (entered, exited, rejected, dwell_seconds)
+
+    histograms = np.zeros((len(STAGES), len(DWELL_BUCKET_SECONDS) + 1), dtype=np.int64)
+    for stage, bucket, count in buckets:
+        histograms[_STAGE_INDEX[stage], bucket] = count
+
+    applied = totals[ApplicationStage.APPLIED][0]
+    stages = []
+    for stage in STAGES:
+        entered, exited, rejected, dwell_seconds = totals[stage]
+        counts = histograms[_STAGE_INDEX[stage]]
+        timed = int(counts.sum())
+        next_stage = _NEXT_STAGE[stage]
+        stages.append(StageAnalytics(
+            stage=stage,
+            entered=entered,
+            exited=exited,
+            rejected=rejected,
+            conversion_from_applied=_ratio(entered, applied),
+            conversion_to_next=_ratio(totals[next_stage][0], entered) if next_stage else None,
+            timed_exits=timed,
+            mean_hours=round(dwell_seconds / timed / HOUR, 2) if timed else None,
+            median_hours=_percentile_hours(counts, 0.5),
+            p90_hours=_percentile_hours(counts, 0.9),
+            dwell_buckets=[
+                DwellBucket(le_hours=bound / HOUR if bound is not None else None, count=int(count))
+                for bound, count in zip((*DWELL_BUCKET_SECONDS, None), counts)
+            ],
+        ))
+    return FunnelAnalytics(scope=scope, scope_id=scope_id, stages=stages, refreshed_at=refreshed_at)
+
+
+class AnalyticsService:
+
+    @staticmethod
+    async def funnel(db: AsyncSession, scope: str, scope_id: int) -> FunnelAnalytics:
+        """Funnel and time-in-stage of one job or company, read from the
+        pre-aggregated tables (as of the last refresh)."""
+        stats = await db.execute(
+            select(
+                FunnelStageStat.stage,
+                FunnelStageStat.entered,
+                FunnelStageStat.exited,
+                FunnelStageStat.rejected,
+                FunnelStageStat.dwell_seconds,
+            ).where(FunnelStageStat.scope == scope, FunnelStageStat.scope_id == scope_id)
+        )
+        buckets = await db.execute(
+            select(FunnelDwellBucket.stage, FunnelDwellBucket.bucket, FunnelDwellBucket.count)
+            .where(FunnelDwellBucket.scope == scope, FunnelDwellBucket.scope_id == scope_id)
+        )
+        refreshed_at = await db.scalar(
+            select(AnalyticsWatermark.refreshed_at).where(AnalyticsWatermark.name == HISTORY_WATERMARK)
+        )
+        return _funnel(scope, scope_id, stats.all(), buckets.all(), refreshed_at)
+
+    @staticmethod
+    async def remove_job(db: AsyncSession, job_id: int) -> None:
+        # Company totals keep the job's history
+        await db.execute(
+            delete(FunnelStageStat).where(FunnelStageStat.scope == "job", FunnelStageStat.scope_id == job_id)
+        )
+        await db.execute(
+            delete(FunnelDwellBucket).where(FunnelDwellBucket.scope == "job", FunnelDwellBucket.scope_id == job_id)
+        )
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+#     python -m app.services.analytics_service            # refresh forever
+#     python -m app.services.analytics_service --once     # catch up and exit
+#     python -m app.services.analytics_service --rebuild  # recompute from all history
+
+def main():
+    parser = argparse.ArgumentParser(description="Fold application history into funnel analytics.")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument("--once", action="store_true", help="catch up with the history and exit")
+    mode.add_argument("--rebuild", action="store_true", help="clear the funnel tables and recompute them")
+    args = parser.parse_args()
+
+    if not (args.once or args.rebuild):
+        analytics_loop()
+        return
+    with SessionLocal() as db:
+        folded = rebuild(db) if args.rebuild else catch_up(db)
+    print(f"Folded {folded} history row(s) into funnel analytics.")
+
+
+if __name__ == "__main__":
+    main()
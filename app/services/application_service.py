@@ -1,129 +1,325 @@
+import json
+from collections import Counter
+from datetime import datetime
+
 from fastapi import HTTPException, status
-from sqlalchemy.orm import Session
+from sqlalchemy import and_, case, insert, literal, or_, select, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from ..auth import AuthUser
+from ..database import conflict_insert
 from ..models import (
     Application,
     ApplicationHistory,
     ApplicationStage,
     Job,
     JobStatus,
-    User,
+    OutboxMessage,
 )
-
-import redis
-import json
+from ..schemas import StageChange, StageChangeResult
+from .pipeline_service import PipelineService
+from .stage_events import stage_event_row
+from .state_machine import transition_error
 
 # -----------------------------
-# CONNECT TO REDIS MESSAGE QUEUE
+# NOTIFICATIONS GO THROUGH THE OUTBOX
 # -----------------------------
-redis_client = redis.StrictRedis(host="127.0.0.1", port=6379, db=0)
+# Tasks are written to the outbox table inside the request's transaction;
+# app/services/outbox_relay.py pushes them to Redis. The request path
+# never talks to Redis, and a committed change can't lose its email.
+# Stage changes also write a stage event for the candidate's open event
+# streams (see app/services/stage_events.py).
+EMAIL_QUEUE = "email_queue"
+
+
+def _outbox_row(task: dict) -> dict:
+    return {"queue": EMAIL_QUEUE, "payload": json.dumps(task)}
+
+
+def _owned_jobs(recruiter: AuthUser):
+    # Recruiters only move applications on jobs they created
+    return select(Job.id).where(Job.created_by_id == recruiter.id)
+
+
+def _stage_changed_task(candidate_id: int, old_stage, new_stage) -> dict:
+    return {
+        "email": f"candidate-{candidate_id}@example.com",
+        "subject": "Application Status Updated",
+        "message": f"Your application stage changed from {old_stage} to {new_stage}."
+    }
 
 
 class ApplicationService:
 
     @staticmethod
-    def apply_to_job(db: Session, candidate: User, job_id: int) -> Application:
-        # 1) Check job exists
-        job = db.query(Job).filter(Job.id == job_id).first()
-        if not job:
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Job not found",
-            )
-
-        # 2) Check job is open
-        if job.status != JobStatus.OPEN:
-            raise HTTPException(
-                status_code=status.HTTP_400_BAD_REQUEST,
-                detail="Job is not open for applications.",
+    async def apply_to_job(db: AsyncSession, candidate: AuthUser, job_id: int) -> Application:
+        # 1) Create the application only if the job exists and is open, in
+        #    one INSERT ... SELECT. Being the transaction's first statement, it
+        #    takes SQLite's write lock up front instead of upgrading a read
+        #    lock (which fails at once under concurrent writers).
+        #    uq_applications_candidate_job turns a second application from the
+        #    same candidate into "no row inserted" rather than an error.
+        now = datetime.utcnow()
+        open_job = (
+            select(
+                literal(candidate.id),
+                Job.id,
+                literal(ApplicationStage.APPLIED, Application.stage.type),
+                literal(now),
+                literal(now),
             )
-
-        # 3) Check candidate hasn't already applied
-        existing = (
-            db.query(Application)
-            .filter(
-                Application.candidate_id == candidate.id,
-                Application.job_id == job_id,
+            .where(Job.id == job_id, Job.status == JobStatus.OPEN)
+        )
+        statement = (
+            conflict_insert(db.bind, Application)
+            .from_select(["candidate_id", "job_id", "stage", "created_at", "updated_at"], open_job)
+            .on_conflict_do_nothing(index_elements=[Application.candidate_id, Application.job_id])
+            .returning(
+                Application.id,
+                Application.candidate_id,
+                Application.job_id,
+                Application.stage,
+                Application.created_at,
+                Application.updated_at,
             )
-            .first()
         )
-        if existing:
+        row = (await db.execute(statement)).first()
+
+        # 2) Nothing inserted: find out why (error path only)
+        if row is None:
+            await db.rollback()
+            job_status = (await db.execute(select(Job.status).where(Job.id == job_id))).scalar_one_or_none()
+            if job_status is None:
+                raise HTTPException(
+                    status_code=status.HTTP_404_NOT_FOUND,
+                    detail="Job not found",
+                )
+            if job_status != JobStatus.OPEN:
+                raise HTTPException(
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Job is not open for applications.",
+                )
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="You have already applied to this job.",
             )
 
-        # 4) Create application
-        application = Application(
-            candidate_id=candidate.id,
-            job_id=job_id,
-            stage=ApplicationStage.APPLIED,
-        )
-        db.add(application)
-        db.flush()  # get application.id
-
-        # 5) Create history record
-        history = ApplicationHistory(
-            application_id=application.id,
+        # 3) Create history record
+        await db.execute(insert(ApplicationHistory).values(
+            application_id=row.id,
             old_stage=None,
             new_stage=ApplicationStage.APPLIED,
             changed_by_id=candidate.id,
-        )
-        db.add(history)
-
-        db.commit()
-        db.refresh(application)
+            changed_at=now,
+        ))
+        await PipelineService.apply_deltas(db, Counter({(job_id, ApplicationStage.APPLIED): 1}))
 
         # -----------------------------
-        # 6) PUSH EMAIL TASK TO REDIS
+        # 4) QUEUE EMAIL TASK (same transaction)
         # -----------------------------
         task = {
             "email": candidate.email,
             "subject": "Application Received",
             "message": f"Your application for Job ID {job_id} has been received."
         }
-        redis_client.lpush("email_queue", json.dumps(task))
+        await db.execute(insert(OutboxMessage).values(**_outbox_row(task)))
 
-        return application
+        await db.commit()
+
+        # Built from RETURNING; no refresh round trip
+        return Application(**row._mapping)
 
     @staticmethod
-    def update_stage(
-        db: Session,
-        recruiter: User,
+    async def update_stage(
+        db: AsyncSession,
+        recruiter: AuthUser,
         application_id: int,
         new_stage: ApplicationStage,
     ):
-        # 1) Find application
-        application = db.query(Application).filter(Application.id == application_id).first()
-        if not application:
+        # 1) Current stage (plus what history / counters / email need); an
+        #    application on someone else's job is reported as not found
+        current = (
+            await db.execute(
+                select(Application.stage, Application.candidate_id, Application.job_id)
+                .join(Job, Job.id == Application.job_id)
+                .where(Application.id == application_id, Job.created_by_id == recruiter.id)
+            )
+        ).first()
+        if not current:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Application not found",
             )
 
-        old_stage = application.stage
-        application.stage = new_stage
+        # 2) Reject no-ops and invalid moves before writing anything
+        old_stage = current.stage
+        error = transition_error(old_stage, new_stage)
+        if error:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=error)
+
+        # 3) Compare-and-set: only applies if nobody moved it since step 1
+        now = datetime.utcnow()
+        moved = await db.execute(
+            update(Application)
+            .where(
+                Application.id == application_id,
+                Application.stage.is_not_distinct_from(old_stage),
+                Application.job_id.in_(_owned_jobs(recruiter)),
+            )
+            .values(stage=new_stage, updated_at=now)
+        )
+        if moved.rowcount != 1:
+            await db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_409_CONFLICT,
+                detail="Application stage was changed concurrently; reload and retry",
+            )
 
-        # 2) Save history
-        history = ApplicationHistory(
-            application_id=application.id,
+        # 4) Save history
+        db.add(ApplicationHistory(
+            application_id=application_id,
             old_stage=old_stage,
             new_stage=new_stage,
             changed_by_id=recruiter.id,
-        )
-        db.add(history)
-        db.commit()
-        db.refresh(application)
+            changed_at=now,
+        ))
+
+        deltas = Counter()
+        if old_stage is not None:
+            deltas[(current.job_id, old_stage)] -= 1
+        deltas[(current.job_id, new_stage)] += 1
+        await PipelineService.apply_deltas(db, deltas)
 
         # -----------------------------
-        # 3) SEND EMAIL NOTIFICATION
+        # 5) QUEUE EMAIL NOTIFICATION + STAGE EVENT (same transaction)
         # -----------------------------
-        task = {
-            "email": f"candidate-{application.candidate_id}@example.com",
-            "subject": "Application Status Updated",
-            "message": f"Your application stage changed from {old_stage} to {new_stage}."
-        }
+        task = _stage_changed_task(current.candidate_id, old_stage, new_stage)
+        db.add(OutboxMessage(**_outbox_row(task)))
+        db.add(OutboxMessage(**stage_event_row(
+            current.candidate_id, application_id, current.job_id, old_stage, new_stage, now
+        )))
 
-        redis_client.lpush("email_queue", json.dumps(task))
+        await db.commit()
 
         return {}
+
+    @staticmethod
+    async def bulk_update_stage(
+        db: AsyncSession,
+        recruiter: AuthUser,
+        changes: list[StageChange],
+    ) -> list[StageChangeResult]:
+        # 1) Load every targeted application in one query; those on other
+        #    recruiters' jobs are left out and reported as not found
+        ids = {change.application_id for change in changes}
+        rows = (
+            await db.execute(
+                select(Application.id, Application.stage, Application.candidate_id, Application.job_id)
+                .join(Job, Job.id == Application.job_id)
+                .where(Application.id.in_(ids), Job.created_by_id == recruiter.id)
+            )
+        ).all()
+        current = {row.id: row for row in rows}
+
+        results = []
+        planned = {}  # application_id -> (old_stage, new_stage)
+        seen = set()
+        now = datetime.utcnow()
+
+        for change in changes:
+            app_id = change.application_id
+
+            if app_id not in current:
+                results.append(StageChangeResult(
+                    application_id=app_id, success=False, error="Application not found"
+                ))
+                continue
+            if app_id in seen:
+                results.append(StageChangeResult(
+                    application_id=app_id, success=False, error="Duplicate application in request"
+                ))
+                continue
+            seen.add(app_id)
+
+            old_stage = current[app_id].stage
+            error = transition_error(old_stage, change.new_stage)
+            if error:
+                results.append(StageChangeResult(application_id=app_id, success=False, error=error))
+                continue
+
+            planned[app_id] = (old_stage, change.new_stage)
+            results.append(StageChangeResult(
+                application_id=app_id, success=True, old_stage=old_stage, new_stage=change.new_stage
+            ))
+
+        if not planned:
+            return results
+
+        # 2) One compare-and-set UPDATE for every valid move: a row is only
+        #    changed if its stage is still the one validated above
+        expected = [(app_id, old) for app_id, (old, _) in planned.items() if old is not None]
+        unstaged = [app_id for app_id, (old, _) in planned.items() if old is None]
+        conditions = []
+        if expected:
+            conditions.append(tuple_(Application.id, Application.stage).in_(expected))
+        if unstaged:
+            conditions.append(and_(Application.id.in_(unstaged), Application.stage.is_(None)))
+
+        moved = await db.execute(
+            update(Application)
+            .where(or_(*conditions), Application.job_id.in_(_owned_jobs(recruiter)))
+            .values(
+                stage=case(
+                    {app_id: literal(new, Application.stage.type) for app_id, (_, new) in planned.items()},
+                    value=Application.id,
+                ),
+                updated_at=now,
+            )
+            .returning(Application.id)
+            .execution_options(synchronize_session=False)
+        )
+        applied = set(moved.scalars().all())
+
+        history = []
+        outbox = []
+        deltas = Counter()
+        for i, result in enumerate(results):
+            if not result.success:
+                continue
+            app_id = result.application_id
+            if app_id not in applied:
+                results[i] = StageChangeResult(
+                    application_id=app_id, success=False,
+                    error="Application stage was changed concurrently; reload and retry",
+                )
+                continue
+
+            old_stage, new_stage = planned[app_id]
+            if old_stage is not None:
+                deltas[(current[app_id].job_id, old_stage)] -= 1
+            deltas[(current[app_id].job_id, new_stage)] += 1
+            history.append({
+                "application_id": app_id,
+                "old_stage": old_stage,
+                "new_stage": new_stage,
+                "changed_by_id": recruiter.id,
+                "changed_at": now,
+            })
+            outbox.append(_outbox_row(
+                _stage_changed_task(current[app_id].candidate_id, old_stage, new_stage)
+            ))
+            outbox.append(stage_event_row(
+                current[app_id].candidate_id, app_id, current[app_id].job_id, old_stage, new_stage, now
+            ))
+
+        if not applied:
+            await db.rollback()
+            return results
+
+        # 3) History, notifications and counters for what actually moved, one commit
+        await db.execute(insert(ApplicationHistory), history)
+        await db.execute(insert(OutboxMessage), outbox)
+        await PipelineService.apply_deltas(db, deltas)
+        await db.commit()
+
+        return results
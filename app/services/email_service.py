@@ -1,8 +1,61 @@
+import os
+import smtplib
+import threading
+from email.message import EmailMessage
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+# Without SMTP_HOST emails are printed to stdout (local development)
+SMTP_HOST = os.getenv("SMTP_HOST")
+SMTP_PORT = int(os.getenv("SMTP_PORT", "25"))
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "10"))
+EMAIL_FROM = os.getenv("EMAIL_FROM", "noreply@flowtrack-ats.local")
+
+# One persistent SMTP connection per sending thread
+_local = threading.local()
+
+
 class EmailService:
+    @staticmethod
+    def _connection() -> smtplib.SMTP:
+        conn = getattr(_local, "smtp", None)
+        if conn is None:
+            conn = smtplib.SMTP(SMTP_HOST, SMTP_PORT, timeout=SMTP_TIMEOUT)
+            _local.smtp = conn
+        return conn
+
+    @staticmethod
+    def _reset_connection():
+        conn = getattr(_local, "smtp", None)
+        _local.smtp = None
+        if conn is not None:
+            try:
+                conn.close()
+            except Exception:
+                pass
+
     @staticmethod
     def send_email(to, subject, body):
-        print("----------- EMAIL NOTIFICATION -----------")
-        print(f"To: {to}")
-        print(f"Subject: {subject}")
-        print(f"Body: {body}")
-        print("------------------------------------------")
+        if not SMTP_HOST:
+            print("----------- EMAIL NOTIFICATION -----------")
+            print(f"To: {to}")
+            print(f"Subject: {subject}")
+            print(f"Body: {body}")
+            print("------------------------------------------")
+            return
+
+        message = EmailMessage()
+        message["From"] = EMAIL_FROM
+        message["To"] = to
+        message["Subject"] = subject
+        message.set_content(body)
+
+        try:
+            EmailService._connection().send_message(message)
+        except (smtplib.SMTPServerDisconnected, ConnectionError, TimeoutError):
+            # Stale pooled connection: drop it and let the worker's retry decide
+            EmailService._reset_connection()
+            raise
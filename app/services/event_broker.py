@@ -0,0 +1,106 @@
+import asyncio
+import threading
+from abc import ABC, abstractmethod
+from collections import defaultdict
+from typing import Callable, Iterable, Optional
+
+from .queue_backend import QUEUE_BACKEND, get_async_redis, get_redis
+
+
+# -----------------------------
+# BROKER (relay -> every API worker)
+# -----------------------------
+# Outbox rows for these channels are broadcast by the relay instead of
+# enqueued: published once, received by every API worker, which holds a
+# single subscription per channel. Nothing is stored, so a worker that is
+# down or reconnecting misses what was published meanwhile.
+
+STAGE_EVENTS_CHANNEL = "stage_events"    # app/services/stage_events.py
+JOB_INDEX_CHANNEL = "job_index"          # app/services/recommendation_service.py
+
+BROADCAST_CHANNELS = frozenset({STAGE_EVENTS_CHANNEL, JOB_INDEX_CHANNEL})
+
+
+class EventBroker(ABC):
+
+    @abstractmethod
+    def publish_many(self, channel: str, payloads: list[str]) -> None:
+        """Broadcast to every current listener (called by the relay)."""
+
+    @abstractmethod
+    async def listen(self, channel: str, handler: Callable[[str], None]) -> None:
+        """Call handler(payload) on the event loop for each message, until cancelled."""
+
+
+class RedisEventBroker(EventBroker):
+
+    def publish_many(self, channel, payloads):
+        pipe = get_redis().pipeline(transaction=False)
+        for payload in payloads:
+            pipe.publish(channel, payload)
+        pipe.execute()
+
+    async def listen(self, channel, handler):
+        pubsub = get_async_redis().pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(channel)
+        try:
+            while True:
+                # Short polls: a blocking read would trip REDIS_SOCKET_TIMEOUT
+                message = await pubsub.get_message(timeout=1.0)
+                if message is not None:
+                    handler(message["data"])
+        finally:
+            await pubsub.aclose()
+
+
+class InMemoryEventBroker(EventBroker):
+    """For QUEUE_BACKEND=memory, where the relay is a thread of the (single)
+    API process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._listeners = defaultdict(list)  # channel -> [(loop, handler)]
+
+    def publish_many(self, channel, payloads):
+        with self._lock:
+            listeners = list(self._listeners[channel])
+        for loop, handler in listeners:
+            try:
+                loop.call_soon_threadsafe(_deliver, handler, payloads)
+            except RuntimeError:
+                pass  # that loop has been closed
+
+    async def listen(self, channel, handler):
+        listener = (asyncio.get_running_loop(), handler)
+        with self._lock:
+            self._listeners[channel].append(listener)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            with self._lock:
+                self._listeners[channel].remove(listener)
+
+
+def _deliver(handler: Callable[[str], None], payloads: Iterable[str]) -> None:
+    for payload in payloads:
+        handler(payload)
+
+
+_broker: Optional[EventBroker] = None
+
+
+def get_event_broker() -> EventBroker:
+    global _broker
+    if _broker is None:
+        _broker = InMemoryEventBroker() if QUEUE_BACKEND == "memory" else RedisEventBroker()
+    return _broker
+
+
+async def listen_forever(broker: EventBroker, channel: str, handler: Callable[[str], None]) -> None:
+    """broker.listen, resubscribing after errors (e.g. Redis restarts)."""
+    while True:
+        try:
+            await broker.listen(channel, handler)
+        except Exception as e:
+            print(f"❌ Subscription to {channel} lost: {e}")
+            await asyncio.sleep(1)
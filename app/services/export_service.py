@@ -0,0 +1,100 @@
+import csv
+import io
+import json
+import os
+from typing import AsyncIterator
+
+from sqlalchemy import select
+
+from ..database import AsyncReadSessionLocal
+from ..models import Application, Job, User
+
+
+# -----------------------------
+# STREAMING EXPORT OF RECRUITER APPLICATIONS
+# -----------------------------
+# Rows are fetched from a server-side cursor in EXPORT_CHUNK_SIZE chunks and
+# each chunk is encoded and sent before the next is read, so memory stays
+# flat regardless of how many applications a recruiter has.
+
+EXPORT_CHUNK_SIZE = int(os.getenv("EXPORT_CHUNK_SIZE", "1000"))
+
+EXPORT_COLUMNS = [
+    "application_id",
+    "job_id",
+    "job_title",
+    "candidate_id",
+    "candidate_name",
+    "candidate_email",
+    "stage",
+    "created_at",
+    "updated_at",
+]
+
+EXPORT_MEDIA_TYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+def _recruiter_applications_query(recruiter_id: int):
+    return (
+        select(
+            Application.id,
+            Job.id,
+            Job.title,
+            User.id,
+            User.full_name,
+            User.email,
+            Application.stage,
+            Application.created_at,
+            Application.updated_at,
+        )
+        .join(Job, Application.job_id == Job.id)
+        .join(User, Application.candidate_id == User.id)
+        .where(Job.created_by_id == recruiter_id)
+        .order_by(Application.id)
+        .execution_options(yield_per=EXPORT_CHUNK_SIZE)
+    )
+
+
+def _row_values(row) -> list:
+    values = list(row)
+    values[6] = values[6].value if values[6] is not None else None
+    values[7] = values[7].isoformat() if values[7] is not None else None
+    values[8] = values[8].isoformat() if values[8] is not None else None
+    return values
+
+
+def _encode_csv(rows, header: bool) -> str:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(EXPORT_COLUMNS)
+    writer.writerows(_row_values(row) for row in rows)
+    return buffer.getvalue()
+
+
+def _encode_ndjson(rows) -> str:
+    return "".join(
+        json.dumps(dict(zip(EXPORT_COLUMNS, _row_values(row)))) + "\n" for row in rows
+    )
+
+
+class ExportService:
+
+    @staticmethod
+    async def stream_recruiter_applications(recruiter_id: int, fmt: str) -> AsyncIterator[str]:
+        # Own session: the response body is produced after the endpoint
+        # (and its request-scoped session) has returned
+        async with AsyncReadSessionLocal() as db:
+            result = await db.stream(_recruiter_applications_query(recruiter_id))
+
+            if fmt == "csv":
+                yield _encode_csv([], header=True)
+
+            async for rows in result.partitions():
+                if fmt == "csv":
+                    yield _encode_csv(rows, header=False)
+                else:
+                    yield _encode_ndjson(rows)
@@ -0,0 +1,350 @@
+import argparse
+import asyncio
+import codecs
+import csv
+import json
+import os
+from typing import AsyncIterator, Optional, Union
+
+from fastapi import HTTPException, status
+from pydantic import BaseModel, ValidationError
+from sqlalchemy import insert, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import conflict_insert
+from ..models import Company, Job, JobStatus, User, UserRole
+from ..schemas import ImportReport, ImportRowError, JobCreate, UserCreate
+from .job_cache import job_cache, listing_scopes
+from .password_service import password_hasher
+from .recommendation_service import RecommendationService, job_match_index
+from .search_service import JobSearchService
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+# Rows validated, inserted (one executemany per table) and committed together
+IMPORT_BATCH_SIZE = int(os.getenv("IMPORT_BATCH_SIZE", "500"))
+
+# Row errors listed in the report; all of them are counted
+IMPORT_MAX_ERRORS = int(os.getenv("IMPORT_MAX_ERRORS", "1000"))
+
+# A line this long without a newline means the body isn't CSV / NDJSON
+IMPORT_MAX_LINE_BYTES = 1024 * 1024
+
+IMPORT_FORMATS = ("csv", "ndjson")
+
+
+# -----------------------------
+# STREAMING PARSERS
+# -----------------------------
+# The body is parsed as it arrives and handed on IMPORT_BATCH_SIZE records at
+# a time, so memory doesn't grow with the file. Records are (row, fields) or
+# (row, error message); rows are numbered from 1, not counting a CSV header.
+
+async def _lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    decoder = codecs.getincrementaldecoder("utf-8-sig")(errors="replace")
+    buffer = ""
+    async for chunk in chunks:
+        buffer += decoder.decode(chunk)
+        *lines, buffer = buffer.split("\n")
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            raise HTTPException(status.HTTP_400_BAD_REQUEST, "Line too long; expected CSV or NDJSON")
+        for line in lines:
+            yield line.rstrip("\r")
+    buffer += decoder.decode(b"", final=True)
+    if buffer.strip():
+        yield buffer.rstrip("\r")
+
+
+async def _csv_records(chunks) -> AsyncIterator[tuple[int, Union[dict, str]]]:
+    header = None
+    record = ""
+    row = 0
+    async for line in _lines(chunks):
+        record = f"{record}\n{line}" if record else line
+        # An odd number of quotes means a quoted field continues on the next line
+        if record.count('"') % 2:
+            continue
+        text, record = record, ""
+        if not text.strip():
+            continue
+
+        values = next(csv.reader([text]))
+        if header is None:
+            header = [name.strip() for name in values]
+            continue
+        row += 1
+        if len(values) != len(header):
+            yield row, f"Expected {len(header)} columns, got {len(values)}"
+        else:
+            # Empty cells are missing values, so optional fields may be left blank
+            yield row, {name: value or None for name, value in zip(header, values)}
+
+    if record:
+        yield row + 1, "Unterminated quoted field"
+
+
+async def _ndjson_records(chunks) -> AsyncIterator[tuple[int, Union[dict, str]]]:
+    row = 0
+    async for line in _lines(chunks):
+        if not line.strip():
+            continue
+        row += 1
+        try:
+            fields = json.loads(line)
+        except ValueError as e:
+            yield row, f"Invalid JSON: {e}"
+            continue
+        yield row, fields if isinstance(fields, dict) else "Expected a JSON object"
+
+
+async def _batches(records: AsyncIterator, size: int) -> AsyncIterator[list]:
+    batch = []
+    async for record in records:
+        batch.append(record)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _validation_message(exc: ValidationError) -> str:
+    return "; ".join(
+        f"{'.'.join(str(part) for part in error['loc']) or 'row'}: {error['msg']}" for error in exc.errors()
+    )
+
+
+# -----------------------------
+# IMPORT
+# -----------------------------
+
+class _Report:
+
+    def __init__(self):
+        self.rows = 0
+        self.imported = 0
+        self.errors: list[ImportRowError] = []
+        self.failed = 0
+
+    def fail(self, row: int, error: str) -> None:
+        self.failed += 1
+        if len(self.errors) < IMPORT_MAX_ERRORS:
+            self.errors.append(ImportRowError(row=row, error=error))
+
+    def result(self) -> ImportReport:
+        return ImportReport(
+            rows=self.rows,
+            imported=self.imported,
+            failed=self.failed,
+            errors=sorted(self.errors, key=lambda error: error.row),
+            errors_truncated=self.failed > len(self.errors),
+        )
+
+
+def _validated(batch: list, schema: type[BaseModel], report: _Report) -> list[tuple[int, BaseModel]]:
+    rows = []
+    for row, fields in batch:
+        report.rows += 1
+        if isinstance(fields, str):
+            report.fail(row, fields)
+            continue
+        try:
+            rows.append((row, schema.model_validate(fields)))
+        except ValidationError as e:
+            report.fail(row, _validation_message(e))
+    return rows
+
+
+async def _known_companies(db: AsyncSession, rows: list[tuple[int, BaseModel]]) -> set[int]:
+    ids = {data.company_id for _, data in rows if data.company_id is not None}
+    if not ids:
+        return set()
+    return set((await db.execute(select(Company.id).where(Company.id.in_(ids)))).scalars().all())
+
+
+def _records(chunks: AsyncIterator[bytes], fmt: str) -> AsyncIterator:
+    return _csv_records(chunks) if fmt == "csv" else _ndjson_records(chunks)
+
+
+class ImportService:
+
+    @staticmethod
+    async def import_jobs(
+        db: AsyncSession,
+        chunks: AsyncIterator[bytes],
+        fmt: str,
+        created_by_id: int,
+    ) -> ImportReport:
+        """Jobs (JobCreate fields) created by created_by_id. Every batch is
+        one executemany per table and one commit; bad rows are reported and
+        skipped."""
+        report = _Report()
+        async for batch in _batches(_records(chunks, fmt), IMPORT_BATCH_SIZE):
+            rows = _validated(batch, JobCreate, report)
+            companies = await _known_companies(db, rows)
+            valid = []
+            for row, data in rows:
+                if data.company_id not in companies:
+                    report.fail(row, "Company not found")
+                else:
+                    valid.append((row, data))
+            if not valid:
+                continue
+
+            try:
+                jobs = (
+                    await db.execute(
+                        insert(Job).returning(
+                            Job.id, Job.title, Job.description, Job.status, Job.company_id,
+                            sort_by_parameter_order=True,
+                        ),
+                        [
+                            {
+                                "title": data.title,
+                                "description": data.description,
+                                "company_id": data.company_id,
+                                "status": JobStatus.OPEN,
+                                "created_by_id": created_by_id,
+                            }
+                            for _, data in valid
+                        ],
+                    )
+                ).all()
+                await JobSearchService.index_new_jobs(db, [job._mapping for job in jobs])
+                index_events = await RecommendationService.index_new_jobs(db, jobs)
+                await db.commit()
+            except SQLAlchemyError as e:
+                await db.rollback()
+                for row, _ in valid:
+                    report.fail(row, f"Database error: {e.__class__.__name__}")
+                continue
+
+            report.imported += len(jobs)
+            for event in index_events:
+                job_match_index.apply(event)
+            await job_cache.invalidate({
+                scope for job in jobs for scope in listing_scopes(job.status, job.company_id)
+            })
+
+        return report.result()
+
+    @staticmethod
+    async def import_users(db: AsyncSession, chunks: AsyncIterator[bytes], fmt: str) -> ImportReport:
+        """Users (UserCreate fields, password in plain text). Emails already
+        registered are reported; passwords are hashed in parallel on the
+        password workers."""
+        report = _Report()
+        seen_emails: set[str] = set()
+        async for batch in _batches(_records(chunks, fmt), IMPORT_BATCH_SIZE):
+            rows = _validated(batch, UserCreate, report)
+
+            emails = [data.email for _, data in rows]
+            registered = set(
+                (await db.execute(select(User.email).where(User.email.in_(emails)))).scalars().all()
+            ) if emails else set()
+            companies = await _known_companies(db, rows)
+            # Don't keep the read transaction open while bcrypt runs
+            await db.rollback()
+
+            valid = []
+            for row, data in rows:
+                if data.email in seen_emails:
+                    report.fail(row, "Duplicate email in file")
+                elif data.email in registered:
+                    report.fail(row, "Email already registered")
+                elif data.company_id is not None and data.company_id not in companies:
+                    report.fail(row, "Company not found")
+                else:
+                    seen_emails.add(data.email)
+                    valid.append((row, data))
+            if not valid:
+                continue
+
+            hashes = await password_hasher.hash_many([data.password for _, data in valid])
+            try:
+                # Registered concurrently since the check above: skipped, not an error for the batch
+                inserted = set(
+                    (
+                        await db.execute(
+                            conflict_insert(db.bind, User)
+                            .on_conflict_do_nothing(index_elements=[User.email])
+                            .returning(User.email),
+                            [
+                                {
+                                    "email": data.email,
+                                    "full_name": data.full_name,
+                                    "hashed_password": hashed,
+                                    "role": data.role,
+                                    "company_id": data.company_id,
+                                }
+                                for (_, data), hashed in zip(valid, hashes)
+                            ],
+                        )
+                    ).scalars().all()
+                )
+                await db.commit()
+            except SQLAlchemyError as e:
+                await db.rollback()
+                for row, _ in valid:
+                    report.fail(row, f"Database error: {e.__class__.__name__}")
+                continue
+
+            report.imported += len(inserted)
+            for row, data in valid:
+                if data.email not in inserted:
+                    report.fail(row, "Email already registered")
+
+        return report.result()
+
+
+# -----------------------------
+# CLI
+# -----------------------------
+#     python -m app.services.import_service jobs jobs.csv --created-by 12
+#     python -m app.services.import_service users users.ndjson
+
+async def _file_chunks(path: str, size: int = 64 * 1024) -> AsyncIterator[bytes]:
+    with open(path, "rb") as f:
+        while chunk := f.read(size):
+            yield chunk
+
+
+async def _run_cli(kind: str, path: str, fmt: str, created_by_id: Optional[int]) -> ImportReport:
+    from ..database import AsyncSessionLocal, async_engine, async_read_engine
+
+    try:
+        async with AsyncSessionLocal() as db:
+            if kind == "jobs":
+                role = (await db.execute(select(User.role).where(User.id == created_by_id))).scalar_one_or_none()
+                if role != UserRole.RECRUITER:
+                    raise SystemExit(f"User {created_by_id} is not a recruiter")
+                return await ImportService.import_jobs(db, _file_chunks(path), fmt, created_by_id)
+            return await ImportService.import_users(db, _file_chunks(path), fmt)
+    finally:
+        password_hasher.shutdown()
+        await async_engine.dispose()
+        await async_read_engine.dispose()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk import jobs or users from CSV / NDJSON.")
+    parser.add_argument("kind", choices=["jobs", "users"])
+    parser.add_argument("path")
+    parser.add_argument("--format", choices=IMPORT_FORMATS, help="default: from the file extension")
+    parser.add_argument("--created-by", type=int, help="recruiter id that owns imported jobs")
+    args = parser.parse_args()
+
+    if args.kind == "jobs" and args.created_by is None:
+        parser.error("jobs need --created-by")
+    fmt = args.format or ("ndjson" if args.path.endswith((".ndjson", ".jsonl")) else "csv")
+
+    report = asyncio.run(_run_cli(args.kind, args.path, fmt, args.created_by))
+    print(report.model_dump_json(indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,135 @@
+import hashlib
+import os
+from typing import Awaitable, Callable, Hashable, Iterable, Optional
+
+from fastapi import Request, Response
+from pydantic import BaseModel
+
+from ..cache import TTLCache
+from ..models import JobStatus
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+JOB_CACHE_TTL_SECONDS = float(os.getenv("JOB_CACHE_TTL_SECONDS", "60"))
+JOB_CACHE_MAX_ENTRIES = int(os.getenv("JOB_CACHE_MAX_ENTRIES", "1024"))
+
+# "1" shares cached bodies and invalidations between API workers via Redis
+JOB_CACHE_REDIS = os.getenv("JOB_CACHE_REDIS", "0") == "1"
+
+REDIS_KEY_PREFIX = "jobcache"
+
+
+# -----------------------------
+# CACHE OF PUBLIC JOB RESPONSES
+# -----------------------------
+# Every cached response belongs to a scope:
+#   ("job", job_id)                   GET /jobs/{job_id}
+#   ("list", status, company_id)      GET /jobs/ with those filters (None = unfiltered)
+# A scope has a generation number that is part of each cache key. Writing a
+# job bumps only the scopes that job can appear in, which orphans exactly the
+# affected entries (they age out of the LRU) and leaves the rest warm.
+
+class CachedResponse:
+    __slots__ = ("body", "etag")
+
+    def __init__(self, body: bytes, etag: str):
+        self.body = body
+        self.etag = etag
+
+
+def _scope_key(scope: tuple) -> str:
+    return ":".join(str(part) for part in scope)
+
+
+def listing_scopes(status: JobStatus, company_id: int) -> list[tuple]:
+    """Listing scopes that can contain a job with this status and company."""
+    return [
+        ("list", s, c)
+        for s in (None, status.value)
+        for c in (None, company_id)
+    ]
+
+
+class JobResponseCache:
+
+    def __init__(self, local: TTLCache, redis=None):
+        self.local = local
+        self.redis = redis
+        self._generations: dict[tuple, int] = {}
+
+    async def _generation(self, scope: tuple) -> int:
+        if self.redis is None:
+            return self._generations.get(scope, 0)
+        value = await self.redis.get(f"{REDIS_KEY_PREFIX}:gen:{_scope_key(scope)}")
+        return int(value or 0)
+
+    async def get(self, key: tuple) -> Optional[CachedResponse]:
+        entry = self.local.get(key)
+        if entry is not None or self.redis is None:
+            return entry
+
+        stored = await self.redis.hmget(f"{REDIS_KEY_PREFIX}:{_scope_key(key)}", "etag", "body")
+        if stored[0] is None:
+            return None
+
+        entry = CachedResponse(body=stored[1], etag=stored[0].decode())
+        self.local.set(key, entry)
+        return entry
+
+    async def set(self, key: tuple, entry: CachedResponse) -> None:
+        self.local.set(key, entry)
+        if self.redis is not None:
+            redis_key = f"{REDIS_KEY_PREFIX}:{_scope_key(key)}"
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.hset(redis_key, mapping={"etag": entry.etag, "body": entry.body})
+            pipe.expire(redis_key, int(self.local.ttl))
+            await pipe.execute()
+
+    async def invalidate(self, scopes: Iterable[tuple]) -> None:
+        scopes = set(scopes)
+        if self.redis is None:
+            for scope in scopes:
+                self._generations[scope] = self._generations.get(scope, 0) + 1
+            return
+
+        pipe = self.redis.pipeline(transaction=False)
+        for scope in scopes:
+            pipe.incr(f"{REDIS_KEY_PREFIX}:gen:{_scope_key(scope)}")
+        await pipe.execute()
+
+    async def respond(
+        self,
+        request: Request,
+        scope: tuple,
+        params: Hashable,
+        build: Callable[[], Awaitable[BaseModel]],
+    ) -> Response:
+        key = (*scope, await self._generation(scope), params)
+
+        entry = await self.get(key)
+        if entry is None:
+            body = (await build()).model_dump_json().encode()
+            entry = CachedResponse(body=body, etag=f'"{hashlib.blake2b(body, digest_size=16).hexdigest()}"')
+            await self.set(key, entry)
+
+        headers = {"ETag": entry.etag, "Cache-Control": "public, no-cache"}
+
+        if_none_match = request.headers.get("if-none-match")
+        if if_none_match and entry.etag in {tag.strip() for tag in if_none_match.split(",")}:
+            return Response(status_code=304, headers=headers)
+
+        return Response(content=entry.body, media_type="application/json", headers=headers)
+
+
+def _build_cache() -> JobResponseCache:
+    redis = None
+    if JOB_CACHE_REDIS:
+        from .queue_backend import get_async_redis
+        redis = get_async_redis()
+    return JobResponseCache(TTLCache(maxsize=JOB_CACHE_MAX_ENTRIES, ttl=JOB_CACHE_TTL_SECONDS), redis)
+
+
+job_cache = _build_cache()
@@ -0,0 +1,88 @@
+import os
+import time
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import delete, select
+from sqlalchemy.orm import Session
+
+from ..database import SessionLocal
+from ..metrics import outbox_lag, queue_enqueue_duration
+from ..models import OutboxMessage
+from .queue_backend import QueueBackend, get_queue_backend
+from .event_broker import BROADCAST_CHANNELS, EventBroker, get_event_broker
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "500"))
+OUTBOX_POLL_INTERVAL = float(os.getenv("OUTBOX_POLL_INTERVAL", "0.5"))
+
+
+# -----------------------------
+# RELAY
+# -----------------------------
+# At-least-once delivery: a batch is pushed to the queue first and deleted
+# from the outbox only after the push succeeded. A crash in between
+# re-sends that batch on restart, so consumers must tolerate duplicates.
+# Rows for BROADCAST_CHANNELS (stage events, job index updates) are
+# published to every API worker instead of being enqueued.
+
+def relay_batch(
+    db: Session,
+    backend: QueueBackend,
+    broker: EventBroker,
+    batch_size: int = OUTBOX_BATCH_SIZE,
+) -> int:
+    messages = db.execute(
+        select(OutboxMessage.id, OutboxMessage.queue, OutboxMessage.payload, OutboxMessage.created_at)
+        .order_by(OutboxMessage.id)
+        .limit(batch_size)
+        .with_for_update(skip_locked=True)  # lets several relays share the table on Postgres
+    ).all()
+
+    if not messages:
+        db.rollback()
+        return 0
+
+    started = time.perf_counter()
+    for channel in BROADCAST_CHANNELS:
+        events = [message.payload for message in messages if message.queue == channel]
+        if events:
+            broker.publish_many(channel, events)
+    backend.push_many(
+        (message.queue, message.payload) for message in messages if message.queue not in BROADCAST_CHANNELS
+    )
+    enqueued_at = datetime.utcnow()
+
+    for queue in {message.queue for message in messages}:
+        queue_enqueue_duration.observe(time.perf_counter() - started, queue)
+    for message in messages:
+        outbox_lag.observe((enqueued_at - message.created_at).total_seconds(), message.queue)
+
+    db.execute(delete(OutboxMessage).where(OutboxMessage.id.in_([m.id for m in messages])))
+    db.commit()
+    return len(messages)
+
+
+def relay_loop(backend: Optional[QueueBackend] = None, broker: Optional[EventBroker] = None):
+    backend = backend or get_queue_backend()
+    broker = broker or get_event_broker()
+    print("📤 Outbox relay started.")
+    while True:
+        try:
+            with SessionLocal() as db:
+                sent = relay_batch(db, backend, broker)
+            if sent:
+                print(f"📨 Relayed {sent} message(s).")
+            if sent < OUTBOX_BATCH_SIZE:
+                time.sleep(OUTBOX_POLL_INTERVAL)
+        except Exception as e:
+            print(f"❌ Relay error: {e}")
+            time.sleep(2)
+
+
+if __name__ == "__main__":
+    relay_loop()
@@ -0,0 +1,117 @@
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from fastapi import HTTPException, status
+from passlib.context import CryptContext
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+# Changing the cost takes effect for existing users on their next login
+BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", str(os.cpu_count() or 1)))
+
+# Hash/verify calls allowed to wait for a worker before new ones get a 503
+PASSWORD_HASH_MAX_PENDING = int(
+    os.getenv("PASSWORD_HASH_MAX_PENDING", str(PASSWORD_HASH_WORKERS * 8))
+)
+
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=BCRYPT_ROUNDS)
+
+
+# -----------------------------
+# SYNC HELPERS (run inside the worker processes)
+# -----------------------------
+
+def hash_password(password: str) -> str:
+    return pwd_context.hash(password)
+
+def verify_password(plain_password, hashed_password) -> bool:
+    return pwd_context.verify(plain_password, hashed_password)
+
+def verify_and_update(plain_password, hashed_password) -> tuple[bool, Optional[str]]:
+    # Returns a fresh hash when the stored one uses a different cost
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+def hash_passwords(passwords: list[str]) -> list[str]:
+    return [pwd_context.hash(password) for password in passwords]
+
+
+# -----------------------------
+# BOUNDED PROCESS POOL
+# -----------------------------
+
+class PasswordHasher:
+    """Runs bcrypt in a dedicated process pool so API workers never spend
+    their own CPU on it. At most ``max_pending`` calls may be queued or
+    running; beyond that callers get a fast 503 instead of piling up."""
+
+    def __init__(self, workers: int, max_pending: int):
+        self.workers = workers
+        self.max_pending = max_pending
+        self._pending = 0
+        self._executor: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        if self._executor is None:
+            # spawn: forking a process that already runs threads is unsafe
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def _run(self, fn, *args, shed: bool = True):
+        if shed and self._pending >= self.max_pending:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Authentication service is busy, please retry shortly.",
+                headers={"Retry-After": "1"},
+            )
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._get_executor(), fn, *args)
+        finally:
+            self._pending -= 1
+
+    async def hash(self, password: str) -> str:
+        return await self._run(hash_password, password)
+
+    async def verify_and_update(self, password: str, hashed: str) -> tuple[bool, Optional[str]]:
+        return await self._run(verify_and_update, password, hashed)
+
+    async def hash_many(self, passwords: list[str], slice_size: int = 4) -> list[str]:
+        """Hashes in order, spread over every worker. Waits instead of being
+        shed, but keeps at most one small slice per worker queued, so logins
+        submitted meanwhile wait for about one slice, not the whole batch."""
+        slots = asyncio.Semaphore(self.workers)
+
+        async def hash_slice(start: int) -> list[str]:
+            async with slots:
+                return await self._run(hash_passwords, passwords[start:start + slice_size], shed=False)
+
+        slices = await asyncio.gather(*(hash_slice(start) for start in range(0, len(passwords), slice_size)))
+        return [hashed for hashes in slices for hashed in hashes]
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+
+password_hasher = PasswordHasher(
+    workers=PASSWORD_HASH_WORKERS,
+    max_pending=PASSWORD_HASH_MAX_PENDING,
+)
@@ -0,0 +1,94 @@
+from collections import Counter
+
+from sqlalchemy import delete, func, insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from ..database import conflict_insert
+from ..models import Application, ApplicationStage, Job, JobStageCount
+
+
+# -----------------------------
+# PER-JOB / PER-STAGE COUNTERS
+# -----------------------------
+# job_stage_counts is adjusted with deltas inside the same transaction as the
+# application change, so reads cost O(stages) instead of scanning applications.
+# If the table ever drifts (manual SQL, restored backup) rebuild it with:
+#
+#     python -m app.services.pipeline_service
+
+def empty_pipeline() -> dict:
+    return {stage: 0 for stage in ApplicationStage}
+
+
+def counters_from_applications():
+    """INSERT ... SELECT filling an empty job_stage_counts from applications."""
+    return insert(JobStageCount).from_select(
+        ["job_id", "stage", "count"],
+        select(Application.job_id, Application.stage, func.count())
+        .join(Job, Job.id == Application.job_id)
+        .where(Application.stage.is_not(None))
+        .group_by(Application.job_id, Application.stage),
+    )
+
+
+class PipelineService:
+
+    @staticmethod
+    async def apply_deltas(db: AsyncSession, deltas: Counter) -> None:
+        """deltas maps (job_id, stage) -> change in count; zero entries are skipped."""
+        rows = [
+            {"job_id": job_id, "stage": stage, "count": delta}
+            for (job_id, stage), delta in deltas.items()
+            if delta
+        ]
+        if not rows:
+            return
+
+        upsert = conflict_insert(db.bind, JobStageCount)
+        statement = upsert.on_conflict_do_update(
+            index_elements=[JobStageCount.job_id, JobStageCount.stage],
+            set_={"count": JobStageCount.count + upsert.excluded["count"]},
+        )
+        await db.execute(statement, rows)
+
+    @staticmethod
+    async def remove_job(db: AsyncSession, job_id: int) -> None:
+        await db.execute(delete(JobStageCount).where(JobStageCount.job_id == job_id))
+
+    @staticmethod
+    async def job_pipeline(db: AsyncSession, job_id: int) -> dict:
+        pipeline = empty_pipeline()
+        rows = await db.execute(
+            select(JobStageCount.stage, JobStageCount.count).where(JobStageCount.job_id == job_id)
+        )
+        for stage, count in rows:
+            pipeline[stage] = count
+        return pipeline
+
+    @staticmethod
+    async def recruiter_pipeline(db: AsyncSession, recruiter_id: int) -> dict:
+        pipeline = empty_pipeline()
+        rows = await db.execute(
+            select(JobStageCount.stage, func.sum(JobStageCount.count))
+            .join(Job, Job.id == JobStageCount.job_id)
+            .where(Job.created_by_id == recruiter_id)
+            .group_by(JobStageCount.stage)
+        )
+        for stage, count in rows:
+            pipeline[stage] = count
+        return pipeline
+
+    @staticmethod
+    def rebuild(db: Session) -> int:
+        db.execute(delete(JobStageCount))
+        db.execute(counters_from_applications())
+        db.commit()
+        return db.scalar(select(func.count()).select_from(JobStageCount))
+
+
+if __name__ == "__main__":
+    from ..database import SessionLocal
+
+    with SessionLocal() as db:
+        print(f"Rebuilt {PipelineService.rebuild(db)} job/stage counters.")
@@ -0,0 +1,326 @@
+import heapq
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import defaultdict, deque
+from typing import Iterable, Optional
+
+import redis
+import redis.asyncio as aioredis
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+# "redis" for multi-process deployments, "memory" for tests / single node
+QUEUE_BACKEND = os.getenv("QUEUE_BACKEND", "redis")
+
+REDIS_URL = os.getenv("REDIS_URL", "redis://127.0.0.1:6379/0")
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "20"))
+REDIS_POOL_TIMEOUT = float(os.getenv("REDIS_POOL_TIMEOUT", "5"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "2"))
+
+
+# -----------------------------
+# POOLED REDIS CLIENT
+# -----------------------------
+
+_redis_client: Optional[redis.StrictRedis] = None
+_redis_lock = threading.Lock()
+
+
+def get_redis() -> redis.StrictRedis:
+    """Process-wide client over a bounded pool: callers wait up to
+    REDIS_POOL_TIMEOUT for a free connection instead of opening more."""
+    global _redis_client
+    with _redis_lock:
+        if _redis_client is None:
+            pool = redis.BlockingConnectionPool.from_url(
+                REDIS_URL,
+                max_connections=REDIS_MAX_CONNECTIONS,
+                timeout=REDIS_POOL_TIMEOUT,
+                socket_timeout=REDIS_SOCKET_TIMEOUT,
+                socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+                health_check_interval=30,
+            )
+            _redis_client = redis.StrictRedis(connection_pool=pool)
+        return _redis_client
+
+
+_async_redis_client: Optional[aioredis.StrictRedis] = None
+
+
+def get_async_redis() -> aioredis.StrictRedis:
+    """Same pool settings as get_redis(), for code running on the event loop."""
+    global _async_redis_client
+    if _async_redis_client is None:
+        pool = aioredis.BlockingConnectionPool.from_url(
+            REDIS_URL,
+            max_connections=REDIS_MAX_CONNECTIONS,
+            timeout=REDIS_POOL_TIMEOUT,
+            socket_timeout=REDIS_SOCKET_TIMEOUT,
+            socket_connect_timeout=REDIS_CONNECT_TIMEOUT,
+            health_check_interval=30,
+        )
+        _async_redis_client = aioredis.StrictRedis(connection_pool=pool)
+    return _async_redis_client
+
+
+# -----------------------------
+# QUEUE BACKEND INTERFACE
+# -----------------------------
+# A reliable work queue: consumers claim messages into their own in-flight
+# set and settle each one (ack / retry later / dead-letter) when done, so a
+# consumer that dies mid-batch can recover its messages on restart.
+# Consumers also keep a heartbeat alive; the in-flight set of a consumer
+# whose heartbeat expired is re-queued by whichever consumer notices first,
+# so messages of a worker that never comes back are not stranded.
+
+class QueueBackend(ABC):
+
+    @abstractmethod
+    def push_many(self, items: Iterable[tuple[str, str]]) -> None:
+        """Enqueue (queue, payload) pairs in one round trip."""
+
+    def push(self, queue: str, payload: str) -> None:
+        self.push_many([(queue, payload)])
+
+    @abstractmethod
+    def claim(self, queue: str, consumer: str, max_items: int, timeout: float) -> list:
+        """Move up to max_items oldest messages in flight, waiting up to
+        timeout seconds for the first one."""
+
+    @abstractmethod
+    def settle(
+        self,
+        queue: str,
+        consumer: str,
+        acked: list,
+        retries: list[tuple[object, str, float]],
+        dead: list[tuple[object, str]],
+    ) -> None:
+        """Atomically finish a claimed batch. ``retries`` holds
+        (claimed, new_payload, due_at) and ``dead`` (claimed, new_payload)."""
+
+    @abstractmethod
+    def promote_due(self, queue: str, max_items: int) -> int:
+        """Re-queue retries whose due time has passed."""
+
+    @abstractmethod
+    def recover(self, queue: str, consumer: str) -> int:
+        """Re-queue messages a previous run of consumer left in flight."""
+
+    @abstractmethod
+    def heartbeat(self, queue: str, consumer: str, ttl: float) -> None:
+        """Mark consumer alive for the next ttl seconds."""
+
+    @abstractmethod
+    def reclaim_orphans(self, queue: str) -> int:
+        """Re-queue the in-flight messages of consumers whose heartbeat
+        expired."""
+
+    @abstractmethod
+    def length(self, queue: str) -> int:
+        """Pending (not in flight, not delayed) messages."""
+
+
+# -----------------------------
+# REDIS BACKEND
+# -----------------------------
+# Keys for a queue named Q:
+#   Q                       pending messages (LPUSH in, taken from the right)
+#   Q:processing:<consumer> in-flight messages of one consumer
+#   Q:heartbeat:<consumer>  present (with a TTL) while the consumer is alive
+#   Q:delayed               retries, scored by the time they become due
+#   Q:dead                  messages that exhausted their attempts
+
+class RedisQueueBackend(QueueBackend):
+
+    def __init__(self, client: redis.StrictRedis):
+        self.client = client
+
+    def push_many(self, items):
+        pipe = self.client.pipeline(transaction=False)
+        for queue, payload in items:
+            pipe.lpush(queue, payload)
+        pipe.execute()
+
+    def claim(self, queue, consumer, max_items, timeout):
+        processing = f"{queue}:processing:{consumer}"
+        first = self.client.blmove(queue, processing, timeout, "RIGHT", "LEFT")
+        if first is None:
+            return []
+
+        pipe = self.client.pipeline(transaction=False)
+        for _ in range(max_items - 1):
+            pipe.lmove(queue, processing, "RIGHT", "LEFT")
+        return [first] + [raw for raw in pipe.execute() if raw is not None]
+
+    def settle(self, queue, consumer, acked, retries, dead):
+        processing = f"{queue}:processing:{consumer}"
+        pipe = self.client.pipeline(transaction=True)
+        for raw in acked:
+            pipe.lrem(processing, 1, raw)
+        for raw, payload, due_at in retries:
+            pipe.lrem(processing, 1, raw)
+            pipe.zadd(f"{queue}:delayed", {payload: due_at})
+        for raw, payload in dead:
+            pipe.lrem(processing, 1, raw)
+            pipe.lpush(f"{queue}:dead", payload)
+        pipe.execute()
+
+    def promote_due(self, queue, max_items):
+        delayed = f"{queue}:delayed"
+        due = self.client.zrangebyscore(delayed, 0, time.time(), start=0, num=max_items)
+        if not due:
+            return 0
+
+        pipe = self.client.pipeline(transaction=True)
+        for raw in due:
+            pipe.zrem(delayed, raw)
+            pipe.rpush(queue, raw)
+        pipe.execute()
+        return len(due)
+
+    def recover(self, queue, consumer):
+        processing = f"{queue}:processing:{consumer}"
+        recovered = 0
+        while self.client.lmove(processing, queue, "LEFT", "RIGHT") is not None:
+            recovered += 1
+        return recovered
+
+    def heartbeat(self, queue, consumer, ttl):
+        self.client.set(f"{queue}:heartbeat:{consumer}", 1, px=int(ttl * 1000))
+
+    def reclaim_orphans(self, queue):
+        prefix = f"{queue}:processing:"
+        reclaimed = 0
+        for key in self.client.scan_iter(match=f"{prefix}*", count=100):
+            consumer = key.decode()[len(prefix):]
+            if self.client.exists(f"{queue}:heartbeat:{consumer}"):
+                continue
+            reclaimed += self.recover(queue, consumer)
+        return reclaimed
+
+    def length(self, queue):
+        return self.client.llen(queue)
+
+
+# -----------------------------
+# IN-PROCESS BACKEND
+# -----------------------------
+
+class InMemoryQueueBackend(QueueBackend):
+    """Thread-safe, same semantics as the Redis backend, nothing survives
+    a restart. For tests and single-process deployments."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = defaultdict(deque)      # queue -> deque (oldest on the right)
+        self._in_flight = defaultdict(list)     # (queue, consumer) -> payloads
+        self._delayed = defaultdict(list)       # queue -> heap of (due_at, seq, payload)
+        self._dead = defaultdict(list)
+        self._alive_until = {}                  # (queue, consumer) -> monotonic deadline
+        self._seq = 0
+
+    def push_many(self, items):
+        with self._cond:
+            for queue, payload in items:
+                self._pending[queue].appendleft(payload)
+            self._cond.notify_all()
+
+    def claim(self, queue, consumer, max_items, timeout):
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while not self._pending[queue]:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return []
+                self._cond.wait(remaining)
+
+            pending = self._pending[queue]
+            batch = [pending.pop() for _ in range(min(max_items, len(pending)))]
+            self._in_flight[(queue, consumer)].extend(batch)
+            return batch
+
+    def settle(self, queue, consumer, acked, retries, dead):
+        with self._cond:
+            in_flight = self._in_flight[(queue, consumer)]
+            for raw in acked:
+                in_flight.remove(raw)
+            for raw, payload, due_at in retries:
+                in_flight.remove(raw)
+                self._seq += 1
+                heapq.heappush(self._delayed[queue], (due_at, self._seq, payload))
+            for raw, payload in dead:
+                in_flight.remove(raw)
+                self._dead[queue].insert(0, payload)
+
+    def promote_due(self, queue, max_items):
+        now = time.time()
+        promoted = 0
+        with self._cond:
+            delayed = self._delayed[queue]
+            while delayed and delayed[0][0] <= now and promoted < max_items:
+                self._pending[queue].append(heapq.heappop(delayed)[2])
+                promoted += 1
+            if promoted:
+                self._cond.notify_all()
+        return promoted
+
+    def recover(self, queue, consumer):
+        with self._cond:
+            in_flight = self._in_flight.pop((queue, consumer), [])
+            self._pending[queue].extend(reversed(in_flight))
+            if in_flight:
+                self._cond.notify_all()
+            return len(in_flight)
+
+    def heartbeat(self, queue, consumer, ttl):
+        with self._cond:
+            self._alive_until[(queue, consumer)] = time.monotonic() + ttl
+
+    def reclaim_orphans(self, queue):
+        now = time.monotonic()
+        with self._cond:
+            orphans = [
+                consumer for q, consumer in self._in_flight
+                if q == queue and self._alive_until.get((q, consumer), 0) <= now
+            ]
+        return sum(self.recover(queue, consumer) for consumer in orphans)
+
+    def length(self, queue):
+        with self._cond:
+            return len(self._pending[queue])
+
+    def dead_letters(self, queue: str) -> list:
+        with self._cond:
+            return list(self._dead[queue])
+
+
+# -----------------------------
+# BACKEND SELECTION
+# -----------------------------
+
+_backend: Optional[QueueBackend] = None
+
+
+def get_queue_backend() -> QueueBackend:
+    global _backend
+    if _backend is None:
+        if QUEUE_BACKEND == "memory":
+            _backend = InMemoryQueueBackend()
+        elif QUEUE_BACKEND == "redis":
+            _backend = RedisQueueBackend(get_redis())
+        else:
+            raise RuntimeError(f"Unknown QUEUE_BACKEND {QUEUE_BACKEND!r} (expected 'redis' or 'memory')")
+    return _backend
+
+
+def set_queue_backend(backend: QueueBackend) -> None:
+    """Swap the process-wide backend, e.g. for tests."""
+    global _backend
+    _backend = backend
@@ -0,0 +1,437 @@
+import asyncio
+import json
+import os
+import re
+import time
+import zlib
+from typing import Optional
+
+import numpy as np
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..database import AsyncReadSessionLocal
+from ..models import Application, Job, JobStatus, OutboxMessage
+from ..schemas import ApplicationOut, JobOut, RankedApplication, ScoredJob
+from .event_broker import JOB_INDEX_CHANNEL, EventBroker, get_event_broker, listen_forever
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+# Hashed feature space; collisions only matter when it is small next to the vocabulary
+RECOMMEND_FEATURES = int(os.getenv("RECOMMEND_FEATURES", str(2 ** 18)))
+
+# Jobs added or changed since the last compaction, scanned in full by every query
+RECOMMEND_TAIL_MAX = int(os.getenv("RECOMMEND_TAIL_MAX", "2000"))
+
+# Full reload from the database, which also repairs any missed broadcast
+RECOMMEND_REBUILD_SECONDS = float(os.getenv("RECOMMEND_REBUILD_SECONDS", "3600"))
+
+# A title word counts like this many description words
+TITLE_WEIGHT = 3
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+_STOPWORDS = frozenset(
+    "a an and are as at be but by for from has have in is it its of on or our that the "
+    "their this to was we were will with you your".split()
+)
+
+
+# -----------------------------
+# JOB VECTORS
+# -----------------------------
+# TF-IDF in the SMART "lnc.ltc" scheme: a job is its sublinear term
+# frequencies (1 + log tf), L2-normalised, with no idf; a query gets idf
+# applied and is normalised when it is scored. Job vectors therefore never
+# depend on the rest of the corpus, so adding, changing or removing one job
+# only touches that job's row and the document frequencies.
+#
+# Words are hashed into RECOMMEND_FEATURES columns (no vocabulary to keep in
+# sync between workers). Rows are stored twice: per job (to build profiles)
+# and per feature (postings, to score a query without visiting every job).
+# Postings cover rows up to the last compaction; rows added since then form a
+# small tail that is scanned in full. Replaced and removed rows stay behind as
+# dead rows until the next compaction.
+
+_EMPTY = (np.empty(0, np.int32), np.empty(0, np.float32))
+
+
+def job_features(title: Optional[str], description: Optional[str]) -> tuple[np.ndarray, np.ndarray]:
+    """Sorted feature ids and lnc weights of one job (or free-text query)."""
+    counts: dict[int, int] = {}
+    for weight, text in ((TITLE_WEIGHT, title), (1, description)):
+        for token in _TOKEN_RE.findall((text or "").lower()):
+            if len(token) < 2 or token in _STOPWORDS:
+                continue
+            feature = zlib.crc32(token.encode()) % RECOMMEND_FEATURES
+            counts[feature] = counts.get(feature, 0) + weight
+    if not counts:
+        return _EMPTY
+
+    features = np.fromiter(counts.keys(), np.int32, len(counts))
+    values = 1 + np.log(np.fromiter(counts.values(), np.float32, len(counts)))
+    order = np.argsort(features)
+    values = values[order]
+    return features[order], (values / np.linalg.norm(values)).astype(np.float32)
+
+
+def _sum_vectors(vectors: list) -> tuple[np.ndarray, np.ndarray]:
+    vectors = [v for v in vectors if v[0].size]
+    if not vectors:
+        return _EMPTY
+    features, inverse = np.unique(np.concatenate([f for f, _ in vectors]), return_inverse=True)
+    values = np.bincount(inverse, weights=np.concatenate([v for _, v in vectors]))
+    return features.astype(np.int32), values.astype(np.float32)
+
+
+def _padded(array: np.ndarray, size: int) -> np.ndarray:
+    grown = np.zeros(size, array.dtype)
+    grown[:array.size] = array
+    return grown
+
+
+def _normalized(vector: tuple[np.ndarray, np.ndarray]) -> tuple[np.ndarray, np.ndarray]:
+    features, values = vector
+    norm = np.linalg.norm(values)
+    return (features, values / norm) if norm > 0 else _EMPTY
+
+
+class JobVectors:
+
+    def __init__(self, n_features: int = RECOMMEND_FEATURES):
+        self.n_features = n_features
+        self.df = np.zeros(n_features, np.int32)
+        self.row_of: dict[int, int] = {}  # job id -> current row
+        self._docs: list = []             # row -> (features, values), None once dead
+        self._job_ids = np.zeros(1024, np.int64)
+        self._open = np.zeros(1024, bool)  # row is live and its job is open
+        self._rows = 0
+        self._dead = 0
+
+        self._compacted = 0
+        self._indptr = np.zeros(n_features + 1, np.int64)
+        self._post_rows = np.empty(0, np.int32)
+        self._post_values = np.empty(0, np.float32)
+        self._tail: Optional[tuple] = None
+
+    @classmethod
+    def build(cls, jobs, n_features: int = RECOMMEND_FEATURES) -> "JobVectors":
+        """From (id, title, description, status) rows."""
+        vectors = cls(n_features)
+        for job_id, title, description, status in jobs:
+            vectors._append(job_id, job_features(title, description), status == JobStatus.OPEN)
+        vectors.compact()
+        return vectors
+
+    def __len__(self) -> int:
+        return len(self.row_of)
+
+    # -- updates ----------------------------------------------------------
+
+    def upsert(self, job_id: int, title: str, description: Optional[str], is_open: bool) -> None:
+        vector = job_features(title, description)
+        row = self.row_of.get(job_id)
+        if row is not None:
+            old_features, old_values = self._docs[row]
+            if np.array_equal(old_features, vector[0]) and np.allclose(old_values, vector[1]):
+                self._open[row] = is_open
+                return
+            self._kill(row)
+        self._append(job_id, vector, is_open)
+        self._maybe_compact()
+
+    def remove(self, job_id: int) -> None:
+        row = self.row_of.get(job_id)
+        if row is not None:
+            self._kill(row)
+            self._maybe_compact()
+
+    def apply(self, event: dict) -> None:
+        if event.get("deleted"):
+            self.remove(event["job_id"])
+        else:
+            self.upsert(event["job_id"], event["title"], event["description"], event["status"] == JobStatus.OPEN.value)
+
+    def _append(self, job_id: int, vector, is_open: bool) -> None:
+        if self._rows == len(self._job_ids):
+            self._job_ids = _padded(self._job_ids, 2 * self._rows)
+            self._open = _padded(self._open, 2 * self._rows)
+        row = self._rows
+        self._rows += 1
+        self._docs.append(vector)
+        self._job_ids[row] = job_id
+        self._open[row] = is_open
+        self.row_of[job_id] = row
+        self.df[vector[0]] += 1
+        self._tail = None
+
+    def _kill(self, row: int) -> None:
+        self.df[self._docs[row][0]] -= 1
+        del self.row_of[int(self._job_ids[row])]
+        self._docs[row] = None
+        self._open[row] = False
+        self._dead += 1
+
+    def _maybe_compact(self) -> None:
+        if self._rows - self._compacted > RECOMMEND_TAIL_MAX or self._dead > max(len(self), 1000) // 4:
+            self.compact()
+
+    def compact(self) -> None:
+        """Drop dead rows and move every row into the postings."""
+        live = [row for row in range(self._rows) if self._docs[row] is not None]
+        docs = [self._docs[row] for row in live]
+        self._job_ids = _padded(self._job_ids[live], max(len(live), 1024))
+        self._open = _padded(self._open[live], max(len(live), 1024))
+        self._docs = docs
+        self._rows = len(docs)
+        self._dead = 0
+        self.row_of = {int(job_id): row for row, job_id in enumerate(self._job_ids[:self._rows])}
+
+        lengths = np.fromiter((f.size for f, _ in docs), np.int64, len(docs))
+        features = np.concatenate([f for f, _ in docs]) if docs else _EMPTY[0]
+        order = np.argsort(features, kind="stable")
+        self._post_rows = np.repeat(np.arange(len(docs), dtype=np.int32), lengths)[order]
+        self._post_values = (np.concatenate([v for _, v in docs]) if docs else _EMPTY[1])[order]
+        self._indptr = np.zeros(self.n_features + 1, np.int64)
+        np.cumsum(np.bincount(features, minlength=self.n_features), out=self._indptr[1:])
+        self._compacted = self._rows
+        self._tail = None
+
+    # -- scoring ----------------------------------------------------------
+
+    def vector(self, job_id: int):
+        row = self.row_of.get(job_id)
+        return self._docs[row] if row is not None else _EMPTY
+
+    def query(self, vector) -> tuple[np.ndarray, np.ndarray]:
+        """ltc weights for a (summed) job vector: idf applied, L2-normalised."""
+        features, values = vector
+        df = self.df[features]
+        known = df > 0
+        features = features[known]
+        values = values[known] * np.log(max(len(self), 1) / df[known])
+        useful = values > 0
+        return _normalized((features[useful], values[useful].astype(np.float32)))
+
+    def scores(self, query) -> np.ndarray:
+        """Cosine of the query with every row (dead rows included)."""
+        features, weights = query
+        scores = np.zeros(self._rows)
+        if not features.size:
+            return scores
+
+        starts = self._indptr[features]
+        lengths = self._indptr[features + 1] - starts
+        total = int(lengths.sum())
+        if total:
+            offsets = np.arange(total) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+            positions = np.repeat(starts, lengths) + offsets
+            scores[:self._compacted] = np.bincount(
+                self._post_rows[positions],
+                weights=self._post_values[positions] * np.repeat(weights, lengths),
+                minlength=self._compacted,
+            )
+
+        rows, tail_features, tail_values = self._tail_entries()
+        if tail_features.size:
+            index = np.minimum(np.searchsorted(features, tail_features), features.size - 1)
+            hit = features[index] == tail_features
+            scores += np.bincount(rows[hit], weights=tail_values[hit] * weights[index[hit]], minlength=self._rows)
+        return scores
+
+    def _tail_entries(self):
+        if self._tail is None:
+            docs = [(row, self._docs[row]) for row in range(self._compacted, self._rows) if self._docs[row] is not None]
+            if docs:
+                self._tail = (
+                    np.repeat([row for row, _ in docs], [doc[0].size for _, doc in docs]),
+                    np.concatenate([doc[0] for _, doc in docs]),
+                    np.concatenate([doc[1] for _, doc in docs]),
+                )
+            else:
+                self._tail = (np.empty(0, np.int64), *_EMPTY)
+        return self._tail
+
+    def top_open_jobs(self, query, k: int, exclude: list[int]) -> list[tuple[int, float]]:
+        """Best k open jobs for the query as (job id, score), best first."""
+        scores = self.scores(query)
+        scores[~self._open[:self._rows]] = 0
+        excluded = [self.row_of[job_id] for job_id in exclude if job_id in self.row_of]
+        scores[excluded] = 0
+
+        rows = np.flatnonzero(scores > 0)
+        if rows.size > k:
+            rows = rows[np.argpartition(-scores[rows], k - 1)[:k]]
+        rows = rows[np.lexsort((self._job_ids[rows], -scores[rows]))]
+        return [(int(self._job_ids[row]), float(scores[row])) for row in rows]
+
+    def mean_similarity(self, job_id: int, pairs: list[tuple[int, int]]) -> dict[int, float]:
+        """For (key, other job id) pairs: each key's mean similarity of its
+        other jobs to job_id."""
+        if not pairs:
+            return {}
+        scores = self.scores(self.query(self.vector(job_id)))
+        keys, inverse = np.unique(np.fromiter((key for key, _ in pairs), np.int64, len(pairs)), return_inverse=True)
+        rows = np.fromiter((self.row_of.get(other, -1) for _, other in pairs), np.int64, len(pairs))
+        similarities = np.where(rows >= 0, scores[rows], 0.0)
+        means = np.bincount(inverse, weights=similarities) / np.bincount(inverse)
+        return dict(zip(keys.tolist(), means.tolist()))
+
+
+# -----------------------------
+# PER-WORKER INDEX
+# -----------------------------
+# Built from the read database on first use, then kept current by job
+# create / update / delete: the writing worker applies the change right after
+# its commit, and every worker gets it through JOB_INDEX_CHANNEL (an outbox
+# row written in the same transaction, broadcast by the relay). Reloaded
+# every RECOMMEND_REBUILD_SECONDS in the background.
+
+class JobMatchIndex:
+
+    def __init__(self, broker: EventBroker):
+        self.broker = broker
+        self._vectors: Optional[JobVectors] = None
+        self._built_at = 0.0
+        self._build_task: Optional[asyncio.Task] = None
+        self._pending: Optional[list] = None  # changes seen while a build runs
+        self._listener: Optional[asyncio.Task] = None
+
+    async def vectors(self) -> JobVectors:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(listen_forever(self.broker, JOB_INDEX_CHANNEL, self.dispatch))
+
+        if self._vectors is None:
+            await asyncio.shield(self._start_build())
+        elif time.monotonic() - self._built_at > RECOMMEND_REBUILD_SECONDS:
+            self._start_build()  # keep serving the current vectors meanwhile
+        return self._vectors
+
+    def _start_build(self) -> asyncio.Task:
+        if self._build_task is None:
+            self._build_task = asyncio.create_task(self._build())
+        return self._build_task
+
+    async def _build(self) -> None:
+        started = time.perf_counter()
+        self._pending = []
+        try:
+            async with AsyncReadSessionLocal() as db:
+                jobs = (await db.execute(select(Job.id, Job.title, Job.description, Job.status))).all()
+            vectors = await asyncio.to_thread(JobVectors.build, jobs)
+            for event in self._pending:
+                vectors.apply(event)
+            self._vectors = vectors
+            self._built_at = time.monotonic()
+            print(f"🧭 Job match index built: {len(vectors)} jobs in {time.perf_counter() - started:.2f} s")
+        finally:
+            self._pending = None
+            self._build_task = None
+
+    def apply(self, event: dict) -> None:
+        if self._pending is not None:
+            self._pending.append(event)
+        if self._vectors is not None:
+            self._vectors.apply(event)
+
+    def dispatch(self, payload) -> None:
+        self.apply(json.loads(payload))
+
+
+job_match_index = JobMatchIndex(get_event_broker())
+
+
+def _job_event(job) -> dict:
+    return {"job_id": job.id, "title": job.title, "description": job.description, "status": job.status.value}
+
+
+class RecommendationService:
+
+    @staticmethod
+    def index_job(db: AsyncSession, job: Job) -> dict:
+        """Queue the job's new content for every worker's index, in the
+        caller's transaction. Pass the result to job_match_index.apply once
+        committed."""
+        event = _job_event(job)
+        db.add(OutboxMessage(queue=JOB_INDEX_CHANNEL, payload=json.dumps(event)))
+        return event
+
+    @staticmethod
+    async def index_new_jobs(db: AsyncSession, jobs: list) -> list[dict]:
+        """index_job for many jobs, with one executemany."""
+        events = [_job_event(job) for job in jobs]
+        if events:
+            await db.execute(
+                insert(OutboxMessage),
+                [{"queue": JOB_INDEX_CHANNEL, "payload": json.dumps(event)} for event in events],
+            )
+        return events
+
+    @staticmethod
+    def remove_job(db: AsyncSession, job_id: int) -> dict:
+        event = {"job_id": job_id, "deleted": True}
+        db.add(OutboxMessage(queue=JOB_INDEX_CHANNEL, payload=json.dumps(event)))
+        return event
+
+    @staticmethod
+    async def recommend_jobs(db: AsyncSession, candidate_id: int, q: Optional[str], limit: int) -> list[ScoredJob]:
+        """Open jobs most similar to the ones the candidate applied to, and to
+        q when given; jobs already applied to are left out."""
+        applied = (
+            await db.execute(select(Application.job_id).where(Application.candidate_id == candidate_id))
+        ).scalars().all()
+        vectors = await job_match_index.vectors()
+
+        profile = _normalized(_sum_vectors([vectors.vector(job_id) for job_id in applied]))
+        if q:
+            profile = _sum_vectors([profile, job_features(None, q)])
+        ranked = vectors.top_open_jobs(vectors.query(profile), limit, exclude=applied)
+        if not ranked:
+            return []
+
+        jobs = {
+            job.id: job
+            for job in (await db.execute(select(Job).where(Job.id.in_([job_id for job_id, _ in ranked])))).scalars()
+        }
+        return [
+            ScoredJob(**JobOut.model_validate(jobs[job_id]).model_dump(), score=round(score, 4))
+            for job_id, score in ranked
+            # The index may lag a job being closed or deleted
+            if job_id in jobs and jobs[job_id].status == JobStatus.OPEN
+        ]
+
+    @staticmethod
+    async def rank_applications(db: AsyncSession, job_id: int, limit: int) -> list[RankedApplication]:
+        """Applications to the job, best match first: how similar each
+        candidate's other applications are to this job (0 when it is their
+        only one), then oldest first."""
+        applications = (
+            await db.execute(select(Application).where(Application.job_id == job_id))
+        ).scalars().all()
+        if not applications:
+            return []
+
+        others = (
+            await db.execute(
+                select(Application.candidate_id, Application.job_id).where(
+                    Application.candidate_id.in_(
+                        select(Application.candidate_id).where(Application.job_id == job_id)
+                    ),
+                    Application.job_id != job_id,
+                )
+            )
+        ).all()
+        vectors = await job_match_index.vectors()
+        similarity = vectors.mean_similarity(job_id, [tuple(row) for row in others])
+
+        ranked = sorted(applications, key=lambda a: (-similarity.get(a.candidate_id, 0.0), a.created_at, a.id))
+        return [
+            RankedApplication(
+                **ApplicationOut.model_validate(application).model_dump(),
+                score=round(similarity.get(application.candidate_id, 0.0), 4),
+            )
+            for application in ranked[:limit]
+        ]
@@ -0,0 +1,131 @@
+import re
+from typing import Optional
+
+from sqlalchemy import select, text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from ..models import Job, JobStatus
+
+
+# -----------------------------
+# FTS5 INDEX OVER JOB TITLE / DESCRIPTION
+# -----------------------------
+# The virtual table is created by migration 0002_jobs_fts.
+# The virtual table's rowid is the job id, so keeping it in sync is a
+# delete + insert keyed on Job.id inside the caller's transaction.
+# Short prefix indexes keep search-as-you-type queries off a full term scan.
+
+FTS_TABLE = "jobs_fts"
+
+# bm25 column weights: a hit in the title counts more than one in the body
+TITLE_WEIGHT = 10.0
+DESCRIPTION_WEIGHT = 1.0
+
+_TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def _is_sqlite(bind) -> bool:
+    return bind.dialect.name == "sqlite"
+
+
+def _to_match_query(q: str) -> Optional[str]:
+    # Quote every term so user input can never inject FTS5 operators;
+    # the last term is a prefix match to support search-as-you-type.
+    tokens = _TOKEN_RE.findall(q)
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += "*"
+    return " ".join(terms)
+
+
+class JobSearchService:
+
+    @staticmethod
+    async def index_job(db: AsyncSession, job: Job) -> None:
+        if not _is_sqlite(db.bind):
+            return
+
+        await JobSearchService.remove_job(db, job.id)
+        await db.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                "VALUES (:id, :title, :description)"
+            ),
+            {"id": job.id, "title": job.title, "description": job.description or ""},
+        )
+
+    @staticmethod
+    async def index_new_jobs(db: AsyncSession, jobs: list[dict]) -> None:
+        """index_job for many just-inserted jobs (id, title, description) in
+        one executemany."""
+        if not jobs or not _is_sqlite(db.bind):
+            return
+
+        await db.execute(
+            text(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                "VALUES (:id, :title, :description)"
+            ),
+            [{"id": job["id"], "title": job["title"], "description": job["description"] or ""} for job in jobs],
+        )
+
+    @staticmethod
+    async def remove_job(db: AsyncSession, job_id: int) -> None:
+        if not _is_sqlite(db.bind):
+            return
+
+        await db.execute(text(f"DELETE FROM {FTS_TABLE} WHERE rowid = :id"), {"id": job_id})
+
+    @staticmethod
+    async def search(
+        db: AsyncSession,
+        q: str,
+        limit: int,
+        offset: int = 0,
+        status: Optional[JobStatus] = None,
+    ) -> list[Job]:
+        if not _is_sqlite(db.bind):
+            # No FTS5 outside SQLite: fall back to a plain substring match
+            pattern = f"%{q}%"
+            query = select(Job).where(
+                Job.title.ilike(pattern) | Job.description.ilike(pattern)
+            )
+            if status is not None:
+                query = query.where(Job.status == status)
+            query = query.order_by(Job.id).offset(offset).limit(limit)
+            return (await db.execute(query)).scalars().all()
+
+        match = _to_match_query(q)
+        if match is None:
+            return []
+
+        params = {"match": match, "limit": limit, "offset": offset}
+        if status is None:
+            # Rank and page inside the FTS table first so only one page of
+            # rows is joined back to jobs
+            sql = (
+                "SELECT jobs.* FROM ("
+                f"SELECT rowid AS job_id, bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match "
+                "ORDER BY score LIMIT :limit OFFSET :offset"
+                ") AS hits JOIN jobs ON jobs.id = hits.job_id "
+                "ORDER BY hits.score, jobs.id"
+            )
+        else:
+            # Status is not in the FTS table, and a jobs subquery inside the
+            # MATCH WHERE clause makes FTS5 re-evaluate it per hit (seconds on
+            # 100k jobs). Score every hit in FTS, then filter on jobs.status
+            # through the primary key join and page the survivors.
+            params["status"] = status.name
+            sql = (
+                "SELECT jobs.* FROM ("
+                f"SELECT rowid AS job_id, bm25({FTS_TABLE}, {TITLE_WEIGHT}, {DESCRIPTION_WEIGHT}) AS score "
+                f"FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH :match"
+                ") AS hits JOIN jobs ON jobs.id = hits.job_id "
+                "WHERE jobs.status = :status "
+                "ORDER BY hits.score, jobs.id LIMIT :limit OFFSET :offset"
+            )
+
+        query = select(Job).from_statement(text(sql).bindparams(**params))
+        return (await db.execute(query)).scalars().all()
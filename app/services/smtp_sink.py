@@ -0,0 +1,83 @@
+import asyncio
+import os
+import time
+
+
+# -----------------------------
+# FAKE SMTP SINK (load testing only)
+# -----------------------------
+# Accepts and discards mail, printing throughput, so the email worker can
+# be measured without a real mail server:
+#
+#     python -m app.services.smtp_sink             # listens on 127.0.0.1:1025
+#     SMTP_HOST=127.0.0.1 SMTP_PORT=1025 python background_worker.py
+
+SINK_HOST = os.getenv("SMTP_SINK_HOST", "127.0.0.1")
+SINK_PORT = int(os.getenv("SMTP_SINK_PORT", "1025"))
+SINK_DELAY = float(os.getenv("SMTP_SINK_DELAY", "0"))  # simulated per-message latency
+
+received = 0
+
+
+async def handle_client(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    global received
+
+    def reply(line: str):
+        writer.write(f"{line}\r\n".encode())
+
+    reply("220 smtp-sink ready")
+    await writer.drain()
+
+    in_data = False
+    while True:
+        line = await reader.readline()
+        if not line:
+            break
+
+        if in_data:
+            if line in (b".\r\n", b".\n"):
+                in_data = False
+                if SINK_DELAY:
+                    await asyncio.sleep(SINK_DELAY)
+                received += 1
+                reply("250 OK queued")
+                await writer.drain()
+            continue
+
+        command = line[:4].upper()
+        if command == b"EHLO":
+            reply("250-smtp-sink")
+            reply("250 8BITMIME")
+        elif command == b"DATA":
+            in_data = True
+            reply("354 End data with <CR><LF>.<CR><LF>")
+        elif command == b"QUIT":
+            reply("221 Bye")
+            await writer.drain()
+            break
+        else:
+            # HELO, MAIL, RCPT, RSET, NOOP...
+            reply("250 OK")
+        await writer.drain()
+
+    writer.close()
+
+
+async def report():
+    last, last_time = 0, time.monotonic()
+    while True:
+        await asyncio.sleep(5)
+        now = time.monotonic()
+        print(f"📬 received={received} rate={(received - last) / (now - last_time):.1f}/s")
+        last, last_time = received, now
+
+
+async def main():
+    server = await asyncio.start_server(handle_client, SINK_HOST, SINK_PORT)
+    print(f"SMTP sink listening on {SINK_HOST}:{SINK_PORT}")
+    async with server:
+        await asyncio.gather(server.serve_forever(), report())
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,166 @@
+import asyncio
+import json
+import os
+import time
+from datetime import datetime
+from typing import AsyncIterator, Optional
+
+from fastapi import HTTPException, status
+
+from ..metrics import sse_connections, sse_slow_consumers
+from .event_broker import STAGE_EVENTS_CHANNEL, EventBroker, get_event_broker, listen_forever
+
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+
+# Open event streams per API worker, and per candidate
+SSE_MAX_CONNECTIONS = int(os.getenv("SSE_MAX_CONNECTIONS", "2000"))
+SSE_MAX_CONNECTIONS_PER_USER = int(os.getenv("SSE_MAX_CONNECTIONS_PER_USER", "3"))
+
+# Events buffered per connection; a client that falls this far behind is
+# disconnected (it reconnects and reloads) instead of growing the buffer
+SSE_QUEUE_SIZE = int(os.getenv("SSE_QUEUE_SIZE", "32"))
+
+SSE_HEARTBEAT_SECONDS = float(os.getenv("SSE_HEARTBEAT_SECONDS", "15"))
+
+# Streams are closed after this long so they can't outlive the access token
+SSE_MAX_CONNECTION_SECONDS = float(os.getenv("SSE_MAX_CONNECTION_SECONDS", "900"))
+
+SSE_RETRY_MS = 3000
+
+
+def stage_event_row(candidate_id: int, application_id: int, job_id: int, old_stage, new_stage, changed_at: datetime) -> dict:
+    """Outbox row announcing a stage change to the candidate's open streams."""
+    return {
+        "queue": STAGE_EVENTS_CHANNEL,
+        "payload": json.dumps({
+            "candidate_id": candidate_id,
+            "application_id": application_id,
+            "job_id": job_id,
+            "old_stage": old_stage.value if old_stage is not None else None,
+            "new_stage": new_stage.value,
+            "changed_at": changed_at.isoformat(),
+        }),
+    }
+
+
+# -----------------------------
+# PER-WORKER FAN-OUT TO SSE STREAMS
+# -----------------------------
+
+class Subscription:
+    __slots__ = ("user_id", "queue")
+
+    def __init__(self, user_id: int, queue_size: int):
+        self.user_id = user_id
+        # None in the queue means "fell behind, disconnect"
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+
+
+class StageEventHub:
+
+    def __init__(self, broker: EventBroker, max_connections: int, max_per_user: int, queue_size: int):
+        self.broker = broker
+        self.max_connections = max_connections
+        self.max_per_user = max_per_user
+        self.queue_size = queue_size
+        self._subscriptions: dict[int, set[Subscription]] = {}
+        self._count = 0
+        self._listener: Optional[asyncio.Task] = None
+
+    def check_capacity(self, user_id: int) -> None:
+        """Refuse a new stream up front with 503 (worker full) or 429 (user has
+        too many), so the client sees a real status instead of an empty stream."""
+        if self._count >= self.max_connections:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Too many open event streams, please retry shortly.",
+                headers={"Retry-After": "5"},
+            )
+        if len(self._subscriptions.get(user_id, ())) >= self.max_per_user:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many open event streams for this user.",
+                headers={"Retry-After": "5"},
+            )
+
+    def subscribe(self, user_id: int) -> Optional[Subscription]:
+        """Register a stream, or None if the limits filled up meanwhile."""
+        subscriptions = self._subscriptions.setdefault(user_id, set())
+        if self._count >= self.max_connections or len(subscriptions) >= self.max_per_user:
+            if not subscriptions:
+                del self._subscriptions[user_id]
+            return None
+
+        self._ensure_listening()
+        subscription = Subscription(user_id, self.queue_size)
+        subscriptions.add(subscription)
+        self._count += 1
+        sse_connections.inc()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        subscriptions = self._subscriptions.get(subscription.user_id)
+        if subscriptions is None or subscription not in subscriptions:
+            return
+        subscriptions.discard(subscription)
+        if not subscriptions:
+            del self._subscriptions[subscription.user_id]
+        self._count -= 1
+        sse_connections.dec()
+
+    def dispatch(self, payload) -> None:
+        event = json.loads(payload)
+        for subscription in self._subscriptions.get(event.pop("candidate_id"), ()):
+            try:
+                subscription.queue.put_nowait(event)
+            except asyncio.QueueFull:
+                sse_slow_consumers.inc()
+                while not subscription.queue.empty():
+                    subscription.queue.get_nowait()
+                subscription.queue.put_nowait(None)
+
+    def _ensure_listening(self) -> None:
+        if self._listener is None or self._listener.done():
+            self._listener = asyncio.create_task(
+                listen_forever(self.broker, STAGE_EVENTS_CHANNEL, self.dispatch)
+            )
+
+    async def stream(self, user_id: int) -> AsyncIterator[str]:
+        """Server-sent events for one connection. Subscribes when the body
+        starts (a client gone before that holds no slot) and unsubscribes
+        when it ends."""
+        subscription = self.subscribe(user_id)
+        if subscription is None:
+            yield f"retry: {SSE_RETRY_MS}\n: busy\n\n"
+            return
+
+        closes_at = time.monotonic() + SSE_MAX_CONNECTION_SECONDS
+        try:
+            yield f"retry: {SSE_RETRY_MS}\n: connected\n\n"
+            while True:
+                remaining = closes_at - time.monotonic()
+                if remaining <= 0:
+                    return
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(), timeout=min(SSE_HEARTBEAT_SECONDS, remaining)
+                    )
+                except asyncio.TimeoutError:
+                    yield ": heartbeat\n\n"
+                    continue
+                if event is None:
+                    return
+                yield f"event: stage_changed\ndata: {json.dumps(event)}\n\n"
+        finally:
+            self.unsubscribe(subscription)
+
+
+stage_event_hub = StageEventHub(
+    broker=get_event_broker(),
+    max_connections=SSE_MAX_CONNECTIONS,
+    max_per_user=SSE_MAX_CONNECTIONS_PER_USER,
+    queue_size=SSE_QUEUE_SIZE,
+)
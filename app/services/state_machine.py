@@ -0,0 +1,46 @@
+from typing import Optional
+
+from ..models import ApplicationStage
+
+
+# -----------------------------
+# APPLICATION STAGE STATE MACHINE
+# -----------------------------
+#   Applied → Screening → Interview → Offer → Hired
+#      └──────────┴───────────┴─────────┴──→ Rejected
+#
+# Hired and Rejected are final. Staying in the same stage is not a
+# transition: it would write history and email the candidate for nothing.
+
+TRANSITIONS: dict[ApplicationStage, frozenset] = {
+    ApplicationStage.APPLIED: frozenset({ApplicationStage.SCREENING, ApplicationStage.REJECTED}),
+    ApplicationStage.SCREENING: frozenset({ApplicationStage.INTERVIEW, ApplicationStage.REJECTED}),
+    ApplicationStage.INTERVIEW: frozenset({ApplicationStage.OFFER, ApplicationStage.REJECTED}),
+    ApplicationStage.OFFER: frozenset({ApplicationStage.HIRED, ApplicationStage.REJECTED}),
+    ApplicationStage.HIRED: frozenset(),
+    ApplicationStage.REJECTED: frozenset(),
+}
+
+# Every allowed (old, new) pair, so a check is a single set lookup
+ALLOWED = frozenset((old, new) for old, targets in TRANSITIONS.items() for new in targets)
+
+# Applications created before stages were enforced may have no stage yet
+_START = ApplicationStage.APPLIED
+
+
+def can_transition(old_stage: Optional[ApplicationStage], new_stage: ApplicationStage) -> bool:
+    return (old_stage or _START, new_stage) in ALLOWED
+
+
+def transition_error(old_stage: Optional[ApplicationStage], new_stage: ApplicationStage) -> Optional[str]:
+    """None when old_stage -> new_stage is allowed, otherwise why not."""
+    if can_transition(old_stage, new_stage):
+        return None
+
+    old_stage = old_stage or _START
+    if old_stage == new_stage:
+        return f"Application is already in stage {new_stage.value}"
+    if not TRANSITIONS[old_stage]:
+        return f"Application is {old_stage.value}; its stage can no longer change"
+    allowed = ", ".join(sorted(stage.value for stage in TRANSITIONS[old_stage]))
+    return f"Cannot move application from {old_stage.value} to {new_stage.value} (allowed: {allowed})"
@@ -1,18 +1,176 @@
-import redis
 import json
+import os
+import socket
+import threading
 import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
 
-redis_client = redis.StrictRedis(host="127.0.0.1", port=6379, db=0)
+from .email_service import EmailService
+from .queue_backend import QueueBackend, get_queue_backend
 
-print("📨 Worker started. Listening for jobs...")
 
-while True:
-    job = redis_client.brpop("email_queue")
-    data = json.loads(job[1])
+# -----------------------------
+# CONFIG
+# -----------------------------
 
-    print("\n📬 New Email Job Received:")
-    print(json.dumps(data, indent=2))
+EMAIL_QUEUE = "email_queue"
 
-    # Simulate sending email
-    time.sleep(1)
-    print("✅ Email processed.\n")
+# Unique per process by default, so workers on one host never share each
+# other's in-flight list. A crashed worker's list is re-queued by a live
+# worker once its heartbeat expires (or at once by a restart under the same id)
+WORKER_ID = os.getenv("WORKER_ID") or f"{socket.gethostname()}-{os.getpid()}"
+EMAIL_WORKER_CONCURRENCY = int(os.getenv("EMAIL_WORKER_CONCURRENCY", "8"))
+EMAIL_WORKER_BATCH_SIZE = int(os.getenv("EMAIL_WORKER_BATCH_SIZE", "50"))
+EMAIL_MAX_ATTEMPTS = int(os.getenv("EMAIL_MAX_ATTEMPTS", "5"))
+EMAIL_RETRY_BASE_DELAY = float(os.getenv("EMAIL_RETRY_BASE_DELAY", "1"))
+EMAIL_RETRY_MAX_DELAY = float(os.getenv("EMAIL_RETRY_MAX_DELAY", "300"))
+EMAIL_WORKER_POP_TIMEOUT = float(os.getenv("EMAIL_WORKER_POP_TIMEOUT", "1"))
+EMAIL_WORKER_STATS_INTERVAL = float(os.getenv("EMAIL_WORKER_STATS_INTERVAL", "10"))
+EMAIL_WORKER_HEARTBEAT_TTL = float(os.getenv("EMAIL_WORKER_HEARTBEAT_TTL", "30"))
+EMAIL_WORKER_RECLAIM_INTERVAL = float(os.getenv("EMAIL_WORKER_RECLAIM_INTERVAL", "30"))
+
+
+# -----------------------------
+# RELIABLE BATCHED EMAIL WORKER
+# -----------------------------
+# Messages are claimed into this worker's in-flight set, sent concurrently,
+# then acked, scheduled for a retry with exponential backoff, or moved to
+# the dead-letter list after EMAIL_MAX_ATTEMPTS (see queue_backend.py).
+# A background thread renews the worker's heartbeat every third of its TTL,
+# independent of how long a batch takes; every EMAIL_WORKER_RECLAIM_INTERVAL
+# the worker re-queues in-flight lists of workers whose heartbeat expired.
+
+def send_task(data: dict) -> None:
+    EmailService.send_email(
+        data.get("email"),
+        data.get("subject", "No Subject"),
+        data.get("message", "No Message"),
+    )
+
+
+def retry_delay(attempts: int) -> float:
+    return min(EMAIL_RETRY_BASE_DELAY * (2 ** (attempts - 1)), EMAIL_RETRY_MAX_DELAY)
+
+
+class EmailWorker:
+
+    def __init__(
+        self,
+        backend: QueueBackend,
+        queue: str = EMAIL_QUEUE,
+        worker_id: str = WORKER_ID,
+        concurrency: int = EMAIL_WORKER_CONCURRENCY,
+        batch_size: int = EMAIL_WORKER_BATCH_SIZE,
+        max_attempts: int = EMAIL_MAX_ATTEMPTS,
+        sender=send_task,
+    ):
+        self.backend = backend
+        self.queue = queue
+        self.worker_id = worker_id
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.sender = sender
+        self.executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="email")
+
+        self.sent = 0
+        self.retried = 0
+        self.dead_lettered = 0
+
+    def _deliver(self, raw) -> Optional[str]:
+        try:
+            self.sender(json.loads(raw))
+            return None
+        except Exception as e:
+            return f"{type(e).__name__}: {e}"
+
+    def run_once(self, timeout: float = EMAIL_WORKER_POP_TIMEOUT) -> int:
+        self.backend.promote_due(self.queue, self.batch_size)
+
+        batch = self.backend.claim(self.queue, self.worker_id, self.batch_size, timeout)
+        if not batch:
+            return 0
+
+        errors = list(self.executor.map(self._deliver, batch))
+
+        acked, retries, dead = [], [], []
+        for raw, error in zip(batch, errors):
+            if error is None:
+                acked.append(raw)
+                continue
+
+            try:
+                data = json.loads(raw)
+            except ValueError:
+                # Unparseable payloads can never succeed
+                dead.append((raw, raw))
+                continue
+
+            data.setdefault("message_id", uuid.uuid4().hex)  # keeps retries distinct
+            data["attempts"] = data.get("attempts", 0) + 1
+            data["last_error"] = error
+
+            if data["attempts"] >= self.max_attempts:
+                dead.append((raw, json.dumps(data)))
+            else:
+                retries.append((raw, json.dumps(data), time.time() + retry_delay(data["attempts"])))
+
+        # Ack / reschedule / dead-letter the whole batch atomically
+        self.backend.settle(self.queue, self.worker_id, acked, retries, dead)
+
+        self.sent += len(acked)
+        self.retried += len(retries)
+        self.dead_lettered += len(dead)
+        return len(batch)
+
+    def _keep_alive(self):
+        while True:
+            try:
+                self.backend.heartbeat(self.queue, self.worker_id, EMAIL_WORKER_HEARTBEAT_TTL)
+            except Exception as e:
+                print(f"❌ Heartbeat error: {e}")
+            time.sleep(EMAIL_WORKER_HEARTBEAT_TTL / 3)
+
+    def reclaim_orphans(self) -> int:
+        reclaimed = self.backend.reclaim_orphans(self.queue)
+        if reclaimed:
+            print(f"♻️ Re-queued {reclaimed} in-flight message(s) of dead workers.")
+        return reclaimed
+
+    def run(self):
+        # Alive before the first claim, so no other worker reclaims our list
+        self.backend.heartbeat(self.queue, self.worker_id, EMAIL_WORKER_HEARTBEAT_TTL)
+        threading.Thread(target=self._keep_alive, name="email-heartbeat", daemon=True).start()
+
+        recovered = self.backend.recover(self.queue, self.worker_id)
+        print(f"📌 Email worker {self.worker_id} started ({recovered} in-flight message(s) recovered).")
+
+        started = last_report = time.monotonic()
+        last_reclaim = None
+        while True:
+            try:
+                if last_reclaim is None or time.monotonic() - last_reclaim >= EMAIL_WORKER_RECLAIM_INTERVAL:
+                    last_reclaim = time.monotonic()
+                    self.reclaim_orphans()
+                self.run_once()
+            except Exception as e:
+                print(f"❌ Worker error: {e}")
+                time.sleep(2)
+
+            now = time.monotonic()
+            if now - last_report >= EMAIL_WORKER_STATS_INTERVAL:
+                rate = self.sent / (now - started)
+                print(
+                    f"📊 sent={self.sent} retried={self.retried} "
+                    f"dead={self.dead_lettered} rate={rate:.1f}/s"
+                )
+                last_report = now
+
+
+def main():
+    EmailWorker(get_queue_backend()).run()
+
+
+if __name__ == "__main__":
+    main()
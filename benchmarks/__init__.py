@@ -0,0 +1,5 @@
+import os
+
+# All benchmark traffic comes from one client address: measure the routes,
+# not the rate limiter (set RATE_LIMIT_ENABLED=1 to include it)
+os.environ.setdefault("RATE_LIMIT_ENABLED", "0")
@@ -0,0 +1,157 @@
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from collections import Counter
+
+import httpx
+from sqlalchemy import func, select
+
+from app.auth import create_access_token, user_claims
+from app.database import SessionLocal
+from app.models import Job, JobStatus, User, UserRole
+
+from .run import _change, _summary
+
+
+# -----------------------------
+# APPLY BURST
+# -----------------------------
+# Many candidates applying to the same freshly posted job at once (the
+# hiring-season spike), plus a share of repeat submissions that must be
+# rejected as duplicates. Reports latency, throughput and SQL statements per
+# request for POST /applications/:
+#
+#     python -m benchmarks.apply_burst --applicants 2000 --concurrency 64 --output before.json
+#     python -m benchmarks.apply_burst --applicants 2000 --concurrency 64 --compare before.json
+#
+# Needs seeded users (python -m benchmarks.seed); each run posts new jobs.
+
+ROUTE = ("POST", "/applications/")
+
+
+def _create_jobs(count: int, rng: random.Random) -> list[int]:
+    with SessionLocal() as db:
+        recruiter = db.scalars(
+            select(User).where(User.role == UserRole.RECRUITER).order_by(func.random()).limit(1)
+        ).first()
+        if recruiter is None:
+            raise SystemExit("No recruiters; run `python -m benchmarks.seed` first.")
+        jobs = [
+            Job(
+                title=f"Apply burst {rng.randint(0, 10**6)}",
+                description="Benchmark job",
+                status=JobStatus.OPEN,
+                company_id=recruiter.company_id,
+                created_by_id=recruiter.id,
+            )
+            for _ in range(count)
+        ]
+        db.add_all(jobs)
+        db.commit()
+        return [job.id for job in jobs]
+
+
+def _load_candidates(count: int) -> list[User]:
+    with SessionLocal() as db:
+        candidates = db.scalars(
+            select(User).where(User.role == UserRole.CANDIDATE).order_by(func.random()).limit(count)
+        ).all()
+    if len(candidates) < count:
+        raise SystemExit(f"Only {len(candidates)} candidates; seed more or lower --applicants.")
+    return candidates
+
+
+def _requests(candidates, job_ids, duplicate_ratio, rng) -> list[tuple[str, int]]:
+    tokens = {user.id: create_access_token(user_claims(user)) for user in candidates}
+    first = [(tokens[user.id], rng.choice(job_ids)) for user in candidates]
+    repeats = rng.sample(first, int(len(first) * duplicate_ratio))
+    # Repeats go after the first half so most of them hit an existing application
+    head, tail = first[: len(first) // 2], first[len(first) // 2:] + repeats
+    rng.shuffle(tail)
+    return head + tail
+
+
+async def _burst(app, requests, concurrency):
+    latencies = []
+    statuses = Counter()
+    queue = iter(requests)
+
+    async def worker(client):
+        for token, job_id in queue:
+            started = time.perf_counter()
+            try:
+                response = await client.post(
+                    "/applications/", params={"job_id": job_id}, headers={"Authorization": f"Bearer {token}"}
+                )
+                status = response.status_code
+            except Exception as e:
+                print(f"  {type(e).__name__}: {str(e).splitlines()[0]}", file=sys.stderr)
+                status = 0
+            latencies.append(time.perf_counter() - started)
+            statuses[status] += 1
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        return latencies, statuses, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark concurrent applications to the same job.")
+    parser.add_argument("--applicants", type=int, default=2000)
+    parser.add_argument("--jobs", type=int, default=1, help="spread the applicants over this many new jobs")
+    parser.add_argument("--duplicate-ratio", type=float, default=0.1, help="extra repeat submissions")
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="JSON report of an earlier run to diff against")
+    args = parser.parse_args()
+
+    # Imported here so --help works without touching the database
+    from app.database import async_engine, async_read_engine
+    from app.main import app
+    from app.metrics import db_queries_per_request
+
+    rng = random.Random(args.seed)
+    requests = _requests(_load_candidates(args.applicants), _create_jobs(args.jobs, rng), args.duplicate_ratio, rng)
+
+    async def run():
+        try:
+            return await _burst(app, requests, args.concurrency)
+        finally:
+            await async_engine.dispose()
+            await async_read_engine.dispose()
+
+    latencies, statuses, elapsed = asyncio.run(run())
+
+    errors = sum(count for code, count in statuses.items() if code not in (200, 400))
+    report = _summary(latencies, errors, elapsed, statuses)
+    series = db_queries_per_request._values.get(ROUTE)
+    report["sql_statements_per_request"] = round(series[-1] / sum(series[:-1]), 2) if series else None
+    report["concurrency"] = args.concurrency
+    report["jobs"] = args.jobs
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+    for key in ("requests", "errors", "throughput_rps", "p50_ms", "p95_ms", "p99_ms", "sql_statements_per_request"):
+        line = f"{key:<28} {report[key]!s:>10}"
+        if baseline and isinstance(report[key], (int, float)) and baseline.get(key) is not None:
+            line += f"  (was {baseline[key]}, {_change(baseline[key], report[key])})"
+        print(line)
+    print(f"{'statuses':<28} {report['statuses']}")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
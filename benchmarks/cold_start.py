@@ -0,0 +1,71 @@
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+
+# -----------------------------
+# WORKER COLD START
+# -----------------------------
+# Times `import app.main` (everything a uvicorn worker does before it can
+# serve) in fresh interpreters, against an already-migrated database:
+#
+#     python -m benchmarks.cold_start --runs 20
+
+PROBE = """
+import time
+started = time.perf_counter()
+import app.main
+print(time.perf_counter() - started)
+"""
+
+
+def measure(runs: int, database_url: str) -> list[float]:
+    env = {**os.environ, "DATABASE_URL": database_url}
+    timings = []
+    for _ in range(runs):
+        result = subprocess.run(
+            [sys.executable, "-c", PROBE], env=env, capture_output=True, text=True, check=True
+        )
+        timings.append(float(result.stdout.strip().splitlines()[-1]))
+    return timings
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure API worker import/startup time.")
+    parser.add_argument("--runs", type=int, default=10)
+    parser.add_argument("--database-url", help="default: a fresh, migrated SQLite file")
+    parser.add_argument("--output", help="write the JSON result here")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        database_url = args.database_url or f"sqlite:///{tmp}/cold_start.db"
+        if not args.database_url:
+            subprocess.run(
+                [sys.executable, "-m", "app.migrations", "upgrade"],
+                env={**os.environ, "DATABASE_URL": database_url}, capture_output=True, check=True,
+            )
+
+        # The first run warms the OS file cache and bytecode
+        measure(1, database_url)
+        timings = measure(args.runs, database_url)
+
+    result = {
+        "runs": args.runs,
+        "median_ms": round(statistics.median(timings) * 1000, 1),
+        "min_ms": round(min(timings) * 1000, 1),
+        "max_ms": round(max(timings) * 1000, 1),
+    }
+    print(f"import app.main: median {result['median_ms']} ms "
+          f"(min {result['min_ms']}, max {result['max_ms']}) over {args.runs} runs")
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(result, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,576 @@
+import argparse
+import asyncio
+import csv
+import io
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+from collections import Counter, defaultdict
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Callable, Optional
+
+import httpx
+from sqlalchemy import func, select
+
+from app.auth import create_access_token, user_claims
+from app.database import DATABASE_URL, SessionLocal
+from app.models import Application, ApplicationStage, Job, JobStatus, User, UserRole
+
+from .seed import BENCH_PASSWORD
+
+
+# -----------------------------
+# IN-PROCESS LOAD GENERATOR
+# -----------------------------
+# Drives every route of the API through an ASGI transport (no sockets, no
+# server) with a fixed, seeded request mix, and reports throughput and
+# latency percentiles per route:
+#
+#     python -m benchmarks.seed --applications 1000000 --reset
+#     python -m benchmarks.run --requests 20000 --concurrency 64 --output after.json
+#     python -m benchmarks.run --requests 20000 --concurrency 64 --compare before.json
+#
+# The database is whatever app.database points at; run the seed first so
+# there are users, jobs and applications to sample from.
+#
+# Streaming routes (EXCLUDED_ROUTES) are not driven: the ASGI transport
+# buffers whole responses, and an event stream only ends when the client
+# leaves, so its "latency" would be the stream lifetime anyway.
+
+FIXTURE_SAMPLE_SIZE = 2000
+BULK_CHANGES_PER_REQUEST = 50
+
+# Rows per import body; users are few because every password is hashed
+IMPORT_JOBS_PER_REQUEST = 20
+IMPORT_USERS_PER_REQUEST = 3
+
+SEARCH_TERMS = ["engineer", "python", "senior data", "devops kubernetes", "react", "ma", "secur"]
+
+EXCLUDED_ROUTES = {
+    "GET /applications/me/events": "server-sent event stream, open until the client disconnects",
+}
+
+
+@dataclass
+class Scenario:
+    name: str
+    weight: float
+    ok_statuses: frozenset
+    # (fixtures, rng) -> (method, url, request kwargs), or None when not possible right now
+    build: Callable[["Fixtures", random.Random], Optional[tuple]]
+    # (fixtures, response) -> None, called after a successful response
+    on_success: Optional[Callable[["Fixtures", httpx.Response], None]] = None
+
+
+# -----------------------------
+# FIXTURES (sampled ids and tokens)
+# -----------------------------
+
+class Fixtures:
+
+    def __init__(self, sample_size: int, rng: random.Random):
+        self.run_id = f"{int(time.time())}{rng.randint(0, 9999):04d}"
+        self.registered = 0
+        self.created_jobs: list[tuple[int, int]] = []  # (job id, owner id)
+        self.tokens: dict[int, str] = {}
+
+        with SessionLocal() as db:
+            self.row_counts = {
+                model.__tablename__: db.scalar(select(func.count()).select_from(model))
+                for model in (User, Job, Application)
+            }
+
+            def sample(query):
+                return db.execute(query.order_by(func.random()).limit(sample_size)).all()
+
+            recruiters = db.scalars(
+                select(User).where(User.role == UserRole.RECRUITER).order_by(func.random()).limit(sample_size)
+            ).all()
+            candidates = db.scalars(
+                select(User).where(User.role == UserRole.CANDIDATE).order_by(func.random()).limit(sample_size)
+            ).all()
+            self.users = {user.id: user for user in [*recruiters, *candidates]}
+            self.recruiter_ids = [user.id for user in recruiters]
+            self.candidate_ids = [user.id for user in candidates]
+            self.login_ids = self.recruiter_ids + self.candidate_ids
+            self.max_job_id = db.scalar(select(func.max(Job.id))) or 0
+
+            self.jobs = sample(select(Job.id, Job.created_by_id, Job.company_id))
+            self.applications = sample(
+                select(Application.id, Application.candidate_id, Job.created_by_id)
+                .join(Job, Job.id == Application.job_id)
+            )
+
+            # Own-data routes need a user that actually owns something
+            extra_ids = {row.created_by_id for row in self.jobs} | {row.candidate_id for row in self.applications}
+            extra_ids -= self.users.keys()
+            if extra_ids:
+                for user in db.scalars(select(User).where(User.id.in_(extra_ids))):
+                    self.users[user.id] = user
+
+        if not (self.recruiter_ids and self.candidate_ids and self.jobs and self.applications):
+            raise SystemExit("Not enough data to benchmark; run `python -m benchmarks.seed` first.")
+
+        self.applications_by_recruiter = defaultdict(list)
+        for row in self.applications:
+            self.applications_by_recruiter[row.created_by_id].append(row.id)
+
+    def auth(self, user_id: int) -> dict:
+        # Minted directly: logging in once per user would benchmark bcrypt, not the route
+        if user_id not in self.tokens:
+            self.tokens[user_id] = create_access_token(user_claims(self.users[user_id]))
+        return {"Authorization": f"Bearer {self.tokens[user_id]}"}
+
+    def next_email(self) -> str:
+        self.registered += 1
+        return f"bench-{self.run_id}-{self.registered}@bench.example"
+
+
+# -----------------------------
+# REQUEST MIX
+# -----------------------------
+# Weights approximate a read-heavy job board: public job reads dominate,
+# recruiters page through pipelines, writes are a small share.
+
+def _stage(rng):
+    return rng.choice(list(ApplicationStage)).value
+
+
+def _register(f: Fixtures, rng):
+    return "POST", "/auth/register", {"json": {
+        "email": f.next_email(),
+        "password": BENCH_PASSWORD,
+        "full_name": "Bench User",
+        "role": UserRole.CANDIDATE.value,
+    }}
+
+
+def _login(f: Fixtures, rng):
+    user = f.users[rng.choice(f.login_ids)]
+    return "POST", "/auth/login", {"params": {"email": user.email, "password": BENCH_PASSWORD}}
+
+
+def _list_jobs(f: Fixtures, rng):
+    params = {"limit": 20}
+    if rng.random() < 0.5:
+        params["cursor"] = rng.randint(0, f.max_job_id)
+    if rng.random() < 0.3:
+        params["status"] = JobStatus.OPEN.value
+    if rng.random() < 0.2:
+        params["company_id"] = rng.choice(f.jobs).company_id
+    return "GET", "/jobs/", {"params": params}
+
+
+def _search_jobs(f: Fixtures, rng):
+    params = {"q": rng.choice(SEARCH_TERMS), "limit": 20}
+    if rng.random() < 0.3:
+        params["status"] = JobStatus.OPEN.value
+    return "GET", "/jobs/search", {"params": params}
+
+
+def _get_job(f: Fixtures, rng):
+    return "GET", f"/jobs/{rng.choice(f.jobs).id}", {}
+
+
+def _recommended_jobs(f: Fixtures, rng):
+    params = {"limit": 20}
+    if rng.random() < 0.3:
+        params["q"] = rng.choice(SEARCH_TERMS)
+    return "GET", "/jobs/recommended", {
+        "headers": f.auth(rng.choice(f.applications).candidate_id),
+        "params": params,
+    }
+
+
+def _pipeline_summary(f: Fixtures, rng):
+    return "GET", "/jobs/pipeline/summary", {"headers": f.auth(rng.choice(f.jobs).created_by_id)}
+
+
+def _job_pipeline(f: Fixtures, rng):
+    job = rng.choice(f.jobs)
+    return "GET", f"/jobs/{job.id}/pipeline", {"headers": f.auth(job.created_by_id)}
+
+
+def _create_job(f: Fixtures, rng):
+    job = rng.choice(f.jobs)
+    return "POST", "/jobs/", {
+        "headers": f.auth(job.created_by_id),
+        "json": {"title": "Benchmark Engineer", "description": "Created by the benchmark.", "company_id": job.company_id},
+    }
+
+
+def _update_job(f: Fixtures, rng):
+    job = rng.choice(f.jobs)
+    return "PUT", f"/jobs/{job.id}", {
+        "headers": f.auth(job.created_by_id),
+        "json": {"title": f"Benchmark Engineer {rng.randint(1, 1000)}", "description": "Updated by the benchmark.", "company_id": job.company_id},
+    }
+
+
+def _remember_created_job(f: Fixtures, response):
+    job = response.json()
+    f.created_jobs.append((job["id"], job["created_by_id"]))
+
+
+def _delete_job(f: Fixtures, rng):
+    # Only jobs this run created, so the seeded data set stays intact
+    if not f.created_jobs:
+        return None
+    job_id, owner_id = f.created_jobs.pop()
+    return "DELETE", f"/jobs/{job_id}", {"headers": f.auth(owner_id)}
+
+
+def _import_body(rows: list[dict], fmt: str) -> bytes:
+    if fmt == "ndjson":
+        return "".join(json.dumps(row) + "\n" for row in rows).encode()
+    out = io.StringIO()
+    writer = csv.DictWriter(out, fieldnames=list(rows[0]))
+    writer.writeheader()
+    writer.writerows(rows)
+    return out.getvalue().encode()
+
+
+def _import_jobs(f: Fixtures, rng):
+    job = rng.choice(f.jobs)
+    fmt = rng.choice(["csv", "ndjson"])
+    rows = [
+        {"title": f"Imported Engineer {n}", "description": "Imported by the benchmark, with a \"quoted\" word.", "company_id": job.company_id}
+        for n in range(IMPORT_JOBS_PER_REQUEST)
+    ]
+    return "POST", "/import/jobs", {
+        "headers": f.auth(job.created_by_id),
+        "params": {"format": fmt},
+        "content": _import_body(rows, fmt),
+    }
+
+
+def _import_users(f: Fixtures, rng):
+    fmt = rng.choice(["csv", "ndjson"])
+    rows = [
+        {"email": f.next_email(), "password": BENCH_PASSWORD, "full_name": "Imported User", "role": UserRole.CANDIDATE.value}
+        for _ in range(IMPORT_USERS_PER_REQUEST)
+    ]
+    return "POST", "/import/users", {
+        "headers": f.auth(rng.choice(f.recruiter_ids)),
+        "params": {"format": fmt},
+        "content": _import_body(rows, fmt),
+    }
+
+
+def _apply(f: Fixtures, rng):
+    return "POST", "/applications/", {
+        "headers": f.auth(rng.choice(f.candidate_ids)),
+        "params": {"job_id": rng.choice(f.jobs).id},
+    }
+
+
+def _change_stage(f: Fixtures, rng):
+    application = rng.choice(f.applications)
+    return "PATCH", f"/applications/{application.id}/stage", {
+        "headers": f.auth(application.created_by_id),
+        "params": {"new_stage": _stage(rng)},
+    }
+
+
+def _bulk_change_stage(f: Fixtures, rng):
+    recruiter_id = rng.choice(list(f.applications_by_recruiter))
+    ids = f.applications_by_recruiter[recruiter_id][:BULK_CHANGES_PER_REQUEST]
+    return "PATCH", "/applications/bulk/stage", {
+        "headers": f.auth(recruiter_id),
+        "json": {"changes": [{"application_id": app_id, "new_stage": _stage(rng)} for app_id in ids]},
+    }
+
+
+def _job_applications(f: Fixtures, rng):
+    job = rng.choice(f.jobs)
+    return "GET", f"/applications/job/{job.id}", {"headers": f.auth(job.created_by_id)}
+
+
+def _ranked_applications(f: Fixtures, rng):
+    job = rng.choice(f.jobs)
+    return "GET", f"/applications/job/{job.id}/ranked", {
+        "headers": f.auth(job.created_by_id),
+        "params": {"limit": 20},
+    }
+
+
+def _my_applications(f: Fixtures, rng):
+    return "GET", "/applications/me", {"headers": f.auth(rng.choice(f.applications).candidate_id)}
+
+
+def _recruiter_applications(f: Fixtures, rng):
+    return "GET", "/applications/recruiter/all", {"headers": f.auth(rng.choice(f.applications).created_by_id)}
+
+
+def _recruiter_export(f: Fixtures, rng):
+    return "GET", "/applications/recruiter/export", {
+        "headers": f.auth(rng.choice(f.applications).created_by_id),
+        "params": {"format": rng.choice(["csv", "ndjson"])},
+    }
+
+
+def _job_analytics(f: Fixtures, rng):
+    job = rng.choice(f.jobs)
+    return "GET", f"/analytics/jobs/{job.id}", {"headers": f.auth(job.created_by_id)}
+
+
+def _company_analytics(f: Fixtures, rng):
+    recruiter = f.users[rng.choice(f.recruiter_ids)]
+    if recruiter.company_id is None:
+        return None
+    return "GET", f"/analytics/companies/{recruiter.company_id}", {"headers": f.auth(recruiter.id)}
+
+
+def _application_history(f: Fixtures, rng):
+    application = rng.choice(f.applications)
+    return "GET", f"/history/application/{application.id}", {"headers": f.auth(application.created_by_id)}
+
+
+def _my_history(f: Fixtures, rng):
+    application = rng.choice(f.applications)
+    return "GET", f"/history/me/{application.id}", {"headers": f.auth(application.candidate_id)}
+
+
+OK = frozenset({200})
+
+SCENARIOS = [
+    Scenario("POST /auth/register", 1, OK, _register),
+    Scenario("POST /auth/login", 1, OK, _login),
+    Scenario("GET /jobs/", 15, OK, _list_jobs),
+    Scenario("GET /jobs/search", 8, OK, _search_jobs),
+    Scenario("GET /jobs/{job_id}", 15, OK, _get_job),
+    Scenario("GET /jobs/recommended", 3, OK, _recommended_jobs),
+    Scenario("GET /jobs/pipeline/summary", 3, OK, _pipeline_summary),
+    Scenario("GET /jobs/{job_id}/pipeline", 3, OK, _job_pipeline),
+    Scenario("POST /jobs/", 1, OK, _create_job, _remember_created_job),
+    Scenario("PUT /jobs/{job_id}", 1, OK, _update_job),
+    Scenario("DELETE /jobs/{job_id}", 1, OK, _delete_job),
+    Scenario("POST /import/jobs", 0.2, OK, _import_jobs),
+    Scenario("POST /import/users", 0.2, OK, _import_users),
+    # A random candidate/job pair may already exist: 400 is the expected answer then
+    Scenario("POST /applications/", 3, frozenset({200, 400}), _apply),
+    Scenario("PATCH /applications/{application_id}/stage", 3, frozenset({200, 400, 409}), _change_stage),
+    Scenario("PATCH /applications/bulk/stage", 1, OK, _bulk_change_stage),
+    Scenario("GET /applications/job/{job_id}", 4, OK, _job_applications),
+    Scenario("GET /applications/job/{job_id}/ranked", 2, OK, _ranked_applications),
+    Scenario("GET /applications/me", 5, OK, _my_applications),
+    Scenario("GET /applications/recruiter/all", 1, OK, _recruiter_applications),
+    Scenario("GET /applications/recruiter/export", 0.5, OK, _recruiter_export),
+    Scenario("GET /history/application/{application_id}", 4, OK, _application_history),
+    Scenario("GET /history/me/{application_id}", 4, OK, _my_history),
+    Scenario("GET /analytics/jobs/{job_id}", 1, OK, _job_analytics),
+    Scenario("GET /analytics/companies/{company_id}", 1, OK, _company_analytics),
+]
+
+
+# -----------------------------
+# RUNNER
+# -----------------------------
+
+class Recorder:
+
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.statuses = defaultdict(Counter)
+        self.errors = Counter()
+
+    def record(self, scenario: Scenario, status: int, seconds: float) -> None:
+        self.latencies[scenario.name].append(seconds)
+        self.statuses[scenario.name][status] += 1
+        if status not in scenario.ok_statuses:
+            self.errors[scenario.name] += 1
+
+
+async def _worker(client, fixtures, recorder, rng, budget, deadline, only):
+    scenarios = [s for s in SCENARIOS if only is None or s.name in only]
+    weights = [s.weight for s in scenarios]
+
+    while budget["remaining"] > 0 and (deadline is None or time.perf_counter() < deadline):
+        scenario = rng.choices(scenarios, weights)[0]
+        request = scenario.build(fixtures, rng)
+        if request is None:
+            continue
+        budget["remaining"] -= 1
+
+        method, url, kwargs = request
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+            status = response.status_code
+        except Exception as e:
+            print(f"  {scenario.name}: {type(e).__name__}: {e}", file=sys.stderr)
+            status = 0
+        elapsed = time.perf_counter() - started
+
+        if recorder is not None:
+            recorder.record(scenario, status, elapsed)
+        if scenario.on_success is not None and status in scenario.ok_statuses:
+            scenario.on_success(fixtures, response)
+
+
+async def _drive(app, fixtures, recorder, seed, concurrency, requests, duration, only):
+    budget = {"remaining": requests if duration is None else float("inf")}
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        started = time.perf_counter()
+        deadline = started + duration if duration is not None else None
+        await asyncio.gather(*(
+            _worker(client, fixtures, recorder, random.Random(seed * 1000 + n), budget, deadline, only)
+            for n in range(concurrency)
+        ))
+        return time.perf_counter() - started
+
+
+# -----------------------------
+# REPORTING
+# -----------------------------
+
+def _percentile(sorted_values: list, pct: float) -> float:
+    # Nearest-rank percentile
+    index = max(0, min(len(sorted_values) - 1, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def _summary(latencies: list, errors: int, elapsed: float, statuses: Optional[Counter] = None) -> dict:
+    values = sorted(latencies)
+    summary = {
+        "requests": len(values),
+        "errors": errors,
+        "throughput_rps": round(len(values) / elapsed, 2),
+        "mean_ms": round(sum(values) / len(values) * 1000, 3),
+        "p50_ms": round(_percentile(values, 50) * 1000, 3),
+        "p95_ms": round(_percentile(values, 95) * 1000, 3),
+        "p99_ms": round(_percentile(values, 99) * 1000, 3),
+        "max_ms": round(values[-1] * 1000, 3),
+    }
+    if statuses is not None:
+        summary["statuses"] = {str(code): count for code, count in sorted(statuses.items())}
+    return summary
+
+
+def build_report(recorder: Recorder, elapsed: float, args, fixtures: Fixtures) -> dict:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    all_latencies = [value for values in recorder.latencies.values() for value in values]
+    return {
+        "meta": {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "git_commit": commit,
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "database": DATABASE_URL.split("://", 1)[0],
+            "row_counts": fixtures.row_counts,
+            "seed": args.seed,
+            "concurrency": args.concurrency,
+            "requests": args.requests,
+            "duration": args.duration,
+            "elapsed_seconds": round(elapsed, 3),
+        },
+        "total": _summary(all_latencies, sum(recorder.errors.values()), elapsed),
+        "routes": {
+            name: _summary(values, recorder.errors[name], elapsed, recorder.statuses[name])
+            for name, values in sorted(recorder.latencies.items())
+        },
+    }
+
+
+def print_report(report: dict, baseline: Optional[dict] = None) -> None:
+    header = f"{'route':<44} {'reqs':>7} {'err':>5} {'rps':>9} {'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'Δrps':>8} {'Δp95':>8}"
+    print(header)
+    print("-" * len(header))
+
+    def line(name, row, base):
+        text = (
+            f"{name:<44} {row['requests']:>7} {row['errors']:>5} {row['throughput_rps']:>9.1f} "
+            f"{row['p50_ms']:>9.2f} {row['p95_ms']:>9.2f} {row['p99_ms']:>9.2f}"
+        )
+        if baseline:
+            if base:
+                text += f" {_change(base['throughput_rps'], row['throughput_rps']):>8}"
+                text += f" {_change(base['p95_ms'], row['p95_ms']):>8}"
+            else:
+                text += f" {'new':>8} {'':>8}"
+        print(text)
+
+    for name, row in report["routes"].items():
+        line(name, row, (baseline or {}).get("routes", {}).get(name))
+    print("-" * len(header))
+    line("TOTAL", report["total"], (baseline or {}).get("total"))
+
+
+def _change(before: float, after: float) -> str:
+    if not before:
+        return "n/a"
+    return f"{(after - before) / before * 100:+.1f}%"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark every API route in-process.")
+    parser.add_argument("--requests", type=int, default=5000, help="measured requests (ignored with --duration)")
+    parser.add_argument("--duration", type=float, default=None, help="run for this many seconds instead")
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--warmup", type=int, default=200, help="unmeasured requests before the run")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--route", action="append", dest="routes", help="only this route (repeatable)")
+    parser.add_argument("--sample-size", type=int, default=FIXTURE_SAMPLE_SIZE)
+    parser.add_argument("--output", help="write the JSON report here")
+    parser.add_argument("--compare", help="JSON report of an earlier run to diff against")
+    args = parser.parse_args()
+
+    excluded = set(args.routes or []) & EXCLUDED_ROUTES.keys()
+    if excluded:
+        parser.error("; ".join(f"{name} is not benchmarked: {EXCLUDED_ROUTES[name]}" for name in sorted(excluded)))
+    unknown = set(args.routes or []) - {s.name for s in SCENARIOS}
+    if unknown:
+        parser.error(f"unknown route(s): {', '.join(sorted(unknown))}")
+    only = set(args.routes) if args.routes else None
+
+    # Imported here so --help works without touching the database
+    from app.main import app
+    from app.database import async_engine, async_read_engine
+    from app.services.password_service import password_hasher
+
+    fixtures = Fixtures(args.sample_size, random.Random(args.seed))
+    recorder = Recorder()
+
+    async def run():
+        try:
+            if args.warmup:
+                await _drive(app, fixtures, None, args.seed + 1, args.concurrency, args.warmup, None, only)
+            return await _drive(app, fixtures, recorder, args.seed, args.concurrency, args.requests, args.duration, only)
+        finally:
+            # Close pooled aiosqlite connections (and their threads) before the loop goes away
+            await async_engine.dispose()
+            await async_read_engine.dispose()
+
+    try:
+        elapsed = asyncio.run(run())
+    finally:
+        password_hasher.shutdown()
+
+    report = build_report(recorder, elapsed, args, fixtures)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+    print_report(report, baseline)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,321 @@
+import argparse
+import random
+import time
+from datetime import datetime, timedelta
+
+from sqlalchemy import create_engine, event, func, insert, select, text
+from sqlalchemy.orm import Session
+
+from app.database import DATABASE_URL, Base
+from app.migrations import upgrade
+from app.models import (
+    Application,
+    ApplicationHistory,
+    ApplicationStage,
+    Company,
+    Job,
+    JobStatus,
+    User,
+    UserRole,
+)
+from app.services.password_service import hash_password
+from app.services.pipeline_service import PipelineService
+from app.services.search_service import FTS_TABLE
+
+
+# -----------------------------
+# SYNTHETIC DATA GENERATOR
+# -----------------------------
+# Fills an empty database with realistic volumes so benchmarks run against
+# indexes and tables of production size:
+#
+#     python -m benchmarks.seed --applications 1000000
+#
+# Output is fully determined by --seed. Every seeded user has the password
+# BENCH_PASSWORD; emails are recruiter<N>@bench.example / candidate<N>@bench.example.
+
+BENCH_PASSWORD = "benchpass"
+EMAIL_DOMAIN = "bench.example"
+
+INSERT_CHUNK_SIZE = 10_000
+
+TITLES = [
+    "Backend Engineer", "Frontend Developer", "Data Scientist", "DevOps Engineer",
+    "Product Manager", "QA Analyst", "Mobile Developer", "Site Reliability Engineer",
+    "Machine Learning Engineer", "Technical Writer", "Security Engineer", "Data Engineer",
+    "UX Designer", "Support Engineer", "Solutions Architect", "Engineering Manager",
+]
+LEVELS = ["Junior", "Mid-level", "Senior", "Staff", "Principal", "Lead"]
+SKILLS = [
+    "python", "fastapi", "sqlalchemy", "postgres", "redis", "kubernetes", "docker", "aws",
+    "react", "typescript", "kotlin", "swift", "spark", "airflow", "terraform", "go",
+    "rust", "java", "graphql", "kafka", "pandas", "pytorch", "linux", "ci/cd",
+]
+
+# Where applications end up, and the path that leads there
+FINAL_STAGE_WEIGHTS = {
+    ApplicationStage.APPLIED: 40,
+    ApplicationStage.SCREENING: 20,
+    ApplicationStage.INTERVIEW: 10,
+    ApplicationStage.OFFER: 3,
+    ApplicationStage.HIRED: 2,
+    ApplicationStage.REJECTED: 25,
+}
+FORWARD_PATH = [
+    ApplicationStage.APPLIED,
+    ApplicationStage.SCREENING,
+    ApplicationStage.INTERVIEW,
+    ApplicationStage.OFFER,
+    ApplicationStage.HIRED,
+]
+
+
+def _stage_path(rng: random.Random, final: ApplicationStage) -> list:
+    if final != ApplicationStage.REJECTED:
+        return FORWARD_PATH[:FORWARD_PATH.index(final) + 1]
+    # Rejected from any stage before an offer is accepted
+    return FORWARD_PATH[:rng.randint(1, 4)] + [ApplicationStage.REJECTED]
+
+
+def _chunks(rows, size: int = INSERT_CHUNK_SIZE):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def _insert(db: Session, model, rows) -> int:
+    inserted = 0
+    for chunk in _chunks(rows):
+        db.execute(insert(model), chunk)
+        inserted += len(chunk)
+    return inserted
+
+
+# -----------------------------
+# GENERATORS (ids are assigned here so rows can reference each other)
+# -----------------------------
+
+def _companies(count: int):
+    for company_id in range(1, count + 1):
+        yield {"id": company_id, "name": f"Company {company_id}"}
+
+
+def _users(recruiters: int, candidates: int, companies: int, hashed_password: str):
+    for n in range(1, recruiters + 1):
+        yield {
+            "id": n,
+            "email": f"recruiter{n}@{EMAIL_DOMAIN}",
+            "full_name": f"Recruiter {n}",
+            "hashed_password": hashed_password,
+            "role": UserRole.RECRUITER,
+            "company_id": (n - 1) % companies + 1,
+        }
+    for n in range(1, candidates + 1):
+        yield {
+            "id": recruiters + n,
+            "email": f"candidate{n}@{EMAIL_DOMAIN}",
+            "full_name": f"Candidate {n}",
+            "hashed_password": hashed_password,
+            "role": UserRole.CANDIDATE,
+            "company_id": None,
+        }
+
+
+def _jobs(rng: random.Random, count: int, recruiters: int, companies: int):
+    for job_id in range(1, count + 1):
+        recruiter_id = rng.randint(1, recruiters)
+        skills = rng.sample(SKILLS, 5)
+        title = f"{rng.choice(LEVELS)} {rng.choice(TITLES)}"
+        yield {
+            "id": job_id,
+            "title": title,
+            "description": (
+                f"We are hiring a {title.lower()} to join our team. "
+                f"You will work with {', '.join(skills[:-1])} and {skills[-1]}."
+            ),
+            # Most postings are open; roughly one in five has closed
+            "status": JobStatus.CLOSED if rng.random() < 0.2 else JobStatus.OPEN,
+            "company_id": (recruiter_id - 1) % companies + 1,
+            "created_by_id": recruiter_id,
+        }
+
+
+def _applications_and_history(
+    rng: random.Random,
+    applications: int,
+    candidates: int,
+    recruiters: int,
+    jobs: int,
+    job_owner: dict,
+    now: datetime,
+):
+    """Yields (application_row, history_rows). Each candidate applies to a
+    distinct set of jobs, so the (candidate_id, job_id) unique index holds."""
+    stages = list(FINAL_STAGE_WEIGHTS)
+    weights = list(FINAL_STAGE_WEIGHTS.values())
+
+    per_candidate, extra = divmod(applications, candidates)
+    application_id = 0
+    for n in range(candidates):
+        count = min(per_candidate + (1 if n < extra else 0), jobs)
+        candidate_id = recruiters + n + 1
+
+        for job_id in rng.sample(range(1, jobs + 1), count):
+            application_id += 1
+            path = _stage_path(rng, rng.choices(stages, weights)[0])
+
+            changed_at = now - timedelta(days=rng.uniform(0, 365))
+            created_at = changed_at
+            history = []
+            for old_stage, new_stage in zip([None] + path[:-1], path):
+                history.append({
+                    "application_id": application_id,
+                    "old_stage": old_stage,
+                    "new_stage": new_stage,
+                    # The candidate creates the application, the recruiter moves it
+                    "changed_by_id": candidate_id if old_stage is None else job_owner[job_id],
+                    "changed_at": changed_at,
+                })
+                changed_at += timedelta(hours=rng.uniform(1, 24 * 14))
+
+            yield {
+                "id": application_id,
+                "candidate_id": candidate_id,
+                "job_id": job_id,
+                "stage": path[-1],
+                "created_at": created_at,
+                "updated_at": history[-1]["changed_at"],
+            }, history
+
+
+# -----------------------------
+# SEED
+# -----------------------------
+
+def seed(
+    database_url: str,
+    applications: int,
+    candidates: int,
+    recruiters: int,
+    companies: int,
+    jobs: int,
+    seed_value: int = 42,
+    reset: bool = False,
+) -> dict:
+    engine = create_engine(database_url)
+
+    if engine.dialect.name == "sqlite":
+        # Bulk load: durability of a throwaway benchmark database doesn't matter
+        @event.listens_for(engine, "connect")
+        def _fast_sqlite(dbapi_connection, connection_record):
+            dbapi_connection.execute("PRAGMA synchronous = OFF")
+            dbapi_connection.execute("PRAGMA journal_mode = MEMORY")
+
+    if reset:
+        Base.metadata.drop_all(engine)
+        with engine.begin() as conn:
+            conn.execute(text("DROP TABLE IF EXISTS alembic_version"))
+            if engine.dialect.name == "sqlite":
+                conn.execute(text(f"DROP TABLE IF EXISTS {FTS_TABLE}"))
+    upgrade(engine)
+
+    rng = random.Random(seed_value)
+    counts = {}
+    started = time.perf_counter()
+
+    with Session(engine) as db:
+        if db.scalar(select(func.count()).select_from(User)):
+            raise SystemExit("Database already has users; pass --reset to replace its contents.")
+
+        # One hash for everyone: bcrypt per user would dominate the load time
+        hashed_password = hash_password(BENCH_PASSWORD)
+
+        counts["companies"] = _insert(db, Company, _companies(companies))
+        counts["users"] = _insert(db, User, _users(recruiters, candidates, companies, hashed_password))
+
+        job_rows = list(_jobs(rng, jobs, recruiters, companies))
+        counts["jobs"] = _insert(db, Job, job_rows)
+        job_owner = {row["id"]: row["created_by_id"] for row in job_rows}
+
+        counts["applications"] = counts["application_history"] = 0
+        generated = _applications_and_history(
+            rng, applications, candidates, recruiters, jobs, job_owner, datetime.utcnow()
+        )
+        for chunk in _chunks(generated):
+            db.execute(insert(Application), [application for application, _ in chunk])
+            history = [row for _, rows in chunk for row in rows]
+            db.execute(insert(ApplicationHistory), history)
+            counts["applications"] += len(chunk)
+            counts["application_history"] += len(history)
+            print(f"  {counts['applications']:,} applications", end="\r", flush=True)
+
+        db.commit()
+        print()
+
+        counts["job_stage_counts"] = PipelineService.rebuild(db)
+
+        if engine.dialect.name == "postgresql":
+            # Ids were supplied explicitly, so move the sequences past them
+            for model in (Company, User, Job, Application, ApplicationHistory):
+                table = model.__tablename__
+                db.execute(text(
+                    f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                    f"coalesce((SELECT max(id) FROM {table}), 1))"
+                ))
+            db.commit()
+
+        if engine.dialect.name == "sqlite":
+            db.execute(text(
+                f"INSERT INTO {FTS_TABLE} (rowid, title, description) "
+                "SELECT id, title, coalesce(description, '') FROM jobs"
+            ))
+            db.commit()
+
+    engine.dispose()
+
+    counts["seconds"] = round(time.perf_counter() - started, 1)
+    return counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Seed the ATS database with synthetic data.")
+    parser.add_argument("--database-url", default=DATABASE_URL)
+    parser.add_argument("--applications", type=int, default=100_000)
+    parser.add_argument("--candidates", type=int, default=None, help="default: applications / 5")
+    parser.add_argument("--recruiters", type=int, default=None, help="default: applications / 500")
+    parser.add_argument("--companies", type=int, default=None, help="default: recruiters / 4")
+    parser.add_argument("--jobs", type=int, default=None, help="default: applications / 50")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="drop and recreate all tables first")
+    args = parser.parse_args()
+
+    candidates = args.candidates or max(1, args.applications // 5)
+    recruiters = args.recruiters or max(1, args.applications // 500)
+    companies = args.companies or max(1, recruiters // 4)
+    jobs = args.jobs or max(1, args.applications // 50)
+
+    print(
+        f"Seeding {args.database_url}: {companies:,} companies, {recruiters:,} recruiters, "
+        f"{candidates:,} candidates, {jobs:,} jobs, {args.applications:,} applications"
+    )
+    counts = seed(
+        args.database_url,
+        applications=args.applications,
+        candidates=candidates,
+        recruiters=recruiters,
+        companies=companies,
+        jobs=jobs,
+        seed_value=args.seed,
+        reset=args.reset,
+    )
+    for table, count in counts.items():
+        print(f"  {table}: {count:,}")
+
+
+if __name__ == "__main__":
+    main()
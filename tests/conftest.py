@@ -0,0 +1,24 @@
+import os
+import shutil
+import tempfile
+
+# Settings are read when app modules are imported, so they are set before
+# any test imports them: a throwaway SQLite file, no Redis, no rate limits,
+# and roles from the token so authentication runs no SQL
+_db_dir = tempfile.mkdtemp(prefix="ats-tests-")
+os.environ["DATABASE_URL"] = f"sqlite:///{_db_dir}/test.db"
+os.environ.pop("DATABASE_READ_URL", None)
+os.environ["QUEUE_BACKEND"] = "memory"
+os.environ["RATE_LIMIT_ENABLED"] = "0"
+os.environ["AUTH_STATELESS"] = "1"
+
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def migrated_database():
+    from app.migrations import upgrade
+
+    upgrade()
+    yield
+    shutil.rmtree(_db_dir, ignore_errors=True)
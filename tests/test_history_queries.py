@@ -0,0 +1,182 @@
+import asyncio
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+from sqlalchemy import event
+
+from app.auth import create_access_token, user_claims
+from app.database import SessionLocal, async_engine, async_read_engine
+from app.main import app
+from app.models import (
+    Application,
+    ApplicationHistory,
+    ApplicationStage,
+    Company,
+    Job,
+    User,
+    UserRole,
+)
+
+HISTORY_LENGTHS = (1, 50, 500)
+PAGE_SIZE = 20
+MAX_PAGES = 4
+
+
+# -----------------------------
+# FIXTURES
+# -----------------------------
+
+@pytest.fixture(scope="module")
+def history_data():
+    """A recruiter's job with one application of candidate A per history
+    length, plus an application of candidate B and a second recruiter
+    who owns none of the jobs."""
+    with SessionLocal() as db:
+        company = Company(name="History Co")
+        db.add(company)
+        db.flush()
+        recruiter = User(email="recruiter@history.test", full_name="R", hashed_password="x",
+                         role=UserRole.RECRUITER, company_id=company.id)
+        candidate = User(email="a@history.test", full_name="A", hashed_password="x", role=UserRole.CANDIDATE)
+        other = User(email="b@history.test", full_name="B", hashed_password="x", role=UserRole.CANDIDATE)
+        other_recruiter = User(email="other-recruiter@history.test", full_name="O", hashed_password="x",
+                               role=UserRole.RECRUITER, company_id=company.id)
+        db.add_all([recruiter, candidate, other, other_recruiter])
+        db.flush()
+
+        applications = {}
+        started = datetime.utcnow() - timedelta(days=30)
+        for length in HISTORY_LENGTHS:
+            job = Job(title=f"Job {length}", company_id=company.id, created_by_id=recruiter.id)
+            db.add(job)
+            db.flush()
+            application = Application(candidate_id=candidate.id, job_id=job.id, created_at=started)
+            db.add(application)
+            db.flush()
+            # Stage validity doesn't matter here, only the number of rows
+            db.add_all([
+                ApplicationHistory(
+                    application_id=application.id,
+                    old_stage=None if n == 0 else ApplicationStage.APPLIED,
+                    new_stage=ApplicationStage.APPLIED if n == 0 else ApplicationStage.SCREENING,
+                    changed_by_id=recruiter.id,
+                    # Rows share timestamps in pairs, so the (changed_at, id) tie-break is paged too
+                    changed_at=started + timedelta(minutes=n // 2),
+                )
+                for n in range(length)
+            ])
+            applications[length] = application.id
+
+        foreign = Application(candidate_id=other.id, job_id=job.id)
+        db.add(foreign)
+        db.flush()
+        db.add(ApplicationHistory(application_id=foreign.id, new_stage=ApplicationStage.APPLIED,
+                                  changed_by_id=other.id))
+        db.commit()
+
+        return {
+            "applications": applications,
+            "foreign_application": foreign.id,
+            "recruiter": {"Authorization": "Bearer " + create_access_token(user_claims(recruiter))},
+            "candidate": {"Authorization": "Bearer " + create_access_token(user_claims(candidate))},
+            "other_recruiter": {"Authorization": "Bearer " + create_access_token(user_claims(other_recruiter))},
+        }
+
+
+class StatementCounter:
+    """Counts SQL statements run on the async engine(s) between resets."""
+
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, *args):
+        self.count += 1
+
+
+def _run(coroutine_fn):
+    counter = StatementCounter()
+    engines = {async_engine.sync_engine, async_read_engine.sync_engine}
+    for engine in engines:
+        event.listen(engine, "after_cursor_execute", counter)
+
+    async def main():
+        try:
+            async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+                return await coroutine_fn(client, counter)
+        finally:
+            await async_engine.dispose()
+            await async_read_engine.dispose()
+
+    try:
+        return asyncio.run(main())
+    finally:
+        for engine in engines:
+            event.remove(engine, "after_cursor_execute", counter)
+
+
+async def _statements(client, counter, path, headers, **params):
+    counter.count = 0
+    response = await client.get(path, headers=headers, params=params)
+    return response, counter.count
+
+
+# -----------------------------
+# STATEMENTS PER REQUEST
+# -----------------------------
+
+@pytest.mark.parametrize("endpoint, user", [("application", "recruiter"), ("me", "candidate")])
+def test_history_pages_run_a_constant_number_of_statements(history_data, endpoint, user):
+    async def walk(client, counter):
+        counts = []
+        for length, application_id in history_data["applications"].items():
+            seen = []
+            cursor = None
+            for _ in range(MAX_PAGES):
+                params = {"limit": PAGE_SIZE} if cursor is None else {"limit": PAGE_SIZE, "cursor": cursor}
+                response, statements = await _statements(
+                    client, counter, f"/history/{endpoint}/{application_id}", history_data[user], **params
+                )
+                assert response.status_code == 200, response.text
+                page = response.json()
+                seen.extend(item["id"] for item in page["items"])
+                counts.append(statements)
+                cursor = page["next_cursor"]
+                if cursor is None:
+                    break
+
+            assert len(seen) == len(set(seen)) == min(length, PAGE_SIZE * MAX_PAGES)
+        return counts
+
+    # One statement per page, whether the history has 1 row or 500
+    counts = _run(walk)
+    assert set(counts) == {1}, counts
+
+
+def test_candidate_history_of_another_candidate_is_not_found(history_data):
+    async def fetch(client, counter):
+        return [
+            await _statements(client, counter, f"/history/me/{application_id}", history_data["candidate"])
+            for application_id in (history_data["foreign_application"], 10**9)
+        ]
+
+    for response, statements in _run(fetch):
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Application not found"
+        assert statements == 1
+
+
+def test_recruiter_history_of_another_recruiters_job_is_not_found(history_data):
+    async def fetch(client, counter):
+        return [
+            await _statements(client, counter, f"/history/application/{application_id}", headers)
+            for application_id, headers in (
+                (history_data["applications"][1], history_data["other_recruiter"]),
+                (10**9, history_data["recruiter"]),
+            )
+        ]
+
+    for response, statements in _run(fetch):
+        assert response.status_code == 404
+        assert response.json()["detail"] == "Application not found"
+        assert statements == 1